@@ -0,0 +1,129 @@
+# 게시글/댓글/답글 작성자의 표시 정보(아이디, 닉네임, 프로필 사진 URL) 캐시입니다.
+# 템플릿에서 {{ post.user }} 나 user.profile.nickname 을 쓰면 행마다 User/Profile 쿼리가 나가므로,
+# 한 페이지에 나오는 작성자를 attach_authors() 로 한 번에 불러와(캐시 get_many 1번, 캐시에 없는 사람만 쿼리 1번)
+# 각 객체의 author 속성에 붙여 둡니다. 템플릿에서는 {% load authors %} {% author_name post %} 로 보여줍니다.
+# User/Profile 이 바뀌면 signals.py 에서 해당 사용자의 캐시를 지웁니다.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+KEY_PREFIX = 'author:'
+DEFAULTS = {
+    # 여러 프로세스가 같은 값을 보도록 공유되는 캐시를 지정해야 합니다.
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 60 * 60,
+}
+# Profile 에 사진이 없으므로 모든 작성자에게 같은 기본 이미지를 씁니다.
+DEFAULT_AVATAR_URL = 'https://dummyimage.com/50x50/ced4da/6c757d.jpg'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'AUTHOR_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def author_key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+class Author:
+    # 템플릿에 보여줄 작성자 정보입니다. 캐시에는 dict 로 저장합니다.
+    def __init__(self, pk, username, nickname='', avatar_url=DEFAULT_AVATAR_URL):
+        self.pk = pk
+        self.username = username
+        self.nickname = nickname or ''
+        self.avatar_url = avatar_url
+
+    @property
+    def display_name(self):
+        return self.nickname or self.username
+
+    def __str__(self):
+        return self.display_name
+
+    def as_dict(self):
+        return {'pk': self.pk, 'username': self.username, 'nickname': self.nickname, 'avatar_url': self.avatar_url}
+
+
+def author_queryset(user_ids):
+    return get_user_model().objects.filter(pk__in=user_ids).values_list('pk', 'username', 'profile__nickname')
+
+
+def get_authors(user_ids):
+    # {사용자 pk: Author} 를 반환합니다. 캐시에 없는 사용자만 한 번의 쿼리로 읽어 캐시에 넣습니다.
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    cache = get_cache()
+    found = cache.get_many([author_key(user_id) for user_id in user_ids])
+    authors = {data['pk']: Author(**data) for data in found.values()}
+    missing = user_ids - authors.keys()
+    if missing:
+        loaded = {pk: Author(pk, username, nickname) for pk, username, nickname in author_queryset(missing)}
+        cache.set_many(
+            {author_key(pk): author.as_dict() for pk, author in loaded.items()}, timeout=get_config()['TIMEOUT'],
+        )
+        authors.update(loaded)
+    return authors
+
+
+async def aget_authors(user_ids):
+    # 비동기 뷰용 get_authors() 입니다.
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return {}
+    cache = get_cache()
+    found = await cache.aget_many([author_key(user_id) for user_id in user_ids])
+    authors = {data['pk']: Author(**data) for data in found.values()}
+    missing = user_ids - authors.keys()
+    if missing:
+        loaded = {pk: Author(pk, username, nickname) async for pk, username, nickname in author_queryset(missing)}
+        await cache.aset_many(
+            {author_key(pk): author.as_dict() for pk, author in loaded.items()}, timeout=get_config()['TIMEOUT'],
+        )
+        authors.update(loaded)
+    return authors
+
+
+def attach_authors(objects):
+    # user_id 를 가진 객체(게시글, 댓글, 답글) 목록에 author 속성을 붙이고 목록을 반환합니다.
+    objects = list(objects)
+    authors = get_authors(obj.user_id for obj in objects)
+    for obj in objects:
+        obj.author = authors.get(obj.user_id)
+    return objects
+
+
+async def aattach_authors(objects):
+    objects = list(objects)
+    authors = await aget_authors(obj.user_id for obj in objects)
+    for obj in objects:
+        obj.author = authors.get(obj.user_id)
+    return objects
+
+
+def author_for(obj):
+    # attach_authors() 로 붙인 정보를 쓰고, 없으면 그 객체의 작성자만 불러옵니다.
+    author = getattr(obj, 'author', None)
+    if author is None:
+        author = get_authors([obj.user_id]).get(obj.user_id)
+    return author
+
+
+def invalidate_author(user_id):
+    get_cache().delete(author_key(user_id))
+
+
+def display_fields_changed(sender, update_fields):
+    # 저장된 내용이 작성자 표시 정보에 영향을 줄 수 있는지 확인합니다.
+    # 로그인할 때마다 last_login 만 저장하는 경우처럼 관계없는 필드만 저장하면 캐시를 지우지 않습니다.
+    if update_fields is None:
+        return True
+    if sender is get_user_model():
+        return 'username' in update_fields
+    return 'nickname' in update_fields
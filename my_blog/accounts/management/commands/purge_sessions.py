@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blogbase.db import primary_pin_scope
+from accounts.sessions import get_session_model, purge_expired_sessions
+
+
+# 만료된 세션을 나눠서 지우는 관리 명령입니다. clearsessions 와 같지만 한 번에 지우는 수를 제한합니다.
+# cron 등으로 주기적으로 실행합니다. 예) 0 4 * * * python manage.py purge_sessions --batch-size 1000 --pause 0.1
+class Command(BaseCommand):
+    help = '만료된 세션을 batch-size 개씩 나눠서 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번의 DELETE 로 지울 세션 수')
+        parser.add_argument('--pause', type=float, default=0.0, help='묶음 사이에 쉴 시간(초)')
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 만료된 세션 수만 출력합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+        if get_session_model() is None:
+            self.stdout.write(f'{settings.SESSION_ENGINE} 는 DB 에 세션을 저장하지 않으므로 만료된 세션만 정리합니다.')
+        try:
+            count = purge_expired_sessions(
+                batch_size=options['batch_size'], pause=options['pause'], dry_run=options['dry_run'],
+            )
+        except NotImplementedError:
+            raise CommandError(f'{settings.SESSION_ENGINE} 는 만료된 세션 정리를 지원하지 않습니다.')
+        if options['dry_run']:
+            self.stdout.write(f'만료된 세션 {count}개를 찾았습니다.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'만료된 세션 {count}개를 지웠습니다.'))
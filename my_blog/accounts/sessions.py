@@ -0,0 +1,141 @@
+# 세션과 로그인 사용자 처리를 가볍게 하는 모듈입니다.
+#
+# Django 기본 설정에서는 로그인 사용자의 요청마다 세션(django_session)과 사용자(auth_user)를 각각 SELECT 합니다.
+# 세션은 settings.SESSION_ENGINE 을 cached_db(또는 signed_cookies)로 바꿔 캐시에서 읽고,
+# 사용자는 CachedUserAuthenticationMiddleware 가 캐시에 저장해 둔 필드(CACHED_FIELDS)로 만든 User 객체를 씁니다.
+# 비밀번호 해시는 캐시에 넣지 않고 세션에 저장되는 것과 같은 HMAC(get_session_auth_hash)만 넣어,
+# 요청마다 세션의 값(HASH_SESSION_KEY)과 비교합니다. 비밀번호를 바꾸면 다른 세션은 로그아웃됩니다.
+# 나머지 필드(password, email 등)는 지연 필드라 처음 쓸 때 DB 에서 읽습니다. (비밀번호 변경 폼 등)
+# 캐시는 세션이 아니라 사용자 단위로 저장해 같은 사용자의 여러 세션이 공유하고,
+# 사용자가 저장/삭제되면(비밀번호 변경, 탈퇴 등) signals.py 에서 바로 지웁니다.
+# QuerySet.update() 로 여러 사용자를 한 번에 바꾸면(비활성화 등) 시그널이 없으므로 TIMEOUT 이 지나야 반영됩니다.
+# 바로 반영하려면 바꾼 사용자마다 invalidate_user() 를 호출합니다.
+#
+# 만료된 세션은 manage.py purge_sessions 로 나눠서 지웁니다. (cron 등으로 주기적으로 실행)
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import router
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+KEY_PREFIX = 'session-user:'
+DEFAULTS = {
+    'ENABLED': True,
+    # 여러 프로세스가 같은 값을 보도록 공유되는 캐시를 지정해야 합니다.
+    'CACHE_ALIAS': 'default',
+    # 시그널 없이 바뀐 사용자(bulk update)가 반영되기까지의 최대 시간이기도 하므로 짧게 둡니다.
+    'TIMEOUT': 60,
+}
+# 캐시에 저장하는 사용자 필드입니다. 권한 확인(is_active, is_staff, is_superuser)과 화면 표시에 쓰는 값만 둡니다.
+CACHED_FIELDS = ('id', 'username', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser')
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'SESSION_USER_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def user_key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def invalidate_user(user_id):
+    get_cache().delete(user_key(user_id))
+
+
+def session_hash_matches(request, auth_hash):
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    return bool(session_hash) and constant_time_compare(session_hash, auth_hash)
+
+
+def cache_user(user):
+    data = {name: getattr(user, name) for name in CACHED_FIELDS}
+    data['auth_hash'] = user.get_session_auth_hash()
+    get_cache().set(user_key(user.pk), data, get_config()['TIMEOUT'])
+
+
+def restore_user(data):
+    # 캐시한 필드만 채운 User 입니다. 나머지 필드는 DB 에서 읽은 객체의 .only() 와 같이 처음 쓸 때 읽습니다.
+    # from_db() 는 값이 모델 필드 순서대로 오기를 기대합니다.
+    model = get_user_model()
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in data]
+    return model.from_db(router.db_for_read(model), names, [data[name] for name in names])
+
+
+def load_user(request):
+    # 캐시된 사용자가 있고 활성 상태이며 세션의 비밀번호 해시가 맞으면 그대로 쓰고,
+    # 아니면 Django 의 get_user() 로 DB 에서 읽어 캐시합니다.
+    # (해시가 맞지 않는 세션과 비활성 사용자의 로그아웃 처리, SECRET_KEY_FALLBACKS 확인은 get_user() 가 합니다)
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    data = get_cache().get(user_key(user_id))
+    if (
+        data is not None and data['is_active'] and backend_path in settings.AUTHENTICATION_BACKENDS
+        and session_hash_matches(request, data['auth_hash'])
+    ):
+        user = restore_user(data)
+        user.backend = backend_path
+        return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache_user(user)
+    return user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = load_user(request)
+    return request._cached_user
+
+
+class CachedUserAuthenticationMiddleware(AuthenticationMiddleware):
+    # django.contrib.auth 의 AuthenticationMiddleware 대신 MIDDLEWARE 에 넣습니다.
+    # SESSION_USER_CACHE['ENABLED'] 가 False 이면 기본 미들웨어와 똑같이 동작합니다.
+    def process_request(self, request):
+        super().process_request(request)
+        if get_config()['ENABLED']:
+            request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def get_session_model():
+    # DB 에 저장하는 세션 엔진(db, cached_db)의 모델입니다. 쿠키/캐시/파일 엔진이면 None 입니다.
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    return store.get_model_class() if hasattr(store, 'get_model_class') else None
+
+
+def purge_expired_sessions(batch_size=1000, pause=0.0, dry_run=False):
+    # 만료된 세션을 batch_size 개씩 나눠 지우고 지운(지울) 세션 수를 반환합니다.
+    # 한 번의 큰 DELETE 로 세션 테이블을 오래 잠그지 않도록 묶음 사이에 pause 초 동안 쉽니다.
+    model = get_session_model()
+    if model is None:
+        if not dry_run:
+            import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+        return 0
+    expired = model.objects.filter(expire_date__lt=timezone.now())
+    if dry_run:
+        return expired.count()
+    total = 0
+    while True:
+        keys = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return total
+        model.objects.filter(pk__in=keys).delete()
+        total += len(keys)
+        if pause and len(keys) == batch_size:
+            time.sleep(pause)
@@ -0,0 +1,32 @@
+# accounts 앱의 시그널 핸들러입니다. apps.py 의 ready() 에서 불러와 연결됩니다.
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authors import display_fields_changed, invalidate_author
+from .models import Profile
+from .sessions import invalidate_user
+
+User = get_user_model()
+
+
+# 아이디나 닉네임이 바뀌면 작성자 표시 정보 캐시를 지웁니다.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_on_user_change(sender, instance, update_fields=None, **kwargs):
+    if display_fields_changed(sender, update_fields):
+        invalidate_author(instance.pk)
+
+
+# 사용자가 저장/삭제되면(비밀번호 변경, 탈퇴, 권한 변경 등) 세션별로 쓰는 사용자 캐시를 지웁니다.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_session_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_author_on_profile_change(sender, instance, update_fields=None, **kwargs):
+    if display_fields_changed(sender, update_fields):
+        invalidate_author(instance.user_id)
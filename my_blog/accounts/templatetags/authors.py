@@ -0,0 +1,30 @@
+from django import template
+from django.utils.html import format_html
+
+from accounts.authors import author_for
+
+register = template.Library()
+
+
+# 작성자 이름(닉네임이 있으면 닉네임)을 보여주는 태그입니다. 아이디는 title 로 보여줍니다.
+# 사용법: {% load authors %} {% author_name post %}
+# 뷰에서 attach_authors() 로 작성자를 미리 붙여 두면 추가 쿼리가 나가지 않습니다.
+@register.simple_tag
+def author_name(obj):
+    author = author_for(obj)
+    if author is None:
+        return ''
+    return format_html('<span title="{}">{}</span>', author.username, author.display_name)
+
+
+# 작성자 프로필 사진입니다.
+# 사용법: {% author_avatar comment %}
+@register.simple_tag
+def author_avatar(obj, size=50):
+    author = author_for(obj)
+    if author is None:
+        return ''
+    return format_html(
+        '<img class="rounded-circle" src="{}" width="{}" height="{}" alt="{}" />',
+        author.avatar_url, size, size, author.display_name,
+    )
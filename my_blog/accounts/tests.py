@@ -1,3 +1,94 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import HASH_SESSION_KEY
+from django.contrib.auth.forms import PasswordChangeForm
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+
+from .sessions import get_cache, invalidate_user, load_user, user_key
+
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in ('default', 'blog', 'sessions')
+}
+
+
+# 로그인 사용자 캐시(accounts/sessions.py)가 비밀번호 해시를 캐시에 두지 않고,
+# 비밀번호 변경/비활성화/세션 해시 불일치에 로그아웃되는지 확인합니다.
+@override_settings(CACHES=TEST_CACHES)
+class SessionUserCacheTests(TestCase):
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('member', email='member@example.com', password='password', is_staff=True)
+        self.client.force_login(self.user)
+
+    def make_request(self, client=None):
+        request = RequestFactory().get('/')
+        request.session = (client or self.client).session
+        return request
+
+    def test_cache_keeps_no_password_hash(self):
+        load_user(self.make_request())
+        data = get_cache().get(user_key(self.user.pk))
+        self.assertNotIn('password', data)
+        self.assertNotIn(self.user.password, data.values())
+        self.assertEqual(data['auth_hash'], self.user.get_session_auth_hash())
+
+    def test_cached_user_without_queries(self):
+        load_user(self.make_request())
+        with self.assertNumQueries(0):
+            user = load_user(self.make_request())
+            self.assertTrue(user.is_authenticated)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.username, 'member')
+            self.assertTrue(user.is_staff)
+        # 캐시에 없는 필드는 처음 쓸 때 읽습니다.
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'member@example.com')
+
+    def test_password_change_form_on_cached_user(self):
+        load_user(self.make_request())
+        user = load_user(self.make_request())
+        form = PasswordChangeForm(user, {
+            'old_password': 'password', 'new_password1': 'new-secret-123', 'new_password2': 'new-secret-123',
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-secret-123'))
+        self.assertEqual(self.user.email, 'member@example.com')
+
+    def test_session_hash_mismatch_logs_out(self):
+        load_user(self.make_request())
+        request = self.make_request()
+        request.session[HASH_SESSION_KEY] = 'tampered'
+        self.assertFalse(load_user(request).is_authenticated)
+
+    def test_password_change_logs_out_other_sessions(self):
+        load_user(self.make_request())
+        self.user.set_password('changed-password')
+        self.user.save()
+        self.assertFalse(load_user(self.make_request()).is_authenticated)
+
+    def test_deactivation_logs_out(self):
+        load_user(self.make_request())
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(load_user(self.make_request()).is_authenticated)
+
+    def test_bulk_deactivation_expires_with_timeout(self):
+        load_user(self.make_request())
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        # update() 는 시그널이 없으므로 캐시가 만료되거나 invalidate_user() 를 호출하면 로그아웃됩니다.
+        expired = time.time() + 61
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=expired):
+            self.assertFalse(load_user(self.make_request()).is_authenticated)
+
+    def test_invalidate_user_after_bulk_update(self):
+        load_user(self.make_request())
+        User.objects.filter(pk=self.user.pk).update(is_superuser=True)
+        invalidate_user(self.user.pk)
+        self.assertTrue(load_user(self.make_request()).is_superuser)
@@ -3,8 +3,9 @@ from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, TemplateView
 from django.views.generic.edit import DeleteView
+from .authors import get_authors
 from .forms import CustomUserCreationForm, PasswordChangeForm, UserDeleteForm  
-from django.contrib.auth import update_session_auth_hash, get_user_model
+from django.contrib.auth import logout, update_session_auth_hash, get_user_model
 from django.views import View
 from django.shortcuts import render, redirect
 
@@ -32,6 +33,12 @@ logout = LogoutView.as_view()
 class ProfileView(LoginRequiredMixin, TemplateView):
     template_name = 'accounts/profile.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # 닉네임은 Profile 을 따로 조회하지 않고 작성자 캐시에서 가져옵니다.
+        context['author'] = get_authors([self.request.user.pk]).get(self.request.user.pk)
+        return context
+
 profile = ProfileView.as_view()
 
 class PasswordChangeView(View):
@@ -42,6 +49,7 @@ class PasswordChangeView(View):
     def post(self, request):
         form = PasswordChangeForm(request.user, request.POST)
         if form.is_valid():
+            # 저장하면 signals.py 가 캐시된 사용자를 지우고, 새 비밀번호 해시로 세션을 갱신합니다.
             user = form.save()
             update_session_auth_hash(request, user)  # Important!
             return redirect('accounts:logout')
@@ -62,6 +70,12 @@ class UserDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     def test_func(self):
         user = self.get_object()
         return user == self.request.user
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # 탈퇴한 사용자의 세션(DB와 캐시)을 지웁니다. 캐시된 사용자는 signals.py 가 지웁니다.
+        logout(self.request)
+        return response
     
 user_delete = UserDeleteView.as_view()        
         
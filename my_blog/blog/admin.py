@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Post, Comment, Tag, Reply
+from .models import Post, Comment, Tag, Reply, ChunkedUpload
 
 admin.site.register(Post)
 admin.site.register(Comment)
 admin.site.register(Tag)
-admin.site.register(Reply)
\ No newline at end of file
+admin.site.register(Reply)
+admin.site.register(ChunkedUpload)
\ No newline at end of file
@@ -0,0 +1,300 @@
+# 성능 측정용 가상 데이터 생성기와 시나리오 실행기입니다. (manage.py seed_blog, manage.py benchmark)
+#
+# seed() 는 사용자(Profile 포함), 태그가 달린 게시글, 댓글/답글을 만듭니다.
+# 실제 게시판처럼 소수의 게시글에 댓글이 몰리고 소수의 사용자가 대부분의 글을 쓰도록 멱법칙(파레토/지프) 분포를 따릅니다.
+# 빠르게 만들기 위해 bulk_create 로 넣으므로 시그널이 나가지 않으며, 본문 변환(rendering)은 직접 호출하고
+# 끝에서 댓글 수(counters), 태그별 게시글 수(tags)와 검색 색인을 한 번에 맞춥니다.
+#
+# ScenarioRunner 는 Django 테스트 클라이언트로 목록, 검색, 상세, 태그, 댓글 작성, 회원가입, 로그인 요청을 반복하고
+# 요청마다 응답 시간과 쿼리 수(모든 DB 연결)를 재서 p50/p95/p99, 평균/최대 쿼리 수, 처리량으로 요약합니다.
+import random
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import translation
+
+from accounts.models import Profile
+
+from . import cache as blog_cache
+from . import counters
+from .models import Comment, Post, PostTag, Reply, Tag
+from .rendering import render_comment, render_post
+from .search import get_search_backend
+from .tags import reconcile_post_counts, resolve_tags
+
+# 가상 사용자의 아이디 앞부분과 비밀번호입니다. (login, comment_create 시나리오에서 사용)
+USERNAME_PREFIX = 'bench'
+PASSWORD = 'bench-password'
+BATCH_SIZE = 500
+# 제목/본문/태그/검색어를 만들 단어입니다.
+WORDS = (
+    '파이썬', '장고', '데이터베이스', '캐시', '인덱스', '쿼리', '템플릿', '배포', '서버', '성능',
+    '비동기', '테스트', '마이그레이션', '보안', '세션', '로그인', '검색', '태그', '댓글', '이미지',
+    'python', 'django', 'sqlite', 'nginx', 'redis', 'docker', 'linux', 'http', 'json', 'api',
+    'orm', 'index', 'cache', 'query', 'async', 'wsgi', 'asgi', 'static', 'media', 'profile',
+)
+
+
+def zipf_weights(count, exponent=1.0):
+    # 앞쪽 항목일수록 훨씬 자주 뽑히도록 하는 가중치입니다.
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def seed(users=200, posts=2000, comments=20000, replies=None, tags=30, seed=0, log=None):
+    # 가상 데이터를 만들고 만든 개수를 반환합니다. 이미 데이터가 있어도 그대로 두고 추가합니다.
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    replies = comments // 2 if replies is None else replies
+    start = User.objects.count()
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        user_objs = User.objects.bulk_create(
+            [User(username=f'{USERNAME_PREFIX}{start + i}', password=password) for i in range(users)],
+            batch_size=BATCH_SIZE,
+        )
+        Profile.objects.bulk_create(
+            [Profile(user=user, nickname=f'벤치{start + i}') for i, user in enumerate(user_objs)],
+            batch_size=BATCH_SIZE,
+        )
+        log(f'사용자 {len(user_objs)}명')
+
+        # 글쓴이/댓글 작성자는 지프 분포, 게시글별 댓글 수와 댓글별 답글 수는 파레토 분포를 따릅니다.
+        user_weights = zipf_weights(len(user_objs))
+        post_objs = Post.objects.bulk_create(
+            [
+                render_post(Post(
+                    user=rng.choices(user_objs, user_weights)[0],
+                    title=sentence(rng, 2, 6),
+                    content='\n'.join(sentence(rng, 8, 30) for _ in range(rng.randint(1, 6))),
+                    view_count=int(rng.paretovariate(1.2) * 10),
+                ))
+                for _ in range(posts)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        log(f'게시글 {len(post_objs)}개')
+
+        # 태그 연결은 중간 테이블에 바로 넣습니다. (게시글마다 색인 시그널이 나가지 않도록)
+        tag_objs = list(resolve_tags(WORDS[:tags]).values())
+        tag_weights = zipf_weights(len(tag_objs))
+        Through = Post.tags.through
+        links = set()
+        for post in post_objs:
+            for tag in rng.choices(tag_objs, tag_weights, k=rng.randint(0, 4)) if tag_objs else ():
+                links.add((post.pk, tag.pk))
+        Through.objects.bulk_create(
+            [Through(post_id=post_id, tag_id=tag_id) for post_id, tag_id in links], batch_size=BATCH_SIZE,
+        )
+        log(f'태그 연결 {len(links)}개')
+
+        post_weights = [rng.paretovariate(1.2) for _ in post_objs]
+        comment_objs = Comment.objects.bulk_create(
+            [
+                render_comment(
+                    Comment(post=post, user=rng.choices(user_objs, user_weights)[0], message=sentence(rng, 3, 20))
+                )
+                for post in (rng.choices(post_objs, post_weights, k=comments) if post_objs else ())
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        comment_weights = [rng.paretovariate(1.5) for _ in comment_objs]
+        reply_objs = Reply.objects.bulk_create(
+            [
+                Reply(
+                    post_id=comment.post_id, comment=comment,
+                    user=rng.choices(user_objs, user_weights)[0], message=sentence(rng, 3, 15),
+                )
+                for comment in (rng.choices(comment_objs, comment_weights, k=replies) if comment_objs else ())
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        log(f'댓글 {len(comment_objs)}개, 답글 {len(reply_objs)}개')
+
+        counters.reconcile(Post, Comment, Reply)
+        reconcile_post_counts(Tag, PostTag)
+    indexed = get_search_backend().rebuild()
+    blog_cache.bump_versions(blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE)
+    log(f'검색 색인 {indexed}건')
+    return {
+        'users': len(user_objs), 'posts': len(post_objs), 'tags': len(tag_objs),
+        'comments': len(comment_objs), 'replies': len(reply_objs),
+    }
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def summarize(latencies, queries, errors, elapsed):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50': round(statistics.median(ordered) * 1000, 2) if ordered else 0.0,
+        'p95': round(percentile(ordered, 95) * 1000, 2),
+        'p99': round(percentile(ordered, 99) * 1000, 2),
+        'queries_avg': round(statistics.mean(queries), 2) if queries else 0.0,
+        'queries_max': max(queries, default=0),
+        'errors': errors,
+    }
+
+
+# 시나리오는 실행기를 받아 요청 하나를 보내고 응답을 반환하는 함수입니다.
+def scenario_post_list(runner):
+    return runner.anonymous.get(runner.url('blog:post_list'))
+
+
+def scenario_search(runner):
+    return runner.anonymous.get(runner.url('blog:post_list'), {'q': runner.rng.choice(WORDS)})
+
+
+def scenario_post_detail(runner):
+    return runner.anonymous.get(runner.url('blog:post_detail', runner.pick_post()))
+
+
+def scenario_tag_list(runner):
+    return runner.anonymous.get(runner.url('blog:tag_list'))
+
+
+def scenario_tag_detail(runner):
+    return runner.anonymous.get(runner.url('blog:tag_detail', runner.pick_tag()))
+
+
+def scenario_comment_create(runner):
+    return runner.member.post(
+        runner.url('blog:comment_new', runner.pick_post()), {'message': sentence(runner.rng, 3, 12)},
+    )
+
+
+def scenario_signup(runner):
+    runner.signups += 1
+    username = f'{USERNAME_PREFIX}-new-{runner.signups}'
+    return Client().post(runner.url('accounts:signup'), {
+        'username': username, 'password1': PASSWORD, 'password2': PASSWORD, 'nickname': username,
+    })
+
+
+def scenario_login(runner):
+    return Client().post(
+        runner.url('accounts:login'), {'username': runner.rng.choice(runner.usernames), 'password': PASSWORD},
+    )
+
+
+SCENARIOS = {
+    'post_list': scenario_post_list,
+    'search': scenario_search,
+    'post_detail': scenario_post_detail,
+    'tag_list': scenario_tag_list,
+    'tag_detail': scenario_tag_detail,
+    'comment_create': scenario_comment_create,
+    'signup': scenario_signup,
+    'login': scenario_login,
+}
+
+
+class ScenarioRunner:
+    # cold_cache=True 이면 요청마다 blog 캐시를 비워 페이지/조각 캐시 없이 뷰가 하는 일을 잽니다.
+    def __init__(self, requests=200, cold_cache=False, seed=0, language=None):
+        self.requests = requests
+        self.cold_cache = cold_cache
+        self.rng = random.Random(seed)
+        # i18n_patterns 의 언어 접두사입니다. (LANGUAGE_CODE 'ko-kr' -> '/ko/')
+        self.language = language or translation.get_supported_language_variant(settings.LANGUAGE_CODE)
+        # 인기 글일수록 자주 읽히도록 댓글 수로 가중치를 줍니다.
+        rows = list(Post.objects.values_list('pk', 'comment_count'))
+        if not rows:
+            raise ValueError('게시글이 없습니다. 먼저 seed_blog 로 데이터를 만드세요.')
+        self.post_ids = [pk for pk, _ in rows]
+        self.post_weights = [count + 1 for _, count in rows]
+        # 게시글이 많은 태그일수록 자주 열리도록 게시글 수로 가중치를 줍니다.
+        tags = list(Tag.objects.filter(post_count__gt=0).exclude(name=None).values_list('name', 'post_count'))
+        self.tag_names = [name for name, _ in tags]
+        self.tag_weights = [count for _, count in tags]
+        self.usernames = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX).values_list('username', flat=True)[:100]
+        )
+        self.signups = 0
+        self.anonymous = Client()
+        self.member = Client()
+        if self.usernames:
+            self.member.login(username=self.usernames[0], password=PASSWORD)
+
+    def url(self, name, *args):
+        with translation.override(self.language):
+            return reverse(name, args=args)
+
+    def pick_post(self):
+        return self.rng.choices(self.post_ids, self.post_weights)[0]
+
+    def pick_tag(self):
+        return self.rng.choices(self.tag_names, self.tag_weights)[0]
+
+    def run(self, names=None):
+        results = {}
+        for name in names or SCENARIOS:
+            if name in ('comment_create', 'login') and not self.usernames:
+                continue
+            if name == 'tag_detail' and not self.tag_names:
+                continue
+            results[name] = self.measure(SCENARIOS[name])
+        return results
+
+    def measure(self, scenario):
+        latencies, queries, errors = [], [], 0
+        started = time.perf_counter()
+        for _ in range(self.requests):
+            if self.cold_cache:
+                caches[blog_cache.get_cache_alias()].clear()
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(counter))
+                request_started = time.perf_counter()
+                response = scenario(self)
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(counter.count)
+            if response.status_code >= 400:
+                errors += 1
+        return summarize(latencies, queries, errors, time.perf_counter() - started)
+
+
+def compare(baseline, current, metrics=('p50', 'p95', 'p99', 'queries_avg', 'rps')):
+    # 두 결과의 같은 시나리오끼리 (시나리오, 항목, 이전 값, 현재 값, 변화율%) 목록을 만듭니다.
+    rows = []
+    for section in ('scenarios', 'http'):
+        for name, values in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            label = name if section == 'scenarios' else f'http:{name}'
+            for metric in metrics:
+                if metric not in values or metric not in before:
+                    continue
+                old, new = before[metric], values[metric]
+                change = (new - old) / old * 100 if old else 0.0
+                rows.append((label, metric, old, new, change))
+    return rows
@@ -0,0 +1,205 @@
+# blog 앱의 페이지/조각 캐시 모듈입니다.
+# 캐시 키에 버전 값을 넣고, 게시글/댓글/답글/태그가 바뀌면 signals.py 에서 버전을 새로 발급해 이전 캐시를 더 이상 쓰지 않게 합니다.
+# 버전은 숫자를 증가시키지 않고 매번 새 uuid를 쓰므로, 캐시나 DB를 비운 뒤에도 예전 페이지와 키가 겹치지 않습니다.
+import hashlib
+import re
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+KEY_PREFIX = 'blog:'
+# 캐시된 HTML 안의 CSRF 토큰 자리를 표시하는 문자열입니다. 캐시에서 꺼낼 때 요청마다 새 토큰으로 바꿉니다.
+CSRF_PLACEHOLDER = '__BLOG_CSRF_TOKEN__'
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def get_cache_alias():
+    return getattr(settings, 'BLOG_CACHE_ALIAS', 'blog')
+
+
+def get_cache_timeout():
+    return getattr(settings, 'BLOG_CACHE_TIMEOUT', 600)
+
+
+def get_cache():
+    return caches[get_cache_alias()]
+
+
+def version_key(scope):
+    return f'{KEY_PREFIX}version:{scope}'
+
+
+def get_versions(*scopes):
+    # 여러 범위의 현재 버전을 한 번에 읽습니다. 아직 없으면 새로 발급합니다.
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            # 다른 요청이 먼저 발급했다면 그 값을 사용합니다.
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions.append(version)
+    return versions
+
+
+async def aget_versions(*scopes):
+    # 비동기 뷰용 get_versions() 입니다.
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    found = await cache.aget_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not await cache.aadd(key, version, timeout=None):
+                version = await cache.aget(key, version)
+        versions.append(version)
+    return versions
+
+
+def bump_versions(*scopes):
+    # 범위의 버전을 새로 발급해 해당 범위를 키에 포함한 캐시를 모두 무효화합니다.
+    get_cache().set_many({version_key(scope): uuid.uuid4().hex for scope in scopes}, timeout=None)
+
+
+# 캐시 범위 이름입니다.
+LIST_SCOPE = 'list'
+TAGS_SCOPE = 'tags'
+# 작성자 아이디/닉네임을 보여주는 페이지(목록, 상세, 댓글 조각)의 범위입니다.
+AUTHORS_SCOPE = 'authors'
+
+
+def post_scope(pk):
+    return f'post:{pk}'
+
+
+def thread_scope(pk):
+    return f'thread:{pk}'
+
+
+def invalidate_post(pk):
+    # 게시글 내용이 바뀌면 상세 페이지와 목록 페이지를 무효화합니다.
+    bump_versions(post_scope(pk), LIST_SCOPE)
+
+
+def invalidate_thread(pk):
+    # 댓글/답글이 바뀌면 댓글 조각과 그 조각을 포함한 상세 페이지를 무효화합니다.
+    bump_versions(thread_scope(pk), post_scope(pk))
+
+
+def invalidate_tags():
+    # 태그 이름이 바뀌면 태그를 보여주는 모든 페이지를 무효화합니다.
+    bump_versions(TAGS_SCOPE)
+
+
+def invalidate_authors():
+    # 작성자 아이디/닉네임이 바뀌면 작성자를 보여주는 모든 페이지를 무효화합니다. (드물게 일어나는 변경입니다)
+    bump_versions(AUTHORS_SCOPE)
+
+
+def thread_fragment_version(pk):
+    # 댓글 조각 캐시 키에 넣는 버전입니다. 댓글이 바뀌거나 작성자 이름이 바뀌면 달라집니다.
+    return '-'.join(get_versions(thread_scope(pk), AUTHORS_SCOPE))
+
+
+async def athread_fragment_version(pk):
+    return '-'.join(await aget_versions(thread_scope(pk), AUTHORS_SCOPE))
+
+
+def page_cache_key(request, versions):
+    # 경로(쿼리 포함), 언어, 버전으로 페이지 캐시 키를 만듭니다.
+    raw = '|'.join([request.get_full_path(), getattr(request, 'LANGUAGE_CODE', ''), *versions])
+    return f'{KEY_PREFIX}page:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def thread_cache_vary(request):
+    # 댓글 조각은 로그인 사용자마다 수정/삭제 링크와 CSRF 토큰이 다르므로 사용자와 CSRF 값별로 나눕니다.
+    # 비로그인 사용자에게는 사용자별 내용이 없으므로 모두 같은 조각을 씁니다.
+    if not request.user.is_authenticated:
+        return 'anonymous'
+    secret = request.META.get('CSRF_COOKIE', '')
+    return f'{request.user.pk}:{hashlib.md5(secret.encode()).hexdigest()[:12]}'
+
+
+def cacheable_response(response):
+    # 응답을 캐시에 저장할 (내용, Content-Type) 으로 바꿉니다. 저장하지 않을 응답이면 None 을 반환합니다.
+    if response.status_code != 200 or response.streaming:
+        return None
+    if hasattr(response, 'render'):
+        response.render()
+    content = response.content.decode(response.charset)
+    # 이번 요청의 CSRF 토큰은 다른 방문자에게 보여주면 안 되므로 자리 표시 문자열로 바꿔서 저장합니다.
+    match = CSRF_TOKEN_RE.search(content)
+    if match:
+        content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+    return content, response['Content-Type']
+
+
+def restore_cached_response(request, cached):
+    content, content_type = cached
+    if CSRF_PLACEHOLDER in content:
+        # 방문자마다 새 CSRF 토큰을 넣고, CsrfViewMiddleware 가 쿠키를 설정하도록 합니다.
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    return HttpResponse(content, content_type=content_type)
+
+
+class AnonymousPageCacheMixin:
+    # 비로그인 사용자의 GET 요청 응답 전체를 언어별로 캐시하는 뷰 믹스인입니다.
+    # 뷰는 get_page_cache_scopes() 로 이 페이지가 의존하는 캐시 범위를 알려줘야 합니다.
+    def get_page_cache_scopes(self):
+        raise NotImplementedError
+
+    def page_cache_hit(self):
+        # 캐시된 응답을 돌려줄 때 호출됩니다. (조회수 기록 등)
+        pass
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_cache()
+        key = page_cache_key(request, get_versions(*self.get_page_cache_scopes()))
+        cached = cache.get(key)
+        if cached is not None:
+            self.page_cache_hit()
+            return restore_cached_response(request, cached)
+        response = super().dispatch(request, *args, **kwargs)
+        cached = cacheable_response(response)
+        if cached is not None:
+            cache.set(key, cached, get_cache_timeout())
+        return response
+
+
+class AsyncAnonymousPageCacheMixin:
+    # 비동기 뷰용 AnonymousPageCacheMixin 입니다. page_cache_hit() 도 async 로 정의합니다.
+    def get_page_cache_scopes(self):
+        raise NotImplementedError
+
+    async def page_cache_hit(self):
+        pass
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Django 4.2 에는 request.auser() 가 없으므로 세션과 사용자를 스레드에서 한 번 불러 둡니다.
+        # 이후에는 뷰와 템플릿에서 request.user 를 쿼리 없이 쓸 수 있습니다.
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if request.method not in ('GET', 'HEAD') or is_authenticated:
+            return await super().dispatch(request, *args, **kwargs)
+        cache = get_cache()
+        key = page_cache_key(request, await aget_versions(*self.get_page_cache_scopes()))
+        cached = await cache.aget(key)
+        if cached is not None:
+            await self.page_cache_hit()
+            return restore_cached_response(request, cached)
+        response = await super().dispatch(request, *args, **kwargs)
+        cached = cacheable_response(response)
+        if cached is not None:
+            await cache.aset(key, cached, get_cache_timeout())
+        return response
@@ -0,0 +1,159 @@
+# 게시글 목록/상세 페이지의 조건부 GET(ETag, Last-Modified, 304 Not Modified) 처리 모듈입니다.
+#
+# ETag 는 페이지 캐시와 같은 버전 값(blog/cache.py 의 get_versions)으로 만듭니다.
+# 상세 페이지는 게시글(post:<pk>)과 댓글 목록(thread:<pk>) 버전, 목록 페이지는 목록(list) 버전을 포함하므로
+# 게시글이나 댓글이 바뀌면 signals.py 가 버전을 새로 발급하고 ETag 도 달라집니다. ETag 를 만드는 데에는 DB 쿼리가 필요 없습니다.
+# Last-Modified 는 상세 페이지는 게시글의 수정 시각과 마지막 댓글/답글 시각, 목록 페이지는 전체 게시글 중 가장 최근 값입니다.
+#
+# 브라우저/CDN 이 보낸 If-None-Match / If-Modified-Since 가 현재 값과 같으면 템플릿을 그리거나 댓글을 불러오지 않고 304 를 돌려줍니다.
+# 같은 주소라도 로그인 사용자마다 수정/삭제 링크와 CSRF 토큰이 다르므로 ETag 에 사용자 구분 값(thread_cache_vary)을 넣고,
+# 로그인 사용자의 응답은 Cache-Control: private 로 공유 캐시에 저장되지 않게 합니다.
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import cache as blog_cache
+from .models import Post
+
+
+def page_etag(request, versions):
+    # 같은 페이지라도 CSRF 토큰이 요청마다 달라 바이트 단위로 같지 않으므로 약한 ETag 를 씁니다.
+    raw = '|'.join([
+        request.get_full_path(), getattr(request, 'LANGUAGE_CODE', ''), blog_cache.thread_cache_vary(request), *versions,
+    ])
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def to_timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def post_last_modified(post):
+    return latest(post.updated_at, post.last_activity_at)
+
+
+def posts_last_modified_queryset():
+    # 가장 최근 활동 시각과 수정 시각을 각각의 인덱스에서 한 행씩만 읽어 한 번의 쿼리로 가져옵니다.
+    # (MAX 두 개를 한 SELECT 에서 구하면 SQLite 는 인덱스를 쓰지 못하고 테이블 전체를 읽습니다)
+    latest_update = Post.objects.order_by('-updated_at').values('updated_at')[:1]
+    return (
+        Post.objects.order_by('-last_activity_at')
+        .annotate(latest_update=Subquery(latest_update))
+        .values_list('last_activity_at', 'latest_update')
+    )
+
+
+def posts_last_modified():
+    return latest(*(posts_last_modified_queryset().first() or ()))
+
+
+async def aposts_last_modified():
+    return latest(*(await posts_last_modified_queryset().afirst() or ()))
+
+
+def needs_last_modified(request):
+    # If-Modified-Since 만 보낸 요청은 응답 전에 수정 시각이 필요합니다.
+    # If-None-Match 가 함께 오면 If-Modified-Since 는 보지 않으므로(RFC 9110) ETag 만으로 판단합니다.
+    return 'HTTP_IF_MODIFIED_SINCE' in request.META and 'HTTP_IF_NONE_MATCH' not in request.META
+
+
+def last_modified_key(versions):
+    # 수정 시각이 바뀌는 경우(게시글 저장, 댓글/답글 작성)에는 항상 버전도 바뀌므로 버전별로 캐시해 둡니다.
+    return f'{blog_cache.KEY_PREFIX}last_modified:{hashlib.md5("|".join(versions).encode()).hexdigest()}'
+
+
+def set_validators(request, response, etag, last_modified):
+    response.headers.setdefault('ETag', etag)
+    if last_modified is not None and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(to_timestamp(last_modified))
+    # 캐시는 해도 되지만 쓸 때마다 서버에 다시 확인(조건부 요청)하도록 합니다.
+    patch_cache_control(response, no_cache=True)
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True)
+    return response
+
+
+class ConditionalPageMixin:
+    # 목록/상세 뷰에 ETag, Last-Modified 를 붙이고 조건부 요청에 304 로 답하는 뷰 믹스인입니다.
+    # 304 도 응답 전체를 건너뛰어야 하므로 AnonymousPageCacheMixin 보다 앞에 둡니다.
+    # 뷰는 get_page_cache_scopes() 와 get_last_modified() 를 제공합니다.
+    # 수정 시각은 버전별로 캐시하므로 페이지 캐시에서 꺼내 주는 응답과 304 응답은 보통 DB 쿼리 없이 처리됩니다.
+    def get_last_modified(self):
+        return None
+
+    def page_cache_hit(self):
+        # 304 를 돌려줄 때도 호출됩니다. (조회수 기록 등)
+        pass
+
+    def cached_last_modified(self, versions):
+        cache = blog_cache.get_cache()
+        key = last_modified_key(versions)
+        last_modified = cache.get(key)
+        if last_modified is None:
+            last_modified = self.get_last_modified()
+            if last_modified is not None:
+                cache.set(key, last_modified, blog_cache.get_cache_timeout())
+        return last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        versions = blog_cache.get_versions(*self.get_page_cache_scopes())
+        etag = page_etag(request, versions)
+        last_modified = self.cached_last_modified(versions) if needs_last_modified(request) else None
+        response = get_conditional_response(request, etag=etag, last_modified=to_timestamp(last_modified))
+        if response is not None:
+            self.page_cache_hit()
+            return set_validators(request, response, etag, last_modified)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if last_modified is None:
+            last_modified = self.cached_last_modified(versions)
+        return set_validators(request, response, etag, last_modified)
+
+
+class AsyncConditionalPageMixin:
+    # 비동기 뷰용 ConditionalPageMixin 입니다. aget_last_modified(), page_cache_hit() 를 async 로 정의합니다.
+    async def aget_last_modified(self):
+        return None
+
+    async def page_cache_hit(self):
+        pass
+
+    async def acached_last_modified(self, versions):
+        cache = blog_cache.get_cache()
+        key = last_modified_key(versions)
+        last_modified = await cache.aget(key)
+        if last_modified is None:
+            last_modified = await self.aget_last_modified()
+            if last_modified is not None:
+                await cache.aset(key, last_modified, blog_cache.get_cache_timeout())
+        return last_modified
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+        # ETag 에 넣을 사용자 구분 값 때문에 세션과 사용자를 스레드에서 한 번 불러 둡니다.
+        await sync_to_async(lambda: request.user.is_authenticated)()
+        versions = await blog_cache.aget_versions(*self.get_page_cache_scopes())
+        etag = page_etag(request, versions)
+        last_modified = await self.acached_last_modified(versions) if needs_last_modified(request) else None
+        response = get_conditional_response(request, etag=etag, last_modified=to_timestamp(last_modified))
+        if response is not None:
+            await self.page_cache_hit()
+            return set_validators(request, response, etag, last_modified)
+        response = await super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if last_modified is None:
+            last_modified = await self.acached_last_modified(versions)
+        return set_validators(request, response, etag, last_modified)
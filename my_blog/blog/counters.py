@@ -0,0 +1,66 @@
+# 게시글의 댓글 수, 답글 수, 마지막 활동 시각(Post.comment_count, reply_count, last_activity_at)을 관리하는 모듈입니다.
+# 목록 페이지가 행마다 COUNT/MAX 집계를 하지 않도록 값을 게시글에 저장해 두고,
+# 댓글/답글이 생기거나 지워질 때 signals.py 에서 UPDATE ... SET comment_count = comment_count + 1 처럼 F() 로 갱신합니다.
+# 일괄 생성(bulk_create)처럼 시그널이 나가지 않는 경로로 어긋난 값은 manage.py reconcile_post_counters 로 바로잡습니다.
+from django.db.models import Count, DateTimeField, F, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Post
+
+FIELDS = {
+    'comment': 'comment_count',
+    'reply': 'reply_count',
+}
+
+
+def record_added(kind, post_id, at):
+    # 댓글/답글이 하나 생겼을 때 개수를 늘리고 마지막 활동 시각을 앞당깁니다.
+    field = FIELDS[kind]
+    Post.objects.filter(pk=post_id).update(**{
+        field: F(field) + 1,
+        'last_activity_at': Greatest(F('last_activity_at'), Value(at, output_field=DateTimeField())),
+    })
+
+
+def record_removed(kind, post_id):
+    # 댓글/답글이 지워졌을 때 개수를 줄입니다. 이미 어긋난 값이 음수가 되지 않도록 0 에서 멈춥니다.
+    # 마지막 활동 시각은 되돌리지 않습니다. (필요하면 reconcile_post_counters 가 다시 계산합니다)
+    field = FIELDS[kind]
+    Post.objects.filter(pk=post_id).update(**{field: Greatest(F(field) - 1, Value(0))})
+
+
+def actual_values(post_model, comment_model, reply_model):
+    # 댓글/답글 테이블에서 다시 계산한 값입니다. 마이그레이션에서도 쓰도록 모델을 인자로 받습니다.
+    def aggregate(model, expression):
+        return Subquery(
+            model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(value=expression).values('value')
+        )
+
+    return {
+        'comment_count': Coalesce(aggregate(comment_model, Count('pk')), 0, output_field=IntegerField()),
+        'reply_count': Coalesce(aggregate(reply_model, Count('pk')), 0, output_field=IntegerField()),
+        'last_activity_at': Greatest(
+            F('created_at'),
+            Coalesce(aggregate(comment_model, Max('created_at')), F('created_at')),
+            Coalesce(aggregate(reply_model, Max('created_at')), F('created_at')),
+        ),
+    }
+
+
+def reconcile(post_model, comment_model, reply_model, chunk_size=500, dry_run=False):
+    # 저장된 값과 실제 값이 다른 게시글만 찾아 chunk_size 개씩 한 번의 UPDATE 로 고칩니다. 고친(고칠) 게시글 수를 반환합니다.
+    actual = actual_values(post_model, comment_model, reply_model)
+    drifted = (
+        post_model.objects.annotate(**{f'actual_{name}': value for name, value in actual.items()})
+        .filter(
+            ~Q(comment_count=F('actual_comment_count'))
+            | ~Q(reply_count=F('actual_reply_count'))
+            | ~Q(last_activity_at=F('actual_last_activity_at'))
+        )
+        .values_list('pk', flat=True)
+    )
+    pks = list(drifted)
+    if not dry_run:
+        for start in range(0, len(pks), chunk_size):
+            post_model.objects.filter(pk__in=pks[start:start + chunk_size]).update(**actual)
+    return len(pks)
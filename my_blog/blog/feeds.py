@@ -0,0 +1,184 @@
+# 최신 글, 태그별, 작성자별 게시글 피드(RSS 2.0, Atom 1.0, JSON Feed 1.1) 모듈입니다.
+#
+# 피드는 두 단계로 blog 캐시에 저장합니다.
+#   항목: 게시글 하나를 피드 항목으로 바꾼 값입니다. 키에 게시글 버전(post:<pk>)과 태그 버전이 들어가므로
+#         게시글이 저장되거나 태그가 바뀌면 그 게시글의 항목만 다시 만들고 나머지는 캐시된 항목을 그대로 씁니다.
+#   문서: 완성된 피드 본문입니다. 키에 목록/태그/작성자 버전이 들어가므로 게시글이 저장되면 다음 요청에서 다시 조립합니다.
+# 다시 조립할 때도 게시글 id 는 인덱스에서 ITEMS 개만 읽고, 캐시에 없는 항목의 게시글만 DB 에서 불러옵니다.
+# 버전이 그대로면 피드 요청은 캐시 조회만으로 끝나며, views.PostFeedView 는 조건부 요청(ETag/Last-Modified)에 304 로 답합니다.
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.translation import get_language
+
+from accounts.authors import get_authors
+
+from . import cache as blog_cache
+from .models import Post, PostTag, Tag
+
+DEFAULTS = {
+    # 피드 하나에 넣는 최대 게시글 수입니다.
+    'ITEMS': 20,
+    'TITLE': 'My Blog',
+    'DESCRIPTION': '',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BLOG_FEEDS', {}))
+    return config
+
+
+class JSONFeed(feedgenerator.SyndicationFeed):
+    # JSON Feed 1.1 (https://www.jsonfeed.org/version/1.1/) 형식입니다.
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+            'items': [self.item_dict(item) for item in self.items],
+        }
+        outfile.write(json.dumps({key: value for key, value in feed.items() if value}, ensure_ascii=False))
+
+    def item_dict(self, item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_html': item['description'],
+            'date_published': item['pubdate'].isoformat() if item['pubdate'] else None,
+            'date_modified': item['updateddate'].isoformat() if item['updateddate'] else None,
+            'authors': [{'name': item['author_name']}] if item['author_name'] else None,
+            'tags': list(item['categories']) or None,
+        }
+        return {key: value for key, value in data.items() if value is not None}
+
+
+FORMATS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+    'json': JSONFeed,
+}
+
+
+def feed_source(kind, value, limit):
+    # 피드 종류별로 (제목, 사이트 주소 경로, 최신순 게시글 id 목록) 을 반환합니다. id 는 인덱스에서 limit 개만 읽습니다.
+    title = get_config()['TITLE']
+    if kind == 'latest':
+        ids = Post.objects.order_by('-created_at', '-id').values_list('pk', flat=True)[:limit]
+        return title, reverse('blog:post_list'), list(ids)
+    if kind == 'tag':
+        # 태그 페이지와 같이 중간 테이블의 (tag_id, post_id) 인덱스에서 읽습니다.
+        tag = get_object_or_404(Tag, name=value)
+        ids = PostTag.objects.filter(tag=tag).order_by('-post_id').values_list('post_id', flat=True)[:limit]
+        return f'{title} - #{tag.name}', reverse('blog:tag_detail', args=[tag.name]), list(ids)
+    if kind == 'author':
+        user = get_object_or_404(get_user_model(), username=value)
+        ids = Post.objects.filter(user=user).order_by('-created_at', '-id').values_list('pk', flat=True)[:limit]
+        return f'{title} - {user.username}', reverse('blog:post_list'), list(ids)
+    raise Http404('없는 피드입니다.')
+
+
+def item_key(pk, versions):
+    # 항목에는 언어별 주소가 들어가므로 언어도 키에 넣습니다.
+    raw = '|'.join([str(pk), get_language() or '', *versions])
+    return f'{blog_cache.KEY_PREFIX}feed-item:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def build_item(post):
+    # 게시글 하나를 피드 항목 값으로 바꿉니다. 작성자 이름은 조립할 때 작성자 캐시에서 붙입니다.
+    return {
+        'title': post.title,
+        'path': reverse('blog:post_detail', args=[post.pk]),
+        'description': post.content_html,
+        'pubdate': post.created_at,
+        'updateddate': post.updated_at,
+        'categories': [tag.name for tag in post.tags.all() if tag.name],
+        'user_id': post.user_id,
+    }
+
+
+def load_items(ids):
+    # 게시글 id 순서대로 피드 항목을 반환합니다. 캐시에 없는 항목만 한 번에 불러와 만들고 캐시에 넣습니다.
+    if not ids:
+        return []
+    cache = blog_cache.get_cache()
+    tags_version, *post_versions = blog_cache.get_versions(
+        blog_cache.TAGS_SCOPE, *(blog_cache.post_scope(pk) for pk in ids),
+    )
+    keys = {pk: item_key(pk, [version, tags_version]) for pk, version in zip(ids, post_versions)}
+    found = cache.get_many(list(keys.values()))
+    missing = [pk for pk in ids if keys[pk] not in found]
+    if missing:
+        posts = Post.objects.defer('content').prefetch_related('tags').in_bulk(missing)
+        built = {keys[pk]: build_item(post) for pk, post in posts.items()}
+        cache.set_many(built, blog_cache.get_cache_timeout())
+        found.update(built)
+    return [found[keys[pk]] for pk in ids if keys[pk] in found]
+
+
+def build_document(request, kind, value, feed_format):
+    config = get_config()
+    title, path, ids = feed_source(kind, value, config['ITEMS'])
+    items = load_items(ids)
+    authors = get_authors(item['user_id'] for item in items)
+    feed = FORMATS[feed_format](
+        title=title,
+        link=request.build_absolute_uri(path),
+        description=config['DESCRIPTION'],
+        language=get_language(),
+        feed_url=request.build_absolute_uri(request.path),
+    )
+    for item in items:
+        link = request.build_absolute_uri(item['path'])
+        author = authors.get(item['user_id'])
+        feed.add_item(
+            title=item['title'],
+            link=link,
+            description=item['description'],
+            unique_id=link,
+            unique_id_is_permalink=True,
+            pubdate=item['pubdate'],
+            updateddate=item['updateddate'],
+            categories=item['categories'],
+            author_name=author.display_name if author else None,
+        )
+    return {
+        'content': feed.writeString('utf-8'),
+        'content_type': feed.content_type,
+        'last_modified': feed.latest_post_date(),
+    }
+
+
+def document_key(request, kind, value, feed_format, versions):
+    # 피드 안의 주소는 절대 주소이므로 요청한 호스트와 scheme 도 키에 넣습니다.
+    raw = '|'.join([
+        request.scheme, request.get_host(), getattr(request, 'LANGUAGE_CODE', ''),
+        kind, value or '', feed_format, *versions,
+    ])
+    return f'{blog_cache.KEY_PREFIX}feed:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def get_feed(request, kind, value, feed_format, versions):
+    # 캐시된 피드 문서 {'content', 'content_type', 'last_modified'} 를 반환하고, 없으면 조립해서 캐시에 넣습니다.
+    if feed_format not in FORMATS:
+        raise Http404('지원하지 않는 피드 형식입니다.')
+    cache = blog_cache.get_cache()
+    key = document_key(request, kind, value, feed_format, versions)
+    document = cache.get(key)
+    if document is None:
+        document = build_document(request, kind, value, feed_format)
+        cache.set(key, document, blog_cache.get_cache_timeout())
+    return document
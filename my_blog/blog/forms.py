@@ -1,12 +1,19 @@
 # Django에서 제공하는 forms 모듈을 가져옵니다. 이 모듈은 HTML form에 대응하는 Python 클래스를 제공합니다.
 from django import forms
+from django.db import transaction
 # 현재 디렉토리의 models.py 파일에서 Post, Comment, Tag, Reply 모델을 가져옵니다.
 from .models import Post, Comment, Tag, Reply
+# 태그를 한 번에 연결하는 서비스를 가져옵니다.
+from .tags import set_post_tags
+# 조각 업로드로 미리 올린 첨부 파일을 찾는 함수를 가져옵니다.
+from .uploads import completed_upload
 
 # PostForm은 Post 모델에 대한 정보를 입력받는 HTML form에 대응하는 Python 클래스입니다.
 class PostForm(forms.ModelForm):
     # 사용자로부터 태그 정보를 입력받는 필드를 추가합니다.
     tags = forms.CharField()
+    # 큰 파일을 조각 업로드(blog/uploads.py)로 미리 올렸다면 그 업로드 id 입니다. 있으면 file_upload 대신 첨부합니다.
+    upload_id = forms.UUIDField(required=False, widget=forms.HiddenInput)
 
     # 내부 Meta 클래스는 이 폼이 어떤 모델과 관련이 있는지, 그리고 모델의 어떤 필드에 대응하는 입력을 받는지 Django에게 알려줍니다.
     class Meta:
@@ -15,12 +22,40 @@ class PostForm(forms.ModelForm):
         # Post 모델의 'title', 'content', 'thumb_image', 'file_upload', 'tags' 필드에 대응하는 입력을 받습니다.
         fields = ['title', 'content', 'thumb_image', 'file_upload', 'tags'] 
 
+    # 수정 폼에서는 게시글의 기존 태그를 쉼표로 이어서 보여줍니다.
+    # user 는 upload_id 가 본인이 올린 업로드인지 확인할 때 사용합니다.
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if self.instance.pk and not self.is_bound:
+            self.initial['tags'] = ', '.join(self.instance.tags.values_list('name', flat=True))
+
+    # 완료된 본인의 업로드만 첨부할 수 있습니다.
+    def clean_upload_id(self):
+        upload_id = self.cleaned_data.get('upload_id')
+        if not upload_id:
+            return None
+        upload = completed_upload(upload_id, self.user) if self.user is not None else None
+        if upload is None:
+            raise forms.ValidationError('완료된 업로드를 찾을 수 없습니다.')
+        return upload
+
     # save 메소드는 사용자로부터 받은 입력을 바탕으로 Post 객체를 생성하고 데이터베이스에 저장합니다.
     def save(self, commit=True):
         # super().save(commit=False)는 Post 객체를 생성하지만 아직 데이터베이스에 저장하지는 않습니다.
         instance = super().save(commit=False)
-        # 생성한 Post 객체를 데이터베이스에 저장합니다.
-        instance.save()
+        upload = self.cleaned_data.get('upload_id')
+        if upload is not None:
+            # 조각 업로드로 이미 저장소에 옮겨 둔 파일을 그대로 첨부합니다.
+            instance.file_upload.name = upload.file
+        if commit:
+            # 게시글은 한 번만 저장하고, 태그 연결까지 하나의 트랜잭션으로 처리합니다.
+            with transaction.atomic():
+                instance.save()
+                set_post_tags(instance, self.cleaned_data.get('tags', ''))
+                if upload is not None:
+                    # 첨부된 업로드 기록은 지워 cleanup_uploads 가 파일을 지우지 않게 합니다.
+                    upload.delete()
         # 저장한 Post 객체를 반환합니다.
         return instance
 
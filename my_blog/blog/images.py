@@ -0,0 +1,92 @@
+# 게시글 썸네일 이미지(Post.thumb_image)의 크기별 파생 이미지를 만드는 모듈입니다.
+# 원본 옆에 'photo_640w.webp', 'photo_640w.jpg' 처럼 너비별 WebP/JPEG 파일을 EXIF 없이 저장하고,
+# 만든 너비 목록을 Post.thumb_variants 에 기록해 템플릿이 파일 존재를 확인하지 않고 srcset을 만들 수 있게 합니다.
+import io
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# 만들 이미지 너비(px)와 형식별 (확장자, Pillow 형식, 저장 옵션)입니다.
+DEFAULT_WIDTHS = (320, 640, 1280)
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def get_widths():
+    return tuple(getattr(settings, 'BLOG_IMAGE_WIDTHS', DEFAULT_WIDTHS))
+
+
+def derivative_name(name, width, ext):
+    # 'blog/images/2023/11/01/photo.jpg' -> 'blog/images/2023/11/01/photo_640w.webp'
+    root, _ = posixpath.splitext(name)
+    return f'{root}_{width}w.{ext}'
+
+
+def render_derivatives(data, widths=None):
+    # 원본 이미지 바이트로 {(너비, 확장자): 바이트} 를 만듭니다. 저장소/DB에 접근하지 않으므로 다른 프로세스에서 실행할 수 있습니다.
+    widths = widths or get_widths()
+    with Image.open(io.BytesIO(data)) as original:
+        # 휴대폰 사진의 회전 정보(EXIF Orientation)를 픽셀에 반영한 뒤 EXIF 없이 새로 저장합니다.
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        # 원본보다 큰 이미지는 만들지 않지만, 가장 작은 너비는 항상 하나 만듭니다.
+        targets = [w for w in sorted(widths) if w < image.width] or [min(image.width, min(widths))]
+        results = {}
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for ext, fmt, options in FORMATS:
+                buffer = io.BytesIO()
+                resized.save(buffer, fmt, **options)
+                results[(width, ext)] = buffer.getvalue()
+        return results
+
+
+def save_derivatives(field_file, rendered):
+    # 만든 파생 이미지를 원본과 같은 저장소, 같은 폴더에 저장하고 너비 목록을 반환합니다.
+    storage = field_file.storage
+    for (width, ext), data in rendered.items():
+        name = derivative_name(field_file.name, width, ext)
+        # 같은 이름이 있으면 저장소가 다른 이름을 붙이므로 먼저 지웁니다.
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(data))
+    return sorted({width for width, _ in rendered})
+
+
+def variants_are_current(post):
+    variants = post.thumb_variants or {}
+    return bool(post.thumb_image) and variants.get('source') == post.thumb_image.name
+
+
+def generate_post_derivatives(post, force=False):
+    # 게시글 썸네일의 파생 이미지를 만들고 thumb_variants 를 갱신합니다. 만들었으면 True를 반환합니다.
+    from . import cache as blog_cache
+    from .models import Post
+
+    if not post.thumb_image:
+        if post.thumb_variants:
+            Post.objects.filter(pk=post.pk).update(thumb_variants={})
+            post.thumb_variants = {}
+        return False
+    if not force and variants_are_current(post):
+        return False
+    with post.thumb_image.open('rb') as f:
+        data = f.read()
+    widths = save_derivatives(post.thumb_image, render_derivatives(data))
+    record_variants(post, {'source': post.thumb_image.name, 'widths': widths})
+    blog_cache.invalidate_post(post.pk)
+    return True
+
+
+def record_variants(post, variants):
+    # save() 를 다시 호출하지 않도록 update() 로 기록합니다.
+    from .models import Post
+
+    Post.objects.filter(pk=post.pk).update(thumb_variants=variants)
+    post.thumb_variants = variants
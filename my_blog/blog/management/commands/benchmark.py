@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from blog import benchmark
+from blog.models import Comment, Post, Reply
+
+from .loadtest import run_load
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # 요청마다 남는 접속 로그가 측정을 방해하지 않도록 끕니다.
+    def log_message(self, format, *args):
+        pass
+
+
+# 가상 데이터를 넣은 별도 DB에서 블로그 주요 요청(목록, 검색, 상세, 태그, 댓글 작성, 회원가입, 로그인)의
+# 응답 시간(p50/p95/p99), 요청당 쿼리 수, 처리량을 재고 결과를 JSON 기준값으로 저장/비교하는 관리 명령입니다.
+# 예)
+#   python manage.py benchmark --save bench/baseline.json
+#   (코드 수정 후) python manage.py benchmark --compare bench/baseline.json
+#   python manage.py benchmark --http --concurrency 10 50    # 프로세스 안에 HTTP 서버를 띄워 동시 요청 처리량도 측정
+# 실제 DB는 건드리지 않도록 테스트 DB(SQLite 는 임시 폴더의 파일)를 만들어 쓰고 끝나면 지웁니다.
+# --keepdb 를 주면 DB를 남겨 두고 다음 실행에서 데이터 생성 없이 다시 씁니다.
+# 회원가입/로그인이 비밀번호 해시 계산 시간만 재지 않도록 기본으로 빠른 해셔(settings.PASSWORD_HASHER_PROFILES['fast'])를 씁니다.
+class Command(BaseCommand):
+    help = '가상 데이터를 넣은 테스트 DB에서 블로그 요청의 응답 시간, 쿼리 수, 처리량을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='만들 사용자 수')
+        parser.add_argument('--posts', type=int, default=2000, help='만들 게시글 수')
+        parser.add_argument('--comments', type=int, default=20000, help='만들 댓글 수 (답글은 절반)')
+        parser.add_argument('--seed', type=int, default=0, help='데이터와 요청 순서를 정하는 난수 시드')
+        parser.add_argument('--requests', type=int, default=200, help='시나리오마다 보낼 요청 수')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios', choices=list(benchmark.SCENARIOS),
+            help='실행할 시나리오, 여러 번 지정할 수 있습니다. (기본: 전부)',
+        )
+        parser.add_argument('--cold-cache', action='store_true', help='요청마다 blog 캐시를 비우고 측정합니다.')
+        parser.add_argument('--http', action='store_true', help='HTTP 서버를 띄워 동시 요청 처리량도 측정합니다.')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50], help='--http 의 동시 접속 수 목록')
+        parser.add_argument('--duration', type=float, default=5.0, help='--http 에서 동시 접속 수마다 측정할 시간(초)')
+        parser.add_argument('--save', help='결과를 저장할 JSON 파일')
+        parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+        parser.add_argument('--keepdb', action='store_true', help='측정용 DB를 지우지 않고 다음에 다시 씁니다.')
+        parser.add_argument(
+            '--password-hashers', choices=list(settings.PASSWORD_HASHER_PROFILES), default='fast',
+            help='비밀번호 해셔 설정 (기본: fast, 실제 해시 비용까지 재려면 default)',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'비교할 결과를 읽을 수 없습니다: {e}')
+
+        # get_wsgi_application() 은 로깅 설정을 다시 적용하므로 로그 수준을 바꾸기 전에 만듭니다.
+        application = get_wsgi_application() if options['http'] else None
+        # 요청마다 남는 성능 로그(blogbase/profiling.py)를 끕니다. 예산 초과 경고는 그대로 남깁니다.
+        logging.getLogger('my.profiling').setLevel(logging.WARNING)
+        if connections['default'].vendor == 'sqlite':
+            # 메모리 DB 대신 파일을 써서 WAL/mmap 같은 실제 연결 설정이 적용된 상태로 잽니다.
+            connections['default'].settings_dict['TEST']['NAME'] = os.path.join(
+                tempfile.gettempdir(), 'blog_benchmark.sqlite3',
+            )
+        verbosity = options['verbosity']
+        hashers = override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES[options['password_hashers']])
+        hashers.enable()
+        old_config = setup_databases(verbosity, interactive=False, keepdb=options['keepdb'], serialized_aliases=set())
+        try:
+            if not Post.objects.exists():
+                benchmark.seed(
+                    users=options['users'], posts=options['posts'], comments=options['comments'],
+                    seed=options['seed'], log=self.stdout.write if verbosity > 1 else None,
+                )
+            result = {
+                'created': timezone.now().isoformat(),
+                'django': django.get_version(),
+                'debug': settings.DEBUG,
+                'options': {key: options[key] for key in ('requests', 'cold_cache', 'seed', 'password_hashers')},
+                'dataset': {
+                    'users': User.objects.count(), 'posts': Post.objects.count(),
+                    'comments': Comment.objects.count(), 'replies': Reply.objects.count(),
+                },
+            }
+            runner = benchmark.ScenarioRunner(
+                requests=options['requests'], cold_cache=options['cold_cache'], seed=options['seed'],
+            )
+            result['scenarios'] = runner.run(options['scenarios'])
+            if options['http']:
+                result['http'] = self.run_http(application, runner, options)
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options['keepdb'])
+            hashers.disable()
+
+        self.report(result)
+        if baseline is not None:
+            self.report_changes(baseline, result)
+        if options['save']:
+            directory = os.path.dirname(options['save'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['save'], 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'결과를 {options["save"]} 에 저장했습니다.'))
+
+    def run_http(self, application, runner, options):
+        # 같은 프로세스의 스레드 서버에 loadtest 와 같은 방식으로 동시 요청을 보냅니다.
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+        server.set_app(application)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        host, port = server.server_address[:2]
+        targets = {
+            'post_list': [runner.url('blog:post_list')],
+            'search': [f'{runner.url("blog:post_list")}?q={word}' for word in benchmark.WORDS[20:30]],
+            'post_detail': [runner.url('blog:post_detail', runner.pick_post()) for _ in range(20)],
+        }
+        results = {}
+        try:
+            for name, paths in targets.items():
+                for concurrency in options['concurrency']:
+                    load = asyncio.run(run_load(
+                        host, port, paths, concurrency, options['duration'], 30.0, options['cold_cache'],
+                    ))
+                    results[f'{name}@{concurrency}'] = {key: round(value, 2) for key, value in load.items()}
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def report(self, result):
+        self.stdout.write(f'데이터: {result["dataset"]} (DEBUG={result["debug"]})')
+        self.stdout.write(
+            f'{"시나리오":<16}{"요청":>7}{"req/s":>9}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}'
+            f'{"쿼리평균":>9}{"쿼리최대":>9}{"오류":>6}'
+        )
+        for name, values in result['scenarios'].items():
+            self.stdout.write(
+                f'{name:<16}{values["requests"]:>7}{values["rps"]:>9.1f}{values["p50"]:>10.2f}{values["p95"]:>10.2f}'
+                f'{values["p99"]:>10.2f}{values["queries_avg"]:>9.2f}{values["queries_max"]:>9}{values["errors"]:>6}'
+            )
+        for name, values in result.get('http', {}).items():
+            self.stdout.write(
+                f'{"http:" + name:<16}{values["requests"]:>7}{values["rps"]:>9.1f}{values["p50"]:>10.2f}'
+                f'{values["p95"]:>10.2f}{values["p99"]:>10.2f}{"-":>9}{"-":>9}{values["errors"]:>6}'
+            )
+
+    def report_changes(self, baseline, result):
+        if baseline.get('dataset') != result['dataset'] or baseline.get('options') != result['options']:
+            self.stdout.write(self.style.WARNING('기준값과 데이터 크기 또는 측정 옵션이 다릅니다. 비교 결과를 주의해서 보세요.'))
+        self.stdout.write(f'{"시나리오":<22}{"항목":<13}{"이전":>10}{"현재":>10}{"변화":>9}')
+        for name, metric, old, new, change in benchmark.compare(baseline, result):
+            # 처리량은 늘어야, 나머지는 줄어야 좋아진 것입니다. 10% 이상 나빠지면 강조합니다.
+            worse = change < -10 if metric == 'rps' else change > 10
+            line = f'{name:<22}{metric:<13}{old:>10}{new:>10}{change:>+8.1f}%'
+            self.stdout.write(self.style.WARNING(line) if worse else line)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blogbase.db import primary_pin_scope
+from blog import sitemaps
+
+
+# 사이트맵 파일(sitemap.xml, sitemap-N.xml.gz)을 다시 만드는 관리 명령입니다.
+# 게시글이 저장/삭제될 때는 해당 조각만 자동으로 다시 쓰므로, 처음 배포할 때나 설정(BASE_URL, LANGUAGES)을 바꾼 뒤에 실행합니다.
+class Command(BaseCommand):
+    help = '게시글과 고정 페이지의 사이트맵 파일과 색인을 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shard', type=int, help='이 번호의 게시글 조각과 색인만 다시 만듭니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        directory = sitemaps.get_directory()
+        if options['shard'] is not None:
+            if options['shard'] < 1:
+                raise CommandError('--shard 는 1 이상이어야 합니다.')
+            sitemaps.update_shard(options['shard'])
+            self.stdout.write(self.style.SUCCESS(f'{directory} 에 사이트맵 조각 {options["shard"]}번을 다시 만들었습니다.'))
+            return
+        count = sitemaps.build_all()
+        self.stdout.write(self.style.SUCCESS(f'{directory} 에 게시글 사이트맵 조각 {count}개와 색인을 만들었습니다.'))
@@ -0,0 +1,56 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blogbase.db import primary_pin_scope
+from blog.models import ChunkedUpload
+from blog.uploads import STAGING_SUFFIX, get_config, get_staging_dir, remove_upload_files
+
+
+# 조각 업로드(blog/uploads.py) 중 오래 멈췄거나 완료 후 게시글에 첨부되지 않은 업로드와 그 파일을 지우는 관리 명령입니다.
+# 업로드 기록이 없는 임시 파일(사용자 삭제 등으로 남은 파일)도 함께 지웁니다. cron 등으로 주기적으로 실행합니다.
+class Command(BaseCommand):
+    help = '오래된 조각 업로드와 남은 임시 파일을 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None,
+            help='이 시간(초) 동안 변화가 없는 업로드를 지웁니다. (기본: BLOG_CHUNKED_UPLOADS 의 EXPIRE_AFTER)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 지울 개수만 출력합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        older_than = options['older_than']
+        if older_than is None:
+            older_than = get_config()['EXPIRE_AFTER']
+        dry_run = options['dry_run']
+
+        expired = ChunkedUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=older_than))
+        removed = 0
+        for upload in expired.iterator():
+            if not dry_run:
+                remove_upload_files(upload)
+                upload.delete()
+            removed += 1
+
+        # 기록이 없는 임시 파일은 파일의 수정 시각으로 판단합니다.
+        orphans = 0
+        staging_dir = get_staging_dir()
+        if staging_dir.is_dir():
+            cutoff = time.time() - older_than
+            known = {upload_id.hex for upload_id in ChunkedUpload.objects.values_list('pk', flat=True)}
+            for path in staging_dir.glob(f'*{STAGING_SUFFIX}'):
+                if path.stem in known or path.stat().st_mtime >= cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                orphans += 1
+
+        if dry_run:
+            self.stdout.write(f'지울 업로드 {removed}개, 임시 파일 {orphans}개를 찾았습니다.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'업로드 {removed}개, 임시 파일 {orphans}개를 지웠습니다.'))
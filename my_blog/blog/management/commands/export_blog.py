@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog import transfer
+
+
+# 게시글, 태그, 댓글, 답글과 게시글 파일을 폴더로 내보내는 관리 명령입니다. (blog/transfer.py)
+# 다른 인스턴스에서 manage.py import_blog <폴더> 로 가져옵니다.
+class Command(BaseCommand):
+    help = '블로그 글과 첨부 파일을 NDJSON 내보내기 폴더로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='내보낼 폴더 (없으면 만듭니다)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='DB 에서 한 번에 읽어 올 행 수')
+        parser.add_argument('--no-media', action='store_true', help='썸네일과 첨부 파일은 복사하지 않습니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        counts = transfer.export_blog(
+            options['directory'], chunk_size=options['chunk_size'], media=not options['no_media'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{options["directory"]} 에 내보냈습니다. {counts}'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog.models import Post
+from blog.viewcount import get_view_counter
+
+
+# 버퍼에 쌓인 조회수를 즉시 DB에 반영하는 관리 명령입니다.
+# 공유 캐시를 쓰는 CacheBackend 에서만 웹 프로세스가 모은 조회수를 반영할 수 있습니다.
+# MemoryBackend 의 버퍼는 각 웹 프로세스 메모리에 있으므로 그 프로세스가 주기적으로, 그리고 종료할 때 반영합니다.
+class Command(BaseCommand):
+    help = '버퍼에 쌓인 게시글 조회수를 즉시 DB에 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='한 번에 확인할 게시글 수',
+        )
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        counter = get_view_counter()
+        chunk_size = options['chunk_size']
+        # 이 프로세스의 버퍼를 먼저 반영합니다.
+        total = counter.flush()
+        if not counter.shared:
+            self.stdout.write(self.style.WARNING(
+                '조회수 버퍼가 웹 프로세스마다 따로 있어(MemoryBackend 또는 locmem 캐시) 이 명령으로는 반영할 수 없습니다. '
+                '반영한 조회수가 없습니다. (BLOG_VIEW_COUNTER 의 BACKEND 를 공유 캐시를 쓰는 CacheBackend 로 바꾸세요)'
+            ))
+            return
+        # 공유 캐시 버퍼는 다른 프로세스가 기록한 조회수도 있으므로 모든 게시글을 나눠서 확인합니다.
+        # 읽는 중인 테이블에 반영(UPDATE)하지 않도록 iterator() 대신 마지막 pk 다음부터 다시 읽습니다.
+        last_pk = 0
+        while True:
+            chunk = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            total += counter.flush(chunk)
+            last_pk = chunk[-1]
+        self.stdout.write(self.style.SUCCESS(f'조회수 {total}건을 반영했습니다.'))
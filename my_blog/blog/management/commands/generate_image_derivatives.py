@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blogbase.db import primary_pin_scope
+from blog.images import record_variants, render_derivatives, save_derivatives, variants_are_current
+from blog.models import Post
+from blog import cache as blog_cache
+
+
+def render_file(path):
+    # 작업 프로세스에서 실행됩니다. 파일을 읽어 파생 이미지 바이트만 만들어 돌려줍니다.
+    with open(path, 'rb') as f:
+        return render_derivatives(f.read())
+
+
+# 기존 게시글 썸네일의 파생 이미지를 여러 프로세스로 나눠 만드는 관리 명령입니다.
+class Command(BaseCommand):
+    help = '게시글 썸네일의 크기별 WebP/JPEG 파생 이미지를 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='이미지를 처리할 프로세스 수 (기본: CPU 수)')
+        parser.add_argument('--force', action='store_true', help='이미 만든 파생 이미지도 다시 만듭니다.')
+        parser.add_argument('--chunk-size', type=int, default=200, help='한 번에 작업에 넘길 게시글 수')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(thumb_image='').only('id', 'thumb_image', 'thumb_variants').order_by('pk')
+        # 작업 프로세스가 부모의 DB 연결을 물려받지 않도록 먼저 닫습니다.
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            chunk = []
+            for post in posts.iterator(chunk_size=options['chunk_size']):
+                if not options['force'] and variants_are_current(post):
+                    continue
+                chunk.append(post)
+                if len(chunk) >= options['chunk_size']:
+                    d, f = self.process(executor, chunk)
+                    done, failed = done + d, failed + f
+                    chunk = []
+            if chunk:
+                d, f = self.process(executor, chunk)
+                done, failed = done + d, failed + f
+        self.stdout.write(self.style.SUCCESS(f'파생 이미지 생성 완료: {done}건, 실패: {failed}건'))
+
+    def process(self, executor, posts):
+        # 이미지 변환은 작업 프로세스에서, 파일 저장과 DB 기록은 이 프로세스에서 처리합니다.
+        futures = {executor.submit(render_file, post.thumb_image.path): post for post in posts}
+        done = failed = 0
+        for future in as_completed(futures):
+            post = futures[future]
+            try:
+                widths = save_derivatives(post.thumb_image, future.result())
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'게시글 {post.pk}: {exc}')
+                continue
+            record_variants(post, {'source': post.thumb_image.name, 'widths': widths})
+            blog_cache.invalidate_post(post.pk)
+            done += 1
+        return done, failed
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blogbase.db import primary_pin_scope
+from blog import transfer
+
+
+# export_blog 로 만든 폴더의 게시글, 태그, 댓글, 답글과 파일을 현재 DB 에 더하는 관리 명령입니다. (blog/transfer.py)
+# 기존 글은 그대로 두고, 사용자는 아이디로, 태그는 이름으로 기존 것에 연결합니다.
+class Command(BaseCommand):
+    help = '내보내기 폴더의 블로그 글과 첨부 파일을 가져옵니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='export_blog 로 만든 폴더')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번의 bulk_create 로 넣을 행 수')
+        parser.add_argument('--no-media', action='store_true', help='썸네일과 첨부 파일은 복사하지 않습니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        try:
+            counts = transfer.import_blog(
+                options['directory'], batch_size=options['batch_size'], media=not options['no_media'],
+                log=self.stdout.write,
+            )
+        except transfer.TransferError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'가져왔습니다. {counts}'))
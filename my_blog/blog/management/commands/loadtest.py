@@ -0,0 +1,131 @@
+import asyncio
+import statistics
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+# 동시에 여러 명이 게시글 목록/상세 페이지를 읽을 때의 처리량을 서버별로 비교하는 부하 측정 명령입니다.
+# 예) WSGI 와 ASGI 비교
+#   gunicorn blogbase.wsgi -w 4 -b 127.0.0.1:8000
+#   BLOG_ASYNC_VIEWS=1 uvicorn blogbase.asgi:application --workers 4 --port 8001
+#   python manage.py loadtest wsgi=http://127.0.0.1:8000 asgi=http://127.0.0.1:8001 --path /ko/blog/ --path /ko/blog/1/
+# 동시 접속 1000 을 측정하려면 ulimit -n 으로 열 수 있는 파일 수를 늘려야 합니다.
+class Command(BaseCommand):
+    help = '서버별로 동시 접속 수를 바꿔 가며 GET 요청 처리량(req/s)과 응답 시간을 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', help='이름=URL 형식의 측정 대상 (예: asgi=http://127.0.0.1:8001)')
+        parser.add_argument('--path', action='append', dest='paths', help='요청할 경로, 여러 번 지정하면 번갈아 요청합니다. (기본: /ko/blog/)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 500, 1000], help='동시 접속 수 목록')
+        parser.add_argument('--duration', type=float, default=10.0, help='동시 접속 수마다 측정할 시간(초)')
+        parser.add_argument('--timeout', type=float, default=30.0, help='요청 하나의 제한 시간(초)')
+        parser.add_argument(
+            '--cache-bust', action='store_true',
+            help='요청마다 다른 쿼리 문자열을 붙여 페이지 캐시를 거치지 않은 처리량을 측정합니다.',
+        )
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            name, sep, url = target.partition('=')
+            if not sep:
+                name, url = target, target
+            parts = urlsplit(url)
+            if parts.scheme != 'http' or not parts.hostname:
+                raise CommandError(f'http:// 로 시작하는 URL이 필요합니다: {target}')
+            targets.append((name, parts.hostname, parts.port or 80))
+        paths = options['paths'] or ['/ko/blog/']
+
+        self.stdout.write(f'{"대상":<10}{"동시":>6}{"요청":>9}{"req/s":>10}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}{"오류":>7}')
+        for name, host, port in targets:
+            for concurrency in options['concurrency']:
+                result = asyncio.run(run_load(
+                    host, port, paths, concurrency, options['duration'], options['timeout'], options['cache_bust'],
+                ))
+                self.stdout.write(
+                    f'{name:<10}{concurrency:>6}{result["requests"]:>9}{result["rps"]:>10.1f}'
+                    f'{result["p50"]:>10.1f}{result["p95"]:>10.1f}{result["p99"]:>10.1f}{result["errors"]:>7}'
+                )
+
+
+async def read_response(reader):
+    # HTTP/1.1 응답 하나를 끝까지 읽고 (상태 코드, 연결 유지 여부)를 반환합니다.
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(':')
+        headers[key.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def reader_loop(host, port, paths, deadline, timeout, cache_bust, latencies, errors):
+    # 한 명의 방문자처럼 연결을 유지하며 deadline 까지 요청을 반복합니다.
+    connection = None
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        if cache_bust:
+            path += ('&' if '?' in path else '?') + f'_={uuid.uuid4().hex[:12]}'
+        request = f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept-Encoding: identity\r\n\r\n'.encode()
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            reader, writer = connection
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errors.append(1)
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            continue
+        if status >= 400:
+            errors.append(status)
+        else:
+            latencies.append(time.perf_counter() - started)
+        if not keep_alive:
+            writer.close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_load(host, port, paths, concurrency, duration, timeout, cache_bust):
+    latencies, errors = [], []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        reader_loop(host, port, paths, deadline, timeout, cache_bust, latencies, errors)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'errors': len(errors),
+    }
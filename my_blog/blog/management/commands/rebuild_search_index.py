@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog.search import get_search_backend
+
+
+# 게시글 검색 색인을 처음부터 다시 만드는 관리 명령입니다.
+class Command(BaseCommand):
+    help = '게시글 검색 색인을 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='한 번에 읽어 색인할 게시글 수',
+        )
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'게시글 {count}건을 색인했습니다.'))
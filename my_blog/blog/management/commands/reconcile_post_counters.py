@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog import counters
+from blog.models import Comment, Post, Reply
+
+
+# 게시글의 댓글 수, 답글 수, 마지막 활동 시각을 댓글/답글 테이블과 다시 맞추는 관리 명령입니다.
+class Command(BaseCommand):
+    help = '게시글의 댓글 수, 답글 수, 마지막 활동 시각이 실제와 다른 게시글을 찾아 바로잡습니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번의 UPDATE 로 고칠 게시글 수')
+        parser.add_argument('--dry-run', action='store_true', help='고치지 않고 어긋난 게시글 수만 출력합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        count = counters.reconcile(
+            Post, Comment, Reply, chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'값이 어긋난 게시글 {count}개를 찾았습니다.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'게시글 {count}개의 댓글 수/활동 시각을 바로잡았습니다.'))
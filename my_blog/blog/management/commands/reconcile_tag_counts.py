@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog import cache as blog_cache
+from blog import tags
+from blog.models import PostTag, Tag
+
+
+# 태그별 게시글 수(Tag.post_count)를 게시글-태그 연결과 다시 맞추는 관리 명령입니다.
+class Command(BaseCommand):
+    help = '태그별 게시글 수가 실제와 다른 태그를 찾아 바로잡습니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번의 UPDATE 로 고칠 태그 수')
+        parser.add_argument('--dry-run', action='store_true', help='고치지 않고 어긋난 태그 수만 출력합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        count = tags.reconcile_post_counts(
+            Tag, PostTag, chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'게시글 수가 어긋난 태그 {count}개를 찾았습니다.')
+            return
+        if count:
+            blog_cache.invalidate_tags()
+        self.stdout.write(self.style.SUCCESS(f'태그 {count}개의 게시글 수를 바로잡았습니다.'))
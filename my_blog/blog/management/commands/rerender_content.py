@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog import cache as blog_cache
+from blog.models import Comment, Post
+from blog.rendering import RENDER_VERSION, RENDERED_FIELDS, render_comment, render_post
+
+
+# 게시글/댓글 본문의 HTML, 요약, 단어 수를 다시 만드는 관리 명령입니다.
+# blog/rendering.py 의 변환 규칙을 바꾸고 RENDER_VERSION 을 올린 뒤 실행하면 이전 버전으로 변환된 행만 다시 변환합니다.
+# 전체를 한 번에 읽지 않도록 pk 순서로 chunk_size 개씩 읽어 bulk_update 로 저장합니다.
+# (읽는 중인 테이블을 같은 연결에서 고치지 않도록 iterator() 대신 마지막 pk 다음부터 다시 읽습니다)
+class Command(BaseCommand):
+    help = '변환 규칙 버전이 다른 게시글/댓글의 본문 HTML, 요약, 단어 수를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번에 읽고 저장할 행 수')
+        parser.add_argument('--all', action='store_true', help='버전과 관계없이 모든 게시글/댓글을 다시 변환합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        targets = (
+            ('게시글', Post, render_post, ('content',), blog_cache.post_scope),
+            ('댓글', Comment, render_comment, ('post', 'message', 'content'), None),
+        )
+        for label, model, render, fields, scope in targets:
+            queryset = model.objects.only('pk', *fields).order_by('pk')
+            if not options['all']:
+                queryset = queryset.exclude(rendered_version=RENDER_VERSION)
+            count = self.rerender(model, queryset, render, scope, options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'{label} {count}개를 다시 변환했습니다.'))
+
+    def rerender(self, model, queryset, render, scope, chunk_size):
+        count = 0
+        last_pk = 0
+        while True:
+            chunk = [render(obj) for obj in queryset.filter(pk__gt=last_pk)[:chunk_size]]
+            if not chunk:
+                return count
+            model.objects.bulk_update(chunk, RENDERED_FIELDS)
+            last_pk = chunk[-1].pk
+            count += len(chunk)
+            # 바뀐 본문이 바로 보이도록 해당 게시글과 댓글 조각, 목록 페이지 캐시를 무효화합니다.
+            if scope is not None:
+                scopes = {scope(obj.pk) for obj in chunk}
+            else:
+                scopes = {blog_cache.thread_scope(obj.post_id) for obj in chunk}
+                scopes |= {blog_cache.post_scope(obj.post_id) for obj in chunk}
+            blog_cache.bump_versions(blog_cache.LIST_SCOPE, *scopes)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blogbase.db import primary_pin_scope
+from blog.benchmark import PASSWORD, seed
+
+
+# 성능 측정용 가상 데이터(사용자, 게시글, 태그, 댓글, 답글)를 현재 DB에 만드는 관리 명령입니다.
+class Command(BaseCommand):
+    help = '성능 측정용 가상 사용자/게시글/태그/댓글/답글을 만듭니다. (댓글은 멱법칙 분포)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='만들 사용자 수 (Profile 포함)')
+        parser.add_argument('--posts', type=int, default=2000, help='만들 게시글 수')
+        parser.add_argument('--comments', type=int, default=20000, help='만들 댓글 수')
+        parser.add_argument('--replies', type=int, default=None, help='만들 답글 수 (기본: 댓글 수의 절반)')
+        parser.add_argument('--tags', type=int, default=30, help='사용할 태그 수')
+        parser.add_argument('--seed', type=int, default=0, help='난수 시드, 같은 값이면 같은 데이터를 만듭니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        counts = seed(
+            users=options['users'], posts=options['posts'], comments=options['comments'],
+            replies=options['replies'], tags=options['tags'], seed=options['seed'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'가상 데이터를 만들었습니다. {counts} (비밀번호: {PASSWORD})'
+        ))
@@ -0,0 +1,183 @@
+# 게시글 첨부 파일(MEDIA_ROOT/blog/files/)을 내려주는 뷰입니다.
+# django.conf.urls.static 의 serve 와 달리 Range 요청(206)과 ETag/Last-Modified 조건부 요청(304/412)을 처리하므로
+# 동영상을 중간부터 재생하거나 건너뛸 때 파일을 처음부터 다시 받지 않습니다.
+#
+# 파일 전체를 보낼 때는 FileResponse 에 파일을 그대로 넘겨 WSGI 서버의 wsgi.file_wrapper(sendfile)로 복사 없이 전송하고,
+# 일부만 보낼 때는 해당 구간만 읽는 RangeFile 로 나누어 전송합니다. ASGI 에서는 같은 응답을 비동기로 나누어 보냅니다.
+#
+# 앞단에 nginx/Apache 가 있으면 BLOG_MEDIA_OFFLOAD 로 파일 전송을 프록시에 맡길 수 있습니다.
+#   'x-accel-redirect': nginx, BLOG_MEDIA_ACCEL_PREFIX(internal location) + 파일 경로를 X-Accel-Redirect 로 보냅니다.
+#   'x-sendfile': Apache mod_xsendfile/lighttpd, 파일의 절대 경로를 X-Sendfile 로 보냅니다.
+import io
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views import View
+
+# 첨부 파일이 저장되는 MEDIA_ROOT 아래 폴더입니다. (Post.file_upload 의 upload_to)
+MEDIA_SUBDIR = 'blog/files'
+# 구간 전송 시 한 번에 읽는 크기입니다.
+RANGE_BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_offload_mode():
+    return getattr(settings, 'BLOG_MEDIA_OFFLOAD', None)
+
+
+def get_accel_prefix():
+    return getattr(settings, 'BLOG_MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+
+def make_etag(stat):
+    # 파일 크기와 수정 시각으로 만든 강한 ETag 입니다. If-Range 비교에도 사용합니다.
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    # 'bytes=시작-끝' 헤더를 (시작, 끝) 으로 바꿉니다. 끝은 포함입니다.
+    # 형식이 잘못되었거나 여러 구간을 요청하면 None 을 반환해 Range 를 무시하고 전체를 보냅니다.
+    # 만족할 수 없는 구간이면 ValueError 를 발생시킵니다. (416)
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 'bytes=-500': 마지막 500바이트
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    # If-Range 가 없거나 현재 파일과 같으면 True, 파일이 바뀌었으면 False (전체를 새로 보냄)
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith('"') or value.startswith('W/'):
+        return value == etag
+    since = parse_http_date_safe(value)
+    return since is not None and int(mtime) <= since
+
+
+class RangeFile:
+    # 열린 파일의 start 부터 length 바이트만 보이도록 감싼 파일 객체입니다.
+    # FileResponse.set_headers 가 seek/tell 로 Content-Length 를 구하므로 구간 안에서의 위치로 동작합니다.
+    # fileno() 를 노출하지 않아 sendfile 이 구간 밖까지 보내는 일이 없습니다.
+    def __init__(self, file, start, length):
+        self.file = file
+        self.start = start
+        self.length = length
+        self.position = 0
+        self.name = file.name
+        file.seek(start)
+
+    def read(self, size=-1):
+        remaining = self.length - self.position
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self.file.read(size)
+        self.position += len(data)
+        return data
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.length
+        self.position = min(max(offset, 0), self.length)
+        self.file.seek(self.start + self.position)
+        return self.position
+
+    def close(self):
+        self.file.close()
+
+
+def offload_response(path, relative_path, content_type):
+    # 파일 전송을 앞단 프록시에 맡기는 빈 응답입니다. Range/조건부 요청도 프록시가 처리합니다.
+    response = HttpResponse(content_type=content_type)
+    if get_offload_mode() == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = get_accel_prefix() + relative_path
+    else:
+        response['X-Sendfile'] = str(path)
+    return response
+
+
+class MediaFileView(View):
+    def get(self, request, path):
+        try:
+            full_path = Path(safe_join(settings.MEDIA_ROOT, MEDIA_SUBDIR, path))
+        except SuspiciousFileOperation:
+            raise Http404('잘못된 파일 경로입니다.')
+        try:
+            stat = full_path.stat()
+        except OSError:
+            raise Http404('파일을 찾을 수 없습니다.')
+        if not full_path.is_file():
+            raise Http404('파일을 찾을 수 없습니다.')
+
+        etag = make_etag(stat)
+        content_type = mimetypes.guess_type(full_path.name)[0] or 'application/octet-stream'
+
+        # If-None-Match/If-Modified-Since(304), If-Match/If-Unmodified-Since(412)
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            if get_offload_mode():
+                response = offload_response(full_path, f'{MEDIA_SUBDIR}/{path}', content_type)
+            else:
+                response = self.file_response(request, full_path, stat, etag, content_type)
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(stat.st_mtime))
+        response.headers.setdefault('Accept-Ranges', 'bytes')
+        return response
+
+    def file_response(self, request, full_path, stat, etag, content_type):
+        size = stat.st_size
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if range_header and size and if_range_matches(request, etag, stat.st_mtime):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                response = HttpResponse(status=416, content_type=content_type)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        file = open(full_path, 'rb')
+        if byte_range is None:
+            # 전체 파일: 파일 객체를 그대로 넘겨 wsgi.file_wrapper(sendfile)를 쓸 수 있게 합니다.
+            return FileResponse(file, content_type=content_type)
+
+        start, end = byte_range
+        response = FileResponse(RangeFile(file, start, end - start + 1), content_type=content_type, status=206)
+        response.block_size = RANGE_BLOCK_SIZE
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+
+media_file = MediaFileView.as_view()
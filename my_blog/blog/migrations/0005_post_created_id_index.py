@@ -0,0 +1,21 @@
+# Generated by Django 4.2.6 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_remove_post_tag_alter_tag_name'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='comment',
+            name='parent',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='blog_post_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# 게시글 전문 검색용 SQLite FTS5 가상 테이블을 만들고 기존 게시글을 색인합니다.
+# SQLite가 아니거나 FTS5를 지원하지 않으면 건너뛰며, 이 경우 blog.search 는 파이썬 역색인을 사용합니다.
+
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts "
+            "USING fts5(title, content, tags, tokenize='unicode61')"
+        )
+        cursor.execute(
+            "INSERT INTO blog_post_fts (rowid, title, content, tags) "
+            "SELECT p.id, p.title, p.content, coalesce(group_concat(t.name, ' '), '') "
+            "FROM blog_post p "
+            "LEFT JOIN blog_post_tags pt ON pt.post_id = p.id "
+            "LEFT JOIN blog_tag t ON t.id = pt.tag_id "
+            "GROUP BY p.id"
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS blog_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_created_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
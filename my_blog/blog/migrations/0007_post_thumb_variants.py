@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumb_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
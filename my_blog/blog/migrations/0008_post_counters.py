@@ -0,0 +1,58 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:26
+# 게시글에 댓글 수, 답글 수, 마지막 활동 시각 열을 추가하고 기존 댓글/답글로 값을 채웁니다.
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    Reply = apps.get_model('blog', 'Reply')
+
+    def aggregate(model, expression):
+        return Subquery(
+            model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(value=expression).values('value')
+        )
+
+    Post.objects.using(schema_editor.connection.alias).update(
+        comment_count=Coalesce(aggregate(Comment, Count('pk')), 0, output_field=IntegerField()),
+        reply_count=Coalesce(aggregate(Reply, Count('pk')), 0, output_field=IntegerField()),
+        last_activity_at=Greatest(
+            F('created_at'),
+            Coalesce(aggregate(Comment, Max('created_at')), F('created_at')),
+            Coalesce(aggregate(Reply, Max('created_at')), F('created_at')),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_thumb_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-last_activity_at', '-id'], name='blog_post_activity_id_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
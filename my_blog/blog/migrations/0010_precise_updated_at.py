@@ -0,0 +1,50 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:42
+
+# 게시글/댓글/답글의 수정 시각을 날짜에서 시각(DateTimeField)으로 바꿉니다.
+# 기존 값은 그 날짜의 자정(UTC)이 되므로, 작성한 날 이후로 수정되지 않은 행은 작성 시각으로 맞추고
+# 시간대 차이로 현재보다 늦어진 값은 현재 시각으로 맞춥니다.
+
+from django.db import migrations, models
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+
+def fix_updated_at(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    now = timezone.now()
+    for model_name in ('Post', 'Comment', 'Reply'):
+        objects = apps.get_model('blog', model_name).objects.using(alias)
+        objects.filter(updated_at__lt=F('created_at') + timedelta(days=1)).update(updated_at=F('created_at'))
+        objects.filter(updated_at__gt=now).update(updated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='reply',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-updated_at'], name='blog_post_updated_idx'),
+        ),
+        migrations.RunPython(fix_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:50
+# 게시글-태그 중간 테이블(blog_post_tags)을 PostTag 모델로 선언하고 태그 페이지용 (tag_id, post_id) 인덱스를 추가합니다.
+# 테이블은 그대로 두고 모델 상태만 바꾼 뒤(SeparateDatabaseAndState), 태그별 게시글 수 열을 추가해 채웁니다.
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_post_counts(apps, schema_editor):
+    Tag = apps.get_model('blog', 'Tag')
+    PostTag = apps.get_model('blog', 'PostTag')
+    counts = PostTag.objects.filter(tag=OuterRef('pk')).order_by().values('tag').annotate(n=Count('pk')).values('n')
+    Tag.objects.using(schema_editor.connection.alias).update(
+        post_count=Coalesce(Subquery(counts), 0, output_field=IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PostTag',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='blog.post')),
+                        ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='blog.tag')),
+                    ],
+                    options={
+                        'db_table': 'blog_post_tags',
+                        'unique_together': {('post', 'tag')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='tags',
+                    field=models.ManyToManyField(blank=True, through='blog.PostTag', to='blog.tag'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', 'post'], name='blog_post_tags_tag_post_idx'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-post_count', 'name'], name='blog_tag_post_count_idx'),
+        ),
+        migrations.RunPython(fill_post_counts, migrations.RunPython.noop),
+    ]
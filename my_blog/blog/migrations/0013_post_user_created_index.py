@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-18 20:59
+# 작성자별 피드용 (user_id, created_at, id) 인덱스를 추가합니다.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_tag_pages'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='blog_post_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+
+
+# 작성자만 수정/삭제할 수 있는 뷰에서 사용하는 믹스인입니다.
+# 권한 검사(test_func)와 UpdateView/DeleteView 가 같은 객체를 쓰도록 요청마다 한 번만 조회해 뷰에 보관하고,
+# 작성자 확인은 연결된 User를 불러오지 않고 owner_id == request.user.id 로 비교합니다.
+class OwnerRequiredMixin(UserPassesTestMixin):
+    # 작성자를 가리키는 외래키의 id 속성 이름입니다.
+    owner_field = 'user_id'
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_owned_object'):
+            self._owned_object = super().get_object(queryset)
+        return self._owned_object
+
+    def test_func(self):
+        return getattr(self.get_object(), self.owner_field) == self.request.user.id
@@ -1,6 +1,10 @@
 # Django의 기본 모듈과 사용자 모델, 그리고 RichTextField를 위한 ckeditor 모듈을 임포트합니다.
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
 from ckeditor.fields import RichTextField
 
 # 게시글에 대한 모델을 정의합니다.
@@ -13,20 +17,44 @@ class Post(models.Model):
     title = models.CharField(max_length=100)
     # 게시글의 내용입니다.
     content = models.TextField()
+    # 저장할 때 blog/rendering.py 가 만들어 두는 본문 HTML, 목록용 요약, 단어 수, 변환 규칙 버전입니다.
+    # 화면에서는 content 대신 이 값들을 그대로 출력합니다.
+    content_html = models.TextField(default='', editable=False)
+    excerpt = models.CharField(max_length=255, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    rendered_version = models.PositiveSmallIntegerField(default=0, editable=False)
     # 게시글의 썸네일 이미지, 'blog/images/%Y/%m/%d/' 경로에 업로드됩니다. 선택적 필드입니다.
     thumb_image = models.ImageField(
         upload_to='blog/images/%Y/%m/%d/', blank=True)
+    # 썸네일의 크기별 파생 이미지 정보입니다. {'source': 원본 파일 이름, 'widths': [320, 640, ...]} 형태로 blog/images.py 가 기록합니다.
+    thumb_variants = models.JSONField(default=dict, blank=True, editable=False)
     # 게시글에 첨부할 파일, 'blog/files/%Y/%m/%d/' 경로에 업로드됩니다. 선택적 필드입니다.
     file_upload = models.FileField(
         upload_to='blog/files/%Y/%m/%d/', blank=True)
     # 게시글이 생성된 시각, 자동으로 현재 시각이 저장됩니다.
     created_at = models.DateTimeField(auto_now_add=True)
-    # 게시글이 수정된 날짜, 자동으로 현재 날짜가 저장됩니다.
-    updated_at = models.DateField(auto_now=True)
+    # 게시글이 수정된 시각, 자동으로 현재 시각이 저장됩니다. (조건부 요청의 Last-Modified 에 사용합니다)
+    updated_at = models.DateTimeField(auto_now=True)
     # 게시글의 조회 수, 기본값은 0입니다.
     view_count = models.PositiveIntegerField(default=0)
-    # 게시글의 태그, Tag 모델을 참조합니다. 선택적 필드입니다.
-    tags = models.ManyToManyField('Tag', blank=True)
+    # 게시글의 태그, Tag 모델을 참조합니다. 선택적 필드입니다. 중간 테이블은 PostTag 입니다.
+    tags = models.ManyToManyField('Tag', blank=True, through='PostTag')
+    # 댓글 수, 답글 수, 마지막 댓글/답글 시각입니다. 목록에서 집계 쿼리 없이 보여주고 정렬하도록 blog/counters.py 가 갱신합니다.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    last_activity_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # 목록의 키셋 페이지네이션이 (created_at, id) 순서로 바로 찾아갈 수 있도록 하는 복합 인덱스입니다.
+            models.Index(fields=['-created_at', '-id'], name='blog_post_created_id_idx'),
+            # 목록을 최근 활동 순으로 정렬할 때 사용하는 인덱스입니다.
+            models.Index(fields=['-last_activity_at', '-id'], name='blog_post_activity_id_idx'),
+            # 목록 페이지의 Last-Modified 를 구할 때 가장 최근 수정 시각을 바로 찾는 인덱스입니다.
+            models.Index(fields=['-updated_at'], name='blog_post_updated_idx'),
+            # 작성자별 피드가 그 작성자의 최신 글만 바로 읽도록 하는 인덱스입니다.
+            models.Index(fields=['user', '-created_at', '-id'], name='blog_post_user_created_idx'),
+        ]
 
     # 게시글의 제목을 반환하는 메서드입니다.
     def __str__(self):
@@ -34,7 +62,8 @@ class Post(models.Model):
     
     # 게시글의 절대 URL을 반환하는 메서드입니다.
     def get_absolute_url(self):
-        return f'/blog/{self.pk}/'
+        # 현재 언어의 접두사(/ko/, /en/)가 붙은 주소입니다.
+        return reverse('blog:post_detail', args=[self.pk])
     
 # 댓글에 대한 모델을 정의합니다.
 class Comment(models.Model):
@@ -50,10 +79,15 @@ class Comment(models.Model):
     message = models.TextField()
     # 댓글이 생성된 시각, 자동으로 현재 시각이 저장됩니다.
     created_at = models.DateTimeField(auto_now_add=True)
-    # 댓글이 수정된 날짜, 자동으로 현재 날짜가 저장됩니다.
-    updated_at = models.DateField(auto_now=True)
+    # 댓글이 수정된 시각, 자동으로 현재 시각이 저장됩니다. (조건부 요청의 Last-Modified 에 사용합니다)
+    updated_at = models.DateTimeField(auto_now=True)
     # 댓글 내용에 대한 Rich Text입니다.
     content = RichTextField()
+    # 저장할 때 blog/rendering.py 가 허용 목록으로 정리해 둔 content 의 HTML, 요약, 단어 수, 변환 규칙 버전입니다.
+    content_html = models.TextField(default='', editable=False)
+    excerpt = models.CharField(max_length=255, default='', editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    rendered_version = models.PositiveSmallIntegerField(default=0, editable=False)
     
     # 댓글의 내용을 반환하는 메서드입니다.
     def __str__(self):
@@ -63,11 +97,33 @@ class Comment(models.Model):
 class Tag(models.Model):
     # 태그의 이름, 최대 길이는 50자이며, 중복은 허용되지 않습니다. 선택적 필드입니다.
     name = models.CharField(max_length=50, unique=True, null=True, blank=True)
+    # 이 태그가 달린 게시글 수입니다. 태그 구름에서 집계 쿼리 없이 쓰도록 blog/tags.py 가 갱신합니다.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # 태그 구름이 게시글이 많은 태그부터 바로 읽도록 하는 인덱스입니다.
+            models.Index(fields=['-post_count', 'name'], name='blog_tag_post_count_idx'),
+        ]
     
     # 태그의 이름을 반환하는 메서드입니다.
     def __str__(self):
         return self.name
-    
+
+
+# 게시글과 태그의 연결(Post.tags 의 중간 테이블)입니다. 처음 자동으로 만들어진 blog_post_tags 테이블을 그대로 씁니다.
+class PostTag(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'blog_post_tags'
+        unique_together = [('post', 'tag')]
+        indexes = [
+            # 태그 페이지가 태그의 게시글을 최신(post_id 큰) 순서로 인덱스에서 바로 읽도록 하는 복합 인덱스입니다.
+            models.Index(fields=['tag', 'post'], name='blog_post_tags_tag_post_idx'),
+        ]
+
 # 답글에 대한 모델을 정의합니다.
 class Reply(models.Model):
     # 답글이 달린 게시글, Post 모델을 참조하며, 게시글이 삭제되면 해당 게시글의 답글도 함께 삭제됩니다.
@@ -86,9 +142,36 @@ class Reply(models.Model):
     message = models.TextField()
     # 답글이 생성된 시각, 자동으로 현재 시각이 저장됩니다.
     created_at = models.DateTimeField(auto_now_add=True)
-    # 답글이 수정된 날짜, 자동으로 현재 날짜가 저장됩니다.
-    updated_at = models.DateField(auto_now=True)
+    # 답글이 수정된 시각, 자동으로 현재 시각이 저장됩니다. (조건부 요청의 Last-Modified 에 사용합니다)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # 답글의 내용을 반환하는 메서드입니다.
     def __str__(self):
         return self.message
+
+
+# 큰 첨부 파일을 여러 조각으로 나누어 올리는 업로드 한 건입니다. (blog/uploads.py)
+# 조각은 임시 폴더의 파일에 이어 붙이고, 완료하면 체크섬을 확인한 뒤 Post.file_upload 와 같은 폴더로 옮깁니다.
+class ChunkedUpload(models.Model):
+    # 클라이언트가 이어 올리기에 쓰는 업로드 id 입니다. 추측할 수 없도록 uuid 를 씁니다.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # 업로드한 사용자, 본인만 이어 올리거나 게시글에 첨부할 수 있습니다.
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # 원래 파일 이름과 전체 크기(바이트)입니다.
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    # 지금까지 받은 바이트 수, 다음 조각은 이 위치부터 보내야 합니다.
+    offset = models.PositiveBigIntegerField(default=0)
+    # 완료 후 옮긴 파일의 저장소 이름입니다. (예: blog/files/2024/01/01/video.mp4)
+    file = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # 마지막으로 조각을 받은 시각, 오래 멈춘 업로드는 manage.py cleanup_uploads 가 지웁니다.
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
@@ -0,0 +1,141 @@
+# (created_at, id) 기준의 키셋(커서) 페이지네이션입니다.
+# OFFSET 대신 마지막으로 본 게시글의 (created_at, id) 이후를 조회하므로 몇 번째 페이지든 비용이 같습니다.
+# 태그 페이지는 중간 테이블의 post_id 를 커서로 쓰는 LinkKeysetPaginator 를 사용합니다.
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(obj):
+    # 게시글의 (created_at, id)를 URL에 넣을 수 있는 토큰으로 만듭니다.
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    # 토큰을 (created_at, id)로 되돌립니다. 잘못된 토큰이면 404를 반환합니다.
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Http404('잘못된 페이지 토큰입니다.')
+
+
+def encode_id_cursor(obj):
+    return base64.urlsafe_b64encode(str(obj.pk).encode()).decode().rstrip('=')
+
+
+def decode_id_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise Http404('잘못된 페이지 토큰입니다.')
+
+
+class KeysetPage:
+    # 템플릿에서 Django의 Page 객체와 비슷하게 쓸 수 있는 키셋 페이지입니다.
+    # encode 는 객체를 커서 토큰으로 바꾸는 함수입니다.
+    def __init__(self, object_list, has_next, has_previous, encode=encode_cursor):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.encode = encode
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        return self.encode(self.object_list[-1]) if self._has_next and self.object_list else ''
+
+    @property
+    def previous_cursor(self):
+        return self.encode(self.object_list[0]) if self._has_previous and self.object_list else ''
+
+
+class KeysetPaginator:
+    # 최신 글이 먼저 오도록 (-created_at, -id) 순서로 페이지를 나눕니다.
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        rows = list(self.page_queryset(after, before))
+        return self.make_page(rows, after, before)
+
+    async def apage(self, after=None, before=None):
+        # 비동기 뷰용 page() 입니다.
+        rows = [obj async for obj in self.page_queryset(after, before).aiterator()]
+        return self.make_page(rows, after, before)
+
+    def page_queryset(self, after=None, before=None):
+        # 다음/이전 페이지가 있는지 알기 위해 per_page 보다 한 개를 더 읽습니다.
+        qs = self.queryset
+        if before:
+            # 이전 페이지는 반대 방향으로 읽은 뒤 make_page() 에서 순서를 뒤집습니다.
+            created_at, pk = decode_cursor(before)
+            qs = qs.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by('created_at', 'id')
+            return qs[:self.per_page + 1]
+
+        if after:
+            created_at, pk = decode_cursor(after)
+            qs = qs.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        return qs.order_by('-created_at', '-id')[:self.per_page + 1]
+
+    def make_page(self, rows, after=None, before=None):
+        if before:
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next=has_next, has_previous=bool(after))
+
+
+class LinkKeysetPaginator:
+    # 중간 테이블(예: 한 태그의 PostTag)에서 post_id 가 큰 순서로 페이지를 나눕니다.
+    # links 의 (tag_id, post_id) 인덱스에서 post_id 를 per_page + 1 개만 읽고, 게시글은 pk 로 가져오므로
+    # 연결된 게시글이 아무리 많아도 페이지 크기만큼만 읽습니다. (JOIN 후 전체 정렬을 하지 않습니다)
+    def __init__(self, links, queryset, per_page, field='post_id'):
+        self.links = links
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+
+    def page(self, after=None, before=None):
+        links = self.links
+        if before:
+            links = links.filter(**{f'{self.field}__gt': decode_id_cursor(before)}).order_by(self.field)
+        else:
+            if after:
+                links = links.filter(**{f'{self.field}__lt': decode_id_cursor(after)})
+            links = links.order_by(f'-{self.field}')
+        ids = list(links.values_list(self.field, flat=True)[:self.per_page + 1])
+        has_more = len(ids) > self.per_page
+        ids = ids[:self.per_page]
+        objects = self.queryset.in_bulk(ids) if ids else {}
+        rows = [objects[pk] for pk in ids if pk in objects]
+        if before:
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_more, encode=encode_id_cursor)
+        return KeysetPage(rows, has_next=has_more, has_previous=bool(after), encode=encode_id_cursor)
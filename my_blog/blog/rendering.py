@@ -0,0 +1,179 @@
+# 게시글/댓글 본문을 저장할 때 한 번만 HTML로 바꿔 두는 모듈입니다. (render-on-write)
+# 페이지를 볼 때마다 변환/정리하지 않도록 저장 시점(signals.py 의 pre_save)에 다음 값을 계산해 모델에 함께 저장합니다.
+#   content_html: 화면에 그대로 출력할 HTML
+#   excerpt: 목록에 보여줄 앞부분 요약 (태그 없는 텍스트)
+#   word_count: 단어 수
+#   rendered_version: 변환 규칙 버전, RENDER_VERSION 과 다르면 manage.py rerender_content 가 다시 변환합니다.
+#
+# Post.content 는 일반 텍스트이므로 HTML 특수문자를 이스케이프하고 줄바꿈을 문단으로 바꿉니다.
+# Comment.content 는 CKEditor 로 입력하는 HTML 이므로 허용 목록(ALLOWED_TAGS/ALLOWED_ATTRIBUTES)에 있는 태그와 속성만 남깁니다.
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from django.utils.html import linebreaks
+
+# 변환 규칙(허용 목록, 요약 길이 등)을 바꾸면 올리고 manage.py rerender_content 를 실행합니다.
+RENDER_VERSION = 1
+EXCERPT_LENGTH = 200
+# 변환 결과가 저장되는 필드입니다. (bulk_update 에 사용)
+RENDERED_FIELDS = ['content_html', 'excerpt', 'word_count', 'rendered_version']
+# 목록/검색 결과는 excerpt 만 보여주므로 읽지 않아도 되는 긴 본문 필드입니다. (queryset.defer 에 사용)
+LIST_DEFERRED_FIELDS = ['content', 'content_html']
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'div', 'span', 'strong', 'b', 'em', 'i', 'u', 's', 'sub', 'sup',
+    'blockquote', 'code', 'pre', 'ul', 'ol', 'li', 'h2', 'h3', 'h4', 'a', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'th': {'colspan', 'rowspan'},
+    'td': {'colspan', 'rowspan'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'http', 'https', 'mailto'}
+# 태그뿐 아니라 안의 내용까지 지우는 태그입니다.
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'textarea', 'title', 'svg', 'math'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# 태그를 지우고 텍스트만 남길 때 앞뒤 단어가 붙지 않도록 공백으로 바꾸는 태그입니다.
+BLOCK_TAGS = {'p', 'br', 'hr', 'div', 'blockquote', 'pre', 'ul', 'ol', 'li', 'h2', 'h3', 'h4', 'table', 'tr', 'th', 'td'}
+
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x20\x7f]+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def safe_url(value):
+    # javascript: 같은 위험한 주소를 막습니다. 상대 경로와 #, / 로 시작하는 주소는 허용합니다.
+    url = CONTROL_CHARS_RE.sub('', value)
+    scheme, sep, _ = url.partition(':')
+    if sep and not any(char in scheme for char in '/?#'):
+        return scheme.lower() in ALLOWED_SCHEMES
+    return True
+
+
+class Sanitizer(HTMLParser):
+    # 허용 목록에 없는 태그는 지우고(내용은 남김), 속성은 허용된 것만 남기며, 닫히지 않은 태그는 닫아 줍니다.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output = []
+        self.open_tags = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        parts = [tag]
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not safe_url(value):
+                continue
+            parts.append(f'{name}="{escape(value)}"')
+        if tag == 'a':
+            parts.append('rel="nofollow noopener"')
+        self.output.append(f'<{" ".join(parts)}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth -= 1
+        elif tag in self.open_tags and tag not in VOID_TAGS and not self.skip_depth:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if self.skip_depth or tag not in self.open_tags:
+            return
+        # 안쪽에서 닫히지 않은 태그들을 먼저 닫습니다.
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.output.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.output.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.output.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.output)
+
+
+class TextExtractor(HTMLParser):
+    # HTML 에서 보이는 텍스트만 꺼냅니다. (요약과 단어 수 계산용)
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def close(self):
+        super().close()
+        return WHITESPACE_RE.sub(' ', ''.join(self.parts)).strip()
+
+
+def sanitize_html(html):
+    parser = Sanitizer()
+    parser.feed(html or '')
+    return parser.close()
+
+
+def html_to_text(html):
+    parser = TextExtractor()
+    parser.feed(html or '')
+    return parser.close()
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rstrip() + '…'
+
+
+def render_post(post):
+    # 일반 텍스트 본문을 문단 HTML 로 바꾸고 요약/단어 수를 계산해 post 에 넣습니다. (저장은 하지 않습니다)
+    text = post.content or ''
+    post.content_html = linebreaks(text, autoescape=True) if text.strip() else ''
+    post.excerpt = make_excerpt(text)
+    post.word_count = len(text.split())
+    post.rendered_version = RENDER_VERSION
+    return post
+
+
+def render_comment(comment):
+    # 댓글의 리치 텍스트(content)를 허용 목록으로 정리하고, 요약/단어 수는 메시지와 리치 텍스트를 합쳐 계산합니다.
+    comment.content_html = sanitize_html(comment.content)
+    text = ' '.join(part for part in (comment.message or '', html_to_text(comment.content_html)) if part)
+    comment.excerpt = make_excerpt(text)
+    comment.word_count = len(text.split())
+    comment.rendered_version = RENDER_VERSION
+    return comment
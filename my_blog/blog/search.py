@@ -0,0 +1,260 @@
+# 게시글 제목/내용/태그에 대한 전문 검색 모듈입니다.
+# SQLite에서는 FTS5 가상 테이블(blog_post_fts)을, 그 외에는 프로세스 메모리의 역색인을 사용합니다.
+# 색인은 signals.py 의 시그널로 게시글 생성/수정/삭제 시 바로 갱신되고, rebuild_search_index 명령으로 다시 만들 수 있습니다.
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.utils.module_loading import import_string
+
+from .models import Post
+from .rendering import LIST_DEFERRED_FIELDS
+
+FTS_TABLE = 'blog_post_fts'
+
+# 필드별 가중치입니다. 제목과 태그에서 찾은 단어를 본문보다 높게 칩니다.
+FIELD_WEIGHTS = {'title': 10.0, 'content': 1.0, 'tags': 5.0}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def post_document(post, tag_names=None):
+    # 색인할 {필드: 텍스트} 를 만듭니다. tag_names가 없으면 게시글의 태그를 조회합니다.
+    if tag_names is None:
+        tag_names = post.tags.values_list('name', flat=True)
+    return {
+        'title': post.title,
+        'content': post.content,
+        'tags': ' '.join(name for name in tag_names if name),
+    }
+
+
+def iter_documents(chunk_size):
+    # 전체 게시글을 태그와 함께 chunk_size 단위로 읽어 (pk, 문서)를 돌려줍니다.
+    posts = Post.objects.only('id', 'title', 'content').prefetch_related('tags').order_by('pk')
+    for post in posts.iterator(chunk_size=chunk_size):
+        yield post.pk, post_document(post, [tag.name for tag in post.tags.all()])
+
+
+class FTS5Backend:
+    # SQLite FTS5 가상 테이블을 사용하는 검색 백엔드입니다. rowid는 게시글 id와 같습니다.
+    # 색인이 DB에 있으므로 백그라운드 작업자 등 다른 프로세스에서 갱신해도 됩니다.
+    shared = True
+
+    def read_connection(self):
+        return connections[router.db_for_read(Post) or DEFAULT_DB_ALIAS]
+
+    def write_connection(self):
+        return connections[router.db_for_write(Post) or DEFAULT_DB_ALIAS]
+
+    def match_expression(self, query):
+        # 각 단어를 따옴표로 감싸 FTS 문법을 무력화하고, 접두어 검색(*)을 AND로 묶습니다.
+        terms = tokenize(query)
+        return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def count(self, query):
+        match = self.match_expression(query)
+        if not match:
+            return 0
+        with self.read_connection().cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, query, offset, limit):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in ('title', 'content', 'tags'))
+        with self.read_connection().cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}), rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index_post(self, post, tag_names=None):
+        doc = post_document(post, tag_names)
+        with self.write_connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)',
+                [post.pk, doc['title'], doc['content'], doc['tags']],
+            )
+
+    def remove_post(self, pk):
+        with self.write_connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+    def rebuild(self, chunk_size=1000):
+        count = 0
+        rows = []
+        with self.write_connection().cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            for pk, doc in iter_documents(chunk_size):
+                rows.append([pk, doc['title'], doc['content'], doc['tags']])
+                if len(rows) >= chunk_size:
+                    cursor.executemany(
+                        f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)', rows
+                    )
+                    count += len(rows)
+                    rows = []
+            if rows:
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)', rows
+                )
+                count += len(rows)
+            # 여러 번 갱신되며 쪼개진 색인 세그먼트를 하나로 합쳐 검색 속도를 유지합니다.
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        return count
+
+
+class InvertedIndexBackend:
+    # FTS5를 쓸 수 없을 때 사용하는 순수 파이썬 역색인입니다.
+    # 프로세스마다 처음 검색할 때 DB에서 색인을 만들고, 이후에는 시그널로 갱신합니다. (접두어 검색은 지원하지 않습니다)
+    # 색인이 프로세스 메모리에 있으므로 다른 프로세스에서 갱신할 수 없습니다.
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)  # 단어 -> {게시글 id: 가중치 합}
+        self._documents = {}  # 게시글 id -> 단어 집합
+        self._built = False
+
+    def _ensure_built(self):
+        if not self._built:
+            self.rebuild()
+
+    def _add(self, pk, doc):
+        weights = defaultdict(float)
+        for field, text in doc.items():
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+        for term, weight in weights.items():
+            self._postings[term][pk] = weight
+        self._documents[pk] = set(weights)
+
+    def _remove(self, pk):
+        for term in self._documents.pop(pk, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(pk, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search_ids(self, query):
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            self._ensure_built()
+            postings = [self._postings.get(term, {}) for term in terms]
+            # 가장 짧은 목록부터 교집합을 구해 모든 단어가 들어 있는 게시글만 남깁니다.
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+            total = len(self._documents) or 1
+            scores = {}
+            for pk in candidates:
+                scores[pk] = sum(
+                    posting[pk] * math.log(1 + total / len(posting)) for posting in postings
+                )
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+    def count(self, query):
+        return len(self.search_ids(query))
+
+    def ranked_ids(self, query, offset, limit):
+        return self.search_ids(query)[offset:offset + limit]
+
+    def index_post(self, post, tag_names=None):
+        doc = post_document(post, tag_names)
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(post.pk)
+            self._add(post.pk, doc)
+
+    def remove_post(self, pk):
+        with self._lock:
+            self._remove(pk)
+
+    def rebuild(self, chunk_size=1000):
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._documents = {}
+            for pk, doc in iter_documents(chunk_size):
+                self._add(pk, doc)
+            self._built = True
+            return len(self._documents)
+
+
+class SearchResults:
+    # Paginator에 넘길 수 있는 검색 결과입니다. 요청한 페이지의 게시글만 순위대로 가져옵니다.
+    model = Post
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if limit <= 0:
+            return []
+        pks = self.backend.ranked_ids(self.query, offset, limit)
+        # 목록과 같이 작성자는 User 를 JOIN 하지 않고 뷰에서 작성자 캐시로 붙입니다. (attach_authors)
+        posts = Post.objects.defer(*LIST_DEFERRED_FIELDS).in_bulk(pks)
+        return [posts[pk] for pk in pks if pk in posts]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def fts5_available():
+    # 기본 DB가 SQLite이고 마이그레이션으로 FTS5 테이블이 만들어져 있는지 확인합니다.
+    connection = connections[router.db_for_read(Post) or DEFAULT_DB_ALIAS]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def get_search_backend():
+    # settings.BLOG_SEARCH_BACKEND 가 있으면 그 백엔드를, 없으면 DB에 맞는 백엔드를 사용합니다.
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+                if path:
+                    _backend = import_string(path)()
+                elif fts5_available():
+                    _backend = FTS5Backend()
+                else:
+                    _backend = InvertedIndexBackend()
+    return _backend
+
+
+def search_posts(query):
+    return SearchResults(get_search_backend(), query)
@@ -0,0 +1,208 @@
+# blog 앱의 시그널 핸들러입니다. apps.py 의 ready() 에서 불러와 연결됩니다.
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.authors import display_fields_changed
+from accounts.models import Profile
+
+from . import cache as blog_cache
+from . import counters
+from . import tags as blog_tags
+from .images import variants_are_current
+from .models import Comment, Post, Reply, Tag
+from .rendering import RENDERED_FIELDS, render_comment, render_post
+from .search import get_search_backend
+from .tasks import schedule_index_post, schedule_sitemap, schedule_thumbnails
+
+logger = logging.getLogger('my.blog')
+
+# 모델별 (변환 함수, 변환 결과에 영향을 주는 필드) 입니다.
+RENDERERS = {
+    Post: (render_post, {'content'}),
+    Comment: (render_comment, {'message', 'content'}),
+}
+
+
+def needs_render(sender, update_fields):
+    # update_fields 로 관계없는 필드만 저장하는 경우(조회수 등)에는 다시 변환하지 않습니다.
+    return update_fields is None or bool(RENDERERS[sender][1] & set(update_fields))
+
+
+# 게시글/댓글을 저장하기 전에 본문 HTML, 요약, 단어 수를 만들어 둡니다. (blog/rendering.py)
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not needs_render(sender, update_fields):
+        return
+    RENDERERS[sender][0](instance)
+
+
+# save(update_fields=['content']) 처럼 본문만 저장하면 변환 결과 필드는 저장되지 않으므로 따로 저장합니다.
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def save_rendered_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is None or not needs_render(sender, update_fields):
+        return
+    missing = [field for field in RENDERED_FIELDS if field not in update_fields]
+    if missing:
+        sender.objects.filter(pk=instance.pk).update(**{field: getattr(instance, field) for field in missing})
+
+
+# 게시글이 저장되면 검색 색인을 갱신합니다. (백그라운드 작업으로 넘길 수 있습니다)
+@receiver(post_save, sender=Post)
+def index_post_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_index_post(instance)
+
+
+# 게시글이 삭제되면 검색 색인에서 제거합니다.
+@receiver(post_delete, sender=Post)
+def remove_post_on_delete(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance.pk)
+
+
+# 게시글의 태그가 바뀌면 태그 필드를 다시 색인합니다.
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        schedule_index_post(instance)
+    elif pk_set:
+        # tag.post_set.add(...) 처럼 태그 쪽에서 바꾼 경우 해당 게시글들을 다시 색인합니다.
+        for post in Post.objects.filter(pk__in=pk_set):
+            schedule_index_post(post)
+
+
+# 태그 이름이 바뀌면 그 태그가 달린 게시글들을 다시 색인합니다.
+@receiver(post_save, sender=Tag)
+def index_posts_on_tag_rename(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    for post in instance.post_set.all():
+        schedule_index_post(post)
+
+
+# 게시글이 저장/삭제되면 그 게시글이 들어 있는 사이트맵 조각을 다시 씁니다. (blog/sitemaps.py)
+# 조회수처럼 주소나 수정 시각과 관계없는 필드만 저장한 경우에는 건너뜁니다.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_sitemap_on_change(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'updated_at' not in update_fields and not created):
+        return
+    schedule_sitemap(instance.pk)
+
+
+# 게시글이 저장/삭제되면 상세 페이지와 목록 페이지 캐시를 무효화합니다.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    blog_cache.invalidate_post(instance.pk)
+
+
+# 댓글/답글이 저장/삭제되면 해당 게시글의 댓글 조각과 상세 페이지 캐시를 무효화합니다.
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Reply)
+@receiver(post_delete, sender=Reply)
+def invalidate_thread_cache(sender, instance, **kwargs):
+    blog_cache.invalidate_thread(instance.post_id)
+
+
+# 게시글의 태그 연결이 바뀌면 해당 게시글의 캐시를 무효화합니다.
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_cache_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        blog_cache.invalidate_post(instance.pk)
+    elif pk_set is None:
+        # tag.post_set.clear() 는 어떤 게시글이 바뀌었는지 알 수 없으므로 태그를 보여주는 페이지를 모두 무효화합니다.
+        blog_cache.invalidate_tags()
+    else:
+        for pk in pk_set:
+            blog_cache.invalidate_post(pk)
+
+
+# 게시글의 태그 연결이 바뀌면 태그별 게시글 수(Tag.post_count)를 갱신합니다. (blog/tags.py)
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tags_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # clear() 는 post_clear 에 pk_set 을 주지 않으므로 지우기 전에 연결된 태그를 기억해 둡니다.
+        if not reverse:
+            instance._cleared_tag_ids = blog_tags.post_tag_ids(instance.pk)
+        return
+    if reverse:
+        # tag.post_set.add(...) 처럼 태그 쪽에서 바꾼 경우입니다.
+        if action == 'post_clear':
+            Tag.objects.filter(pk=instance.pk).update(post_count=0)
+        elif action in ('post_add', 'post_remove') and pk_set:
+            blog_tags.change_post_counts([instance.pk], len(pk_set) if action == 'post_add' else -len(pk_set))
+        return
+    if action == 'post_add':
+        blog_tags.change_post_counts(pk_set, 1)
+    elif action == 'post_remove':
+        blog_tags.change_post_counts(pk_set, -1)
+    elif action == 'post_clear':
+        blog_tags.change_post_counts(getattr(instance, '_cleared_tag_ids', ()), -1)
+        instance._cleared_tag_ids = []
+
+
+# 게시글이 삭제되면 중간 테이블의 연결도 함께 지워지지만 m2m_changed 는 나가지 않으므로 여기서 게시글 수를 줄입니다.
+@receiver(pre_delete, sender=Post)
+def remember_tags_on_delete(sender, instance, **kwargs):
+    instance._deleted_tag_ids = blog_tags.post_tag_ids(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def count_tags_on_delete(sender, instance, **kwargs):
+    blog_tags.change_post_counts(getattr(instance, '_deleted_tag_ids', ()), -1)
+
+
+# 태그가 바뀌거나 삭제되면 태그를 보여주는 모든 페이지 캐시를 무효화합니다.
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_cache(sender, **kwargs):
+    blog_cache.invalidate_tags()
+
+
+# 썸네일이 새로 올라오거나 바뀌면 크기별 파생 이미지를 만듭니다. (백그라운드 작업으로 넘길 수 있습니다)
+@receiver(post_save, sender=Post)
+def generate_thumb_derivatives(sender, instance, raw=False, **kwargs):
+    if raw or not instance.thumb_image or variants_are_current(instance):
+        return
+    try:
+        schedule_thumbnails(instance)
+    except Exception:
+        # 파생 이미지를 만들지 못해도 게시글 저장은 실패시키지 않습니다. (템플릿은 원본을 보여줍니다)
+        logger.exception('게시글 %s 의 파생 이미지를 만들지 못했습니다.', instance.pk)
+
+
+# 댓글/답글이 생기거나 지워지면 게시글의 댓글 수, 답글 수, 마지막 활동 시각을 갱신하고 목록 페이지 캐시를 무효화합니다.
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Reply)
+def count_on_create(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    counters.record_added('comment' if sender is Comment else 'reply', instance.post_id, instance.created_at)
+    blog_cache.bump_versions(blog_cache.LIST_SCOPE)
+
+
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Reply)
+def count_on_delete(sender, instance, **kwargs):
+    counters.record_removed('comment' if sender is Comment else 'reply', instance.post_id)
+    blog_cache.bump_versions(blog_cache.LIST_SCOPE)
+
+
+# 작성자 아이디/닉네임이 바뀌면 작성자를 보여주는 페이지와 댓글 조각 캐시를 무효화합니다.
+@receiver(post_save, sender=get_user_model())
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_author_pages(sender, instance, update_fields=None, **kwargs):
+    if display_fields_changed(sender, update_fields):
+        blog_cache.invalidate_authors()
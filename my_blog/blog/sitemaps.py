@@ -0,0 +1,216 @@
+# 검색 엔진용 사이트맵 파일을 미리 만들어 디스크에 저장하고 내려주는 모듈입니다. (만들기: manage.py build_sitemaps)
+#
+# 크롤러가 목록 페이지를 넘겨 가며 게시글을 찾지 않도록 모든 게시글 주소를 사이트맵에 넣고,
+# 크롤러 요청 때는 DB 를 읽지 않도록 파일로 만들어 두고 sitemap_file 뷰가 그대로 내려줍니다.
+#   sitemap.xml: 사이트맵 색인 (조각 파일 목록과 각 파일의 수정 시각)
+#   sitemap-0.xml.gz: 언어별 고정 페이지 (첫 화면, 게시글 목록, 태그)
+#   sitemap-N.xml.gz (N >= 1): pk 가 (N-1)*P+1 ~ N*P 인 게시글 (P = MAX_URLS // 언어 수)
+# 게시글 주소는 언어마다 하나씩(/ko/blog/1/, /en/blog/1/) 넣고 서로를 hreflang 대체 주소로 연결합니다.
+# 조각을 pk 범위로 나누므로 게시글이 저장/삭제되면 그 게시글이 속한 조각 하나와 색인만 다시 씁니다. (tasks.py)
+# 파일은 한 항목씩 gzip 으로 스트리밍해 임시 파일에 쓰고 다 쓴 뒤 이름을 바꾸므로 쓰는 도중의 파일이 내려가지 않습니다.
+import gzip
+import os
+import re
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils import translation
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .media import make_etag
+from .models import Post
+
+DEFAULTS = {
+    # 사이트맵 파일을 저장할 폴더입니다. 없으면 BASE_DIR/sitemaps 를 씁니다.
+    'DIRECTORY': None,
+    # 사이트맵 안의 주소 앞에 붙일 사이트 주소입니다. (요청 없이 만들므로 직접 지정합니다)
+    'BASE_URL': 'http://localhost:8000',
+    # 사이트맵 파일 하나에 넣을 수 있는 최대 주소 수입니다. (sitemaps.org 제한 50,000)
+    'MAX_URLS': 50000,
+    # 게시글을 DB 에서 한 번에 읽어 올 개수입니다.
+    'CHUNK_SIZE': 2000,
+}
+INDEX_NAME = 'sitemap.xml'
+SHARD_NAME_RE = re.compile(r'^sitemap-(\d+)\.xml\.gz$')
+# 고정 페이지 (URL 이름) 입니다.
+PAGES = ['main:index', 'blog:post_list', 'blog:tag_list']
+URLSET_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+)
+URLSET_END = '</urlset>\n'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BLOG_SITEMAPS', {}))
+    return config
+
+
+def get_directory():
+    return str(get_config()['DIRECTORY'] or os.path.join(settings.BASE_DIR, 'sitemaps'))
+
+
+def get_languages():
+    return [code for code, _ in settings.LANGUAGES]
+
+
+def posts_per_shard():
+    # 게시글 하나가 언어 수만큼 주소를 차지하므로 조각 하나에 넣을 게시글 수를 그만큼 줄입니다.
+    return max(get_config()['MAX_URLS'] // len(get_languages()), 1)
+
+
+def shard_for(pk):
+    return (pk - 1) // posts_per_shard() + 1
+
+
+def shard_name(number):
+    return f'sitemap-{number}.xml.gz'
+
+
+def absolute_url(path):
+    return get_config()['BASE_URL'].rstrip('/') + path
+
+
+def localized_urls(get_path):
+    # {언어 코드: 절대 주소} 를 반환합니다. get_path 는 현재 언어의 경로를 돌려주는 함수입니다. (i18n_patterns 접두사 포함)
+    urls = {}
+    for code in get_languages():
+        with translation.override(code):
+            urls[code] = absolute_url(get_path())
+    return urls
+
+
+def url_entries(urls, lastmod=None):
+    # 언어별 주소마다 <url> 하나씩 만들고, 각각에 모든 언어의 hreflang 대체 주소를 넣습니다.
+    default = translation.get_supported_language_variant(settings.LANGUAGE_CODE)
+    alternates = ''.join(
+        f'<xhtml:link rel="alternate" hreflang={quoteattr(code)} href={quoteattr(url)}/>' for code, url in urls.items()
+    )
+    if default in urls:
+        alternates += f'<xhtml:link rel="alternate" hreflang="x-default" href={quoteattr(urls[default])}/>'
+    lastmod = f'<lastmod>{lastmod.isoformat(timespec="seconds")}</lastmod>' if lastmod else ''
+    return ''.join(f'<url><loc>{escape(url)}</loc>{lastmod}{alternates}</url>\n' for url in urls.values())
+
+
+def write_file(name, chunks, compress=True):
+    # chunks 를 임시 파일에 차례로 쓰고 다 쓰면 name 으로 바꿉니다. 아무것도 쓰지 않았으면 기존 파일을 지우고 False 를 반환합니다.
+    directory = get_directory()
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.sitemap-', suffix='.tmp')
+    wrote = False
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            out = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if compress else raw
+            try:
+                for chunk in chunks:
+                    out.write(chunk.encode())
+                    wrote = True
+            finally:
+                if compress:
+                    out.close()
+        path = os.path.join(directory, name)
+        if wrote:
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        elif os.path.exists(path):
+            os.remove(path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return wrote
+
+
+def urlset(entries):
+    # 항목이 하나도 없으면 아무것도 내보내지 않습니다. (빈 조각 파일은 만들지 않습니다)
+    started = False
+    for entry in entries:
+        if not started:
+            yield URLSET_START
+            started = True
+        yield entry
+    if started:
+        yield URLSET_END
+
+
+def write_pages():
+    entries = (url_entries(localized_urls(lambda: reverse(name))) for name in PAGES)
+    return write_file(shard_name(0), urlset(entries))
+
+
+def write_post_shard(number):
+    # 조각 하나에 들어갈 게시글만 pk 범위로 읽어(기본 키 인덱스) 씁니다. 게시글이 없으면 조각 파일을 지웁니다.
+    per_shard = posts_per_shard()
+    posts = (
+        Post.objects.filter(pk__gte=(number - 1) * per_shard + 1, pk__lte=number * per_shard)
+        .order_by('pk').only('pk', 'updated_at').iterator(chunk_size=get_config()['CHUNK_SIZE'])
+    )
+    entries = (url_entries(localized_urls(post.get_absolute_url), post.updated_at) for post in posts)
+    return write_file(shard_name(number), urlset(entries))
+
+
+def shard_numbers():
+    # 디스크에 있는 조각 파일 번호 목록입니다.
+    try:
+        names = os.listdir(get_directory())
+    except FileNotFoundError:
+        return []
+    return sorted(int(match.group(1)) for match in map(SHARD_NAME_RE.match, names) if match)
+
+
+def write_index():
+    directory = get_directory()
+
+    def entries():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for number in shard_numbers():
+            name = shard_name(number)
+            modified = datetime.fromtimestamp(int(os.stat(os.path.join(directory, name)).st_mtime), tz=dt_timezone.utc)
+            yield f'<sitemap><loc>{escape(absolute_url("/" + name))}</loc><lastmod>{modified.isoformat()}</lastmod></sitemap>\n'
+        yield '</sitemapindex>\n'
+
+    return write_file(INDEX_NAME, entries(), compress=False)
+
+
+def build_all():
+    # 모든 조각과 색인을 다시 만들고 만든 게시글 조각 수를 반환합니다. 더 이상 게시글이 없는 조각 파일은 지웁니다.
+    write_pages()
+    last_pk = Post.objects.order_by('-pk').values_list('pk', flat=True).first()
+    last_shard = shard_for(last_pk) if last_pk else 0
+    written = 0
+    for number in range(1, last_shard + 1):
+        written += write_post_shard(number)
+    for number in shard_numbers():
+        if number > last_shard:
+            os.remove(os.path.join(get_directory(), shard_name(number)))
+    write_index()
+    return written
+
+
+def update_shard(number):
+    # 게시글이 저장/삭제되었을 때 그 게시글이 속한 조각(shard_for(pk))과 색인만 다시 씁니다.
+    write_post_shard(number)
+    write_index()
+
+
+def sitemap_file(request, name):
+    # 미리 만든 사이트맵 파일을 그대로 내려줍니다. DB 를 읽지 않으며 조건부 요청에는 304 로 답합니다.
+    path = os.path.join(get_directory(), name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404('사이트맵이 아직 만들어지지 않았습니다.')
+    etag = make_etag(stat)
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = 'application/gzip' if name.endswith('.gz') else 'application/xml; charset=utf-8'
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    return response
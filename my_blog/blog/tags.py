@@ -0,0 +1,127 @@
+# 게시글에 태그를 붙이는 서비스입니다.
+# 태그 수와 상관없이 태그 조회(IN), 없는 태그 생성(bulk_create), 연결(중간 테이블 bulk_create)을 일정한 쿼리 수로 처리합니다.
+# PostForm 과 대량 가져오기 스크립트가 함께 사용합니다.
+#
+# 태그별 게시글 수(Tag.post_count)도 여기서 관리합니다. 태그 구름이 행마다 COUNT 하지 않도록 값을 저장해 두고,
+# 연결이 바뀔 때 signals.py 에서 UPDATE ... SET post_count = post_count + n 처럼 갱신합니다.
+# 중간 테이블에 직접 쓰는 등 시그널이 나가지 않는 경로로 어긋난 값은 manage.py reconcile_tag_counts 로 바로잡습니다.
+from django.db import router, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed
+
+from .models import Post, PostTag, Tag
+
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def parse_tag_names(value):
+    # '파이썬, 장고 ,,파이썬' 같은 입력을 ['파이썬', '장고'] 로 정리합니다. (공백 정리, 빈 값 제거, 중복 제거)
+    if isinstance(value, str):
+        value = value.split(',')
+    names = []
+    seen = set()
+    for name in value or ():
+        name = ' '.join(str(name).split())[:TAG_NAME_MAX_LENGTH]
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def resolve_tags(names):
+    # 이름 목록에 해당하는 Tag를 {이름: Tag} 로 반환합니다. 없는 태그는 한 번에 만듭니다.
+    names = parse_tag_names(names)
+    if not names:
+        return {}
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        # 동시에 같은 태그를 만드는 요청이 있어도 충돌을 무시하고, 만든 뒤 다시 한 번에 읽어옵니다.
+        Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+        tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+    return tags
+
+
+def assign_tags(post_tags, replace=False):
+    # {게시글: 태그 이름 목록} 의 태그를 중간 테이블에 한 번에 연결합니다.
+    # replace=True 이면 목록에 없는 기존 태그 연결은 제거합니다. (게시글 수정 시 사용)
+    # 중간 테이블에 직접 쓰므로 검색 색인 등이 갱신되도록 m2m_changed 시그널을 직접 보냅니다.
+    post_tags = {post: parse_tag_names(names) for post, names in post_tags.items()}
+    Through = Post.tags.through
+    using = router.db_for_write(Through)
+    with transaction.atomic(using=using):
+        tags = resolve_tags([name for names in post_tags.values() for name in names])
+        wanted = {
+            post.pk: {tags[name].pk for name in names if name in tags}
+            for post, names in post_tags.items()
+        }
+        current = {post.pk: set() for post in post_tags}
+        for post_id, tag_id in Through.objects.filter(post_id__in=list(current)).values_list('post_id', 'tag_id'):
+            current[post_id].add(tag_id)
+
+        removed = {}
+        if replace:
+            removed = {pk: current[pk] - wanted[pk] for pk in current if current[pk] - wanted[pk]}
+        added = {pk: wanted[pk] - current[pk] for pk in wanted if wanted[pk] - current[pk]}
+        posts = {post.pk: post for post in post_tags}
+
+        for pk, tag_ids in removed.items():
+            m2m_changed.send(sender=Through, action='pre_remove', instance=posts[pk], reverse=False, model=Tag, pk_set=tag_ids, using=using)
+        for pk, tag_ids in added.items():
+            m2m_changed.send(sender=Through, action='pre_add', instance=posts[pk], reverse=False, model=Tag, pk_set=tag_ids, using=using)
+
+        for pk, tag_ids in removed.items():
+            Through.objects.filter(post_id=pk, tag_id__in=tag_ids).delete()
+        if added:
+            Through.objects.bulk_create(
+                [Through(post_id=pk, tag_id=tag_id) for pk, tag_ids in added.items() for tag_id in tag_ids],
+                ignore_conflicts=True,
+            )
+
+        for pk, tag_ids in removed.items():
+            m2m_changed.send(sender=Through, action='post_remove', instance=posts[pk], reverse=False, model=Tag, pk_set=tag_ids, using=using)
+        for pk, tag_ids in added.items():
+            m2m_changed.send(sender=Through, action='post_add', instance=posts[pk], reverse=False, model=Tag, pk_set=tag_ids, using=using)
+    return tags
+
+
+def set_post_tags(post, names):
+    # 한 게시글의 태그를 입력한 목록과 같게 맞춥니다.
+    return assign_tags({post: names}, replace=True)
+
+
+def change_post_counts(tag_ids, delta):
+    # 태그들의 게시글 수를 delta 만큼 한 번의 UPDATE 로 바꿉니다. 이미 어긋난 값이 음수가 되지 않도록 0 에서 멈춥니다.
+    tag_ids = list(tag_ids or ())
+    if not tag_ids or not delta:
+        return
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Greatest(F('post_count') + delta, Value(0)))
+
+
+def post_tag_ids(post_id):
+    # 게시글에 달린 태그 pk 목록입니다.
+    return list(PostTag.objects.filter(post_id=post_id).values_list('tag_id', flat=True))
+
+
+def actual_post_count(post_tag_model):
+    # 중간 테이블에서 다시 계산한 태그별 게시글 수입니다.
+    counts = (
+        post_tag_model.objects.filter(tag=OuterRef('pk')).order_by().values('tag')
+        .annotate(value=Count('pk')).values('value')
+    )
+    return Coalesce(Subquery(counts), 0, output_field=IntegerField())
+
+
+def reconcile_post_counts(tag_model, post_tag_model, chunk_size=500, dry_run=False):
+    # 저장된 게시글 수가 실제와 다른 태그만 찾아 chunk_size 개씩 한 번의 UPDATE 로 고칩니다. 고친(고칠) 태그 수를 반환합니다.
+    actual = actual_post_count(post_tag_model)
+    pks = list(
+        tag_model.objects.annotate(actual_post_count=actual)
+        .exclude(post_count=F('actual_post_count'))
+        .values_list('pk', flat=True)
+    )
+    if not dry_run:
+        for start in range(0, len(pks), chunk_size):
+            tag_model.objects.filter(pk__in=pks[start:start + chunk_size]).update(post_count=actual)
+    return len(pks)
@@ -0,0 +1,66 @@
+# 게시글 저장 요청에서 떼어내 백그라운드 작업자(manage.py runworker)가 실행하는 작업들입니다.
+# settings.BLOG_BACKGROUND_TASKS 가 False 이면 요청 안에서 바로 실행합니다.
+from django.conf import settings
+from django.db import transaction
+
+from jobs.queue import task
+
+from . import sitemaps
+from .images import generate_post_derivatives
+from .models import Post
+from .search import get_search_backend
+
+
+def background_enabled():
+    return getattr(settings, 'BLOG_BACKGROUND_TASKS', True)
+
+
+@task
+def index_post(post_id):
+    # 게시글을 검색 색인에 반영합니다. 그 사이에 삭제되었다면 색인에서 제거합니다.
+    post = Post.objects.filter(pk=post_id).first()
+    backend = get_search_backend()
+    if post is None:
+        backend.remove_post(post_id)
+    else:
+        backend.index_post(post)
+
+
+@task
+def generate_thumbnails(post_id):
+    # 게시글 썸네일의 크기별 파생 이미지를 만듭니다. 실패하면 작업 대기열이 다시 시도합니다.
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        generate_post_derivatives(post)
+
+
+@task
+def update_sitemap(shard):
+    # 사이트맵 조각 하나와 색인을 다시 씁니다. (blog/sitemaps.py)
+    sitemaps.update_shard(shard)
+
+
+def schedule_index_post(post):
+    backend = get_search_backend()
+    # 프로세스 메모리 색인은 작업자 프로세스에서 갱신할 수 없으므로 바로 반영합니다.
+    if background_enabled() and backend.shared:
+        index_post.delay_once(post.pk)
+    else:
+        backend.index_post(post)
+
+
+def schedule_thumbnails(post):
+    if background_enabled():
+        generate_thumbnails.delay_once(post.pk)
+    else:
+        generate_post_derivatives(post)
+
+
+def schedule_sitemap(post_id):
+    # 같은 조각을 다시 쓰는 작업이 대기 중이면 새로 넣지 않으므로 게시글을 연달아 저장해도 조각은 한 번만 씁니다.
+    # 바로 실행할 때도 저장한 내용을 읽도록 트랜잭션이 커밋된 뒤에 씁니다.
+    shard = sitemaps.shard_for(post_id)
+    if background_enabled():
+        update_sitemap.delay_once(shard)
+    else:
+        transaction.on_commit(lambda: sitemaps.update_shard(shard))
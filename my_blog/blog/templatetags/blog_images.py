@@ -0,0 +1,32 @@
+from django import template
+from django.utils.html import format_html
+
+from blog.images import derivative_name, variants_are_current
+
+register = template.Library()
+
+
+# 게시글 썸네일을 화면 너비에 맞는 파생 이미지로 보여주는 태그입니다.
+# 사용법: {% load blog_images %} {% post_image post alt=post.title %}
+# 파생 이미지가 아직 없으면 원본 이미지를 그대로 보여줍니다.
+@register.simple_tag
+def post_image(post, alt='', css_class='img-fluid rounded', sizes='(max-width: 992px) 100vw, 730px'):
+    if not post.thumb_image:
+        return ''
+    if not variants_are_current(post) or not post.thumb_variants.get('widths'):
+        return format_html(
+            '<img class="{}" src="{}" alt="{}" loading="lazy" />', css_class, post.thumb_image.url, alt
+        )
+    name = post.thumb_image.name
+    storage = post.thumb_image.storage
+    widths = post.thumb_variants['widths']
+
+    def srcset(ext):
+        return ', '.join(f'{storage.url(derivative_name(name, width, ext))} {width}w' for width in widths)
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}" />'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy" /></picture>',
+        srcset('webp'), sizes,
+        css_class, storage.url(derivative_name(name, widths[-1], 'jpg')), srcset('jpg'), sizes, alt,
+    )
@@ -1,3 +1,1145 @@
-from django.test import TestCase
+import datetime
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.http import Http404
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, reverse
+from django.utils import translation
+from django.utils.http import http_date
+
+from accounts.models import Profile
+from blogbase.testing import QueryBudgetMixin
+
+from . import cache as blog_cache
+from . import search, sitemaps, transfer, uploads, viewcount
+from .media import MediaFileView, make_etag, parse_range
+from .rendering import RENDER_VERSION, html_to_text, sanitize_html
+from .models import ChunkedUpload, Comment, Post, Reply, Tag
+from .pagination import KeysetPaginator, decode_cursor, decode_id_cursor, encode_cursor, encode_id_cursor
+from .tags import parse_tag_names, resolve_tags, set_post_tags
+
+# 테스트마다 비어 있는 캐시로 시작하도록 파일 캐시 대신 프로세스 메모리 캐시를 씁니다.
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in ('default', 'blog', 'sessions')
+}
+
+
+# 목록/상세 페이지의 쿼리 수가 settings.REQUEST_PROFILING['BUDGETS'] 의 예산을 넘지 않는지 확인합니다.
+# 댓글/답글/태그/작성자가 여럿인 게시글로 요청하므로 템플릿에 N+1 쿼리가 생기면 실패합니다.
+# 읽기는 replica 연결로 가므로 두 연결의 쿼리를 함께 셉니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class PostPageQueryBudgetTests(QueryBudgetMixin, TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.users = []
+        for i in range(5):
+            user = User.objects.create_user(f'writer{i}', password='password')
+            Profile.objects.create(user=user, nickname=f'작성자{i}')
+            self.users.append(user)
+        # 키셋 페이지네이션의 다음 페이지가 생기도록 한 페이지(20개)보다 많이 만듭니다.
+        for i in range(25):
+            post = Post.objects.create(user=self.users[i % 5], title=f'검색 제목 {i}', content=f'본문 {i}')
+            set_post_tags(post, ['파이썬', f'태그{i % 4}'])
+        self.post = Post.objects.create(user=self.users[0], title='댓글 많은 글', content='본문')
+        set_post_tags(self.post, ['파이썬', '장고', '캐시'])
+        for i, user in enumerate(self.users):
+            comment = Comment.objects.create(post=self.post, user=user, message=f'댓글 {i}', content=f'<p>댓글 {i}</p>')
+            for j, replier in enumerate(self.users[:3]):
+                Reply.objects.create(post=self.post, comment=comment, user=replier, message=f'답글 {i}-{j}')
+        # TransactionTestCase 는 테이블을 비울 때 시그널을 보내지 않아 FTS 색인에 이전 테스트의 게시글이 남으므로 다시 만듭니다.
+        search.get_search_backend().rebuild()
+        self.client.force_login(self.users[1])
+        # 요청 밖에서는 활성 언어가 없으므로 언어 접두사가 붙은 주소를 직접 만듭니다.
+        with translation.override('ko'):
+            self.list_url = reverse('blog:post_list')
+            self.detail_url = reverse('blog:post_detail', args=[self.post.pk])
+
+    def test_post_list(self):
+        response = self.assertQueryBudget(self.list_url)
+        self.assertEqual(len(response.context['post_list']), 20)
+
+    def test_post_list_search(self):
+        response = self.assertQueryBudget(self.list_url + '?q=검색')
+        self.assertContains(response, '검색 제목')
+
+    def test_post_list_keyset_cursor(self):
+        cursor = self.client.get(self.list_url).context['page_obj'].next_cursor
+        response = self.assertQueryBudget(self.list_url + f'?after={cursor}')
+        self.assertEqual(len(response.context['post_list']), 6)
+
+    def test_post_detail(self):
+        response = self.assertQueryBudget(self.detail_url)
+        self.assertContains(response, '답글 4-2')
+        self.assertContains(response, '작성자4')
+        self.assertContains(response, '장고')
+
+    def test_post_forms(self):
+        with translation.override('ko'):
+            new_url = reverse('blog:post_new')
+            edit_url = reverse('blog:post_edit', args=[self.post.pk])
+        self.client.force_login(self.users[0])
+        self.assertQueryBudget(new_url)
+        response = self.assertQueryBudget(edit_url)
+        self.assertContains(response, '파이썬')
+
+    # 저장 요청은 검색 색인/썸네일/사이트맵을 runworker 에 넘기는 운영 설정으로 'POST ...' 예산을 확인합니다.
+    @override_settings(BLOG_BACKGROUND_TASKS=True, JOBS={'EAGER': False})
+    def test_post_save(self):
+        with translation.override('ko'):
+            new_url = reverse('blog:post_new')
+            edit_url = reverse('blog:post_edit', args=[self.post.pk])
+        self.client.force_login(self.users[0])
+        data = {'title': '새 글', 'content': '본문', 'tags': '파이썬, 새태그'}
+        response = self.assertQueryBudget(new_url, method='post', data=data)
+        self.assertEqual(response.status_code, 302)
+        response = self.assertQueryBudget(edit_url, method='post', data=data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(sorted(self.post.tags.values_list('name', flat=True)), ['새태그', '파이썬'])
+
+
+# 조회수 버퍼가 반영 실패나 동시 증가/반영에도 조회수를 잃지 않는지 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_VIEW_COUNTER={'FLUSH_INTERVAL': 0})
+class ViewCounterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        viewcount._backend = None
+        self.addCleanup(setattr, viewcount, '_backend', None)
+        user = User.objects.create_user('reader', password='password')
+        self.posts = [Post.objects.create(user=user, title=f'글 {i}', content='본문') for i in range(3)]
+
+    def view_counts(self):
+        return dict(Post.objects.values_list('pk', 'view_count'))
+
+    def test_memory_flush_writes_increments(self):
+        counter = viewcount.MemoryBackend()
+        for _ in range(3):
+            counter.incr(self.posts[0].pk)
+        counter.incr(self.posts[1].pk, 2)
+        self.assertEqual(counter.pending(self.posts[0].pk), 3)
+        self.assertEqual(counter.flush(), 5)
+        self.assertEqual(counter.pending(self.posts[0].pk), 0)
+        counts = self.view_counts()
+        self.assertEqual(counts[self.posts[0].pk], 3)
+        self.assertEqual(counts[self.posts[1].pk], 2)
+        self.assertEqual(counts[self.posts[2].pk], 0)
+
+    def test_failed_flush_restores_buffer(self):
+        for counter in (viewcount.MemoryBackend(), viewcount.CacheBackend()):
+            with self.subTest(backend=type(counter).__name__):
+                counter.incr(self.posts[0].pk, 4)
+                with mock.patch.object(viewcount, 'write_increments', side_effect=RuntimeError):
+                    with self.assertRaises(RuntimeError):
+                        counter.flush()
+                self.assertEqual(counter.pending(self.posts[0].pk), 4)
+                self.assertEqual(counter.flush(), 4)
+        self.assertEqual(self.view_counts()[self.posts[0].pk], 8)
+
+    def test_concurrent_incr_and_flush_loses_nothing(self):
+        threads_count, per_thread = 8, 200
+        for counter in (viewcount.MemoryBackend(), viewcount.CacheBackend()):
+            with self.subTest(backend=type(counter).__name__):
+                Post.objects.update(view_count=0)
+                def view():
+                    for i in range(per_thread):
+                        counter.incr(self.posts[i % 3].pk)
+
+                threads = [threading.Thread(target=view) for _ in range(threads_count)]
+                for thread in threads:
+                    thread.start()
+                # 증가가 진행되는 동안 반영을 반복합니다.
+                flushed = 0
+                while any(thread.is_alive() for thread in threads):
+                    flushed += counter.flush()
+                for thread in threads:
+                    thread.join()
+                flushed += counter.flush()
+                self.assertEqual(flushed, threads_count * per_thread)
+                self.assertEqual(sum(self.view_counts().values()), threads_count * per_thread)
+
+    @override_settings(CACHES={
+        **TEST_CACHES,
+        'viewcounts': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/viewcounts'},
+    })
+    def test_cache_backend_refuses_non_atomic_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            viewcount.CacheBackend(cache_alias='viewcounts')
+
+    def test_flush_command_warns_for_process_local_buffer(self):
+        viewcount.get_view_counter().incr(self.posts[0].pk, 2)
+        out = StringIO()
+        call_command('flush_view_counts', stdout=out)
+        self.assertIn('반영할 수 없습니다', out.getvalue())
+        # 자기 프로세스의 버퍼는 반영합니다.
+        self.assertEqual(self.view_counts()[self.posts[0].pk], 2)
+
+    @override_settings(BLOG_VIEW_COUNTER={'BACKEND': 'blog.viewcount.CacheBackend', 'FLUSH_INTERVAL': 0})
+    def test_flush_command_collects_other_processes_counts(self):
+        # 다른 웹 프로세스가 공유 캐시에 기록한 조회수는 이 프로세스의 _seen 에 없으므로 전체 게시글을 확인해야 합니다.
+        viewcount.CacheBackend().incr(self.posts[2].pk, 5)
+        out = StringIO()
+        with mock.patch.object(viewcount.CacheBackend, 'shared', True):
+            call_command('flush_view_counts', '--chunk-size', '2', stdout=out)
+        self.assertIn('조회수 5건을 반영했습니다.', out.getvalue())
+        self.assertEqual(self.view_counts()[self.posts[2].pk], 5)
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=1000-': (1000, 1023),
+            'bytes=0-5000': (0, 1023),
+            'bytes=-100': (924, 1023),
+            'bytes=-5000': (0, 1023),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1024), expected)
+
+    def test_ignored_ranges(self):
+        # 형식이 잘못되었거나 여러 구간이면 Range 를 무시하고 전체를 보냅니다.
+        for header in ('bytes=5-2', 'bytes=0-1,5-6', 'items=0-1', 'bytes=-'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1024))
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=1024-', 'bytes=2000-3000', 'bytes=-0'):
+            with self.subTest(header=header), self.assertRaises(ValueError):
+                parse_range(header, 1024)
+
+
+# 첨부 파일 뷰의 Range(206/416)와 If-Range/ETag 조건부 요청을 확인합니다.
+class MediaFileViewTests(SimpleTestCase):
+    data = bytes(range(256)) * 4
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, 'blog', 'files'))
+        self.path = os.path.join(media_root, 'blog', 'files', 'video.mp4')
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+        self.etag = make_etag(os.stat(self.path))
+        override = override_settings(MEDIA_ROOT=media_root, BLOG_MEDIA_OFFLOAD=None)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, path='video.mp4', **headers):
+        request = RequestFactory().get(f'/media/blog/files/{path}', headers=headers)
+        response = MediaFileView.as_view()(request, path=path)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+            response.close()
+        return response
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_byte_ranges(self):
+        cases = {
+            'bytes=10-19': (10, 19),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-24': (1000, 1023),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/1024')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(response.body, self.data[start:end + 1])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range='bytes=4096-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_if_range(self):
+        # 가진 사본이 현재 파일과 같을 때만 구간을 보내고, 바뀌었으면 전체를 새로 보냅니다.
+        mtime = os.stat(self.path).st_mtime
+        cases = [
+            (self.etag, 206),
+            ('"stale"', 200),
+            (http_date(mtime), 206),
+            (http_date(mtime - 60), 200),
+        ]
+        for if_range, status in cases:
+            with self.subTest(if_range=if_range):
+                response = self.get(Range='bytes=0-9', **{'If-Range': if_range})
+                self.assertEqual(response.status_code, status)
+
+    def test_conditional_requests(self):
+        self.assertEqual(self.get(**{'If-None-Match': self.etag}).status_code, 304)
+        self.assertEqual(self.get(**{'If-None-Match': '"stale"'}).status_code, 200)
+        self.assertEqual(self.get(**{'If-Match': '"stale"'}).status_code, 412)
+
+    def test_missing_or_outside_path(self):
+        for path in ('missing.mp4', '../../secret.txt'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                self.get(path)
+
+
+def reload_urlconf():
+    # blog/urls.py 는 불러올 때 BLOG_ASYNC_VIEWS 를 보고 뷰를 고르므로 설정을 바꾼 뒤 다시 불러옵니다.
+    importlib.reload(importlib.import_module('blog.urls'))
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+# BLOG_ASYNC_VIEWS 를 켰을 때 ASGI 로 처리되는 비동기 목록/상세 뷰를 확인합니다.
+# 이벤트 루프에서 동기 쿼리를 하면 SynchronousOnlyOperation 으로 실패합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False, BLOG_ASYNC_VIEWS=True)
+class AsyncPostViewTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        reload_urlconf()
+        self.addCleanup(reload_urlconf)
+        user = User.objects.create_user('writer', password='password')
+        for i in range(25):
+            Post.objects.create(user=user, title=f'검색 제목 {i}', content=f'본문 {i}')
+        self.post = Post.objects.create(user=user, title='댓글 있는 글', content='본문')
+        Comment.objects.create(post=self.post, user=user, message='첫 댓글', content='<p>첫 댓글</p>')
+        viewcount._backend = None
+        self.addCleanup(setattr, viewcount, '_backend', None)
+        # 이전 테스트의 게시글이 색인에 남지 않도록 다시 만들고, 첫 검색에서 백엔드를 고르도록 합니다. (fts5_available 의 쿼리)
+        search.get_search_backend().rebuild()
+        search._backend = None
+        self.client = AsyncClient()
+        with translation.override('ko'):
+            self.list_url = reverse('blog:post_list')
+            self.detail_url = reverse('blog:post_detail', args=[self.post.pk])
+
+    async def test_list_uses_async_view(self):
+        response = await self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.resolver_match.func.view_class.__name__, 'AsyncPostListView')
+        self.assertEqual(len(response.context['post_list']), 20)
+        cursor = response.context['page_obj'].next_cursor
+        response = await self.client.get(self.list_url + f'?after={cursor}')
+        self.assertEqual(len(response.context['post_list']), 6)
+
+    async def test_search(self):
+        response = await self.client.get(self.list_url + '?q=검색')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '검색 제목')
+        self.assertEqual(response.context['paginator'].count, 25)
+
+    async def test_detail(self):
+        response = await self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '첫 댓글')
+        self.assertEqual(await viewcount.get_view_counter().apending(self.post.pk), 1)
+        response = await self.client.get(self.detail_url.replace(str(self.post.pk), '999999'))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_not_modified(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                response = await self.client.get(url)
+                self.assertIn('ETag', response)
+                response = await self.client.get(url, headers={'If-None-Match': response['ETag']})
+                self.assertEqual(response.status_code, 304)
+
+
+# 댓글 리치 텍스트의 허용 목록 정리(blog/rendering.py)가 스크립트를 실행할 수 있는 HTML 을 남기지 않는지 확인합니다.
+class SanitizerTests(SimpleTestCase):
+    def test_javascript_urls(self):
+        for html in (
+            '<a href="javascript:alert(1)">x</a>',
+            '<a href=" JaVaScRiPt:alert(1)">x</a>',
+            '<a href="java&#x09;script:alert(1)">x</a>',
+            '<a href="data:text/html,<script>alert(1)</script>">x</a>',
+            '<img src="vbscript:msgbox(1)">',
+        ):
+            with self.subTest(html=html):
+                output = sanitize_html(html)
+                self.assertNotIn('href', output)
+                self.assertNotIn('src', output)
+                self.assertNotIn('script:', output.lower())
+
+    def test_allowed_urls(self):
+        self.assertEqual(
+            sanitize_html('<a href="https://example.com/a?b=1">링크</a>'),
+            '<a href="https://example.com/a?b=1" rel="nofollow noopener">링크</a>',
+        )
+        self.assertEqual(sanitize_html('<img src="/media/a.png" alt="그림">'), '<img src="/media/a.png" alt="그림">')
+
+    def test_event_handlers_and_styles(self):
+        self.assertEqual(sanitize_html('<img src="x.png" onerror="alert(1)">'), '<img src="x.png">')
+        self.assertEqual(sanitize_html('<p onclick="alert(1)" style="color:red">본문</p>'), '<p>본문</p>')
+
+    def test_script_and_svg_are_dropped_with_content(self):
+        cases = {
+            '<script>alert(1)</script>남김': '남김',
+            '<SCRIPT src="//evil.example"></SCRIPT>남김': '남김',
+            '<svg onload="alert(1)"><circle r="1"/></svg>남김': '남김',
+            '<style>body{}</style><iframe src="//evil.example"></iframe>남김': '남김',
+            '<math><mi>x</mi></math>남김': '남김',
+        }
+        for html, expected in cases.items():
+            with self.subTest(html=html):
+                self.assertEqual(sanitize_html(html), expected)
+
+    def test_broken_markup(self):
+        # 속성 값과 깨진 태그는 이스케이프되어 새 태그가 되지 않고, 닫히지 않은 태그는 닫힙니다.
+        output = sanitize_html('<a href="/x" title="&quot;><script>alert(1)</script>">y</a>')
+        self.assertNotIn('<script', output)
+        self.assertNotIn('<script', sanitize_html('<scr<script>ipt>alert(1)</script>'))
+        self.assertEqual(sanitize_html('<b><i>굵게'), '<b><i>굵게</i></b>')
+        self.assertEqual(sanitize_html('&lt;script&gt;'), '&lt;script&gt;')
+
+    def test_text_extraction_skips_dropped_content(self):
+        self.assertEqual(html_to_text('<p>첫 문단</p><script>x()</script><p>둘째</p>'), '첫 문단 둘째')
+
+
+# 0009 마이그레이션은 열만 추가하므로 변환되지 않은 글(rendered_version=0)을 rerender_content 가 채웁니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class RerenderContentTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def test_fills_unrendered_rows(self):
+        user = User.objects.create_user('writer', password='password')
+        post = Post.objects.create(user=user, title='글', content='첫 줄\n\n<b>둘째</b>')
+        comment = Comment.objects.create(post=post, user=user, message='댓글', content='<p onclick="x()">내용</p>')
+        Post.objects.update(content_html='', excerpt='', word_count=0, rendered_version=0)
+        Comment.objects.update(content_html='', excerpt='', word_count=0, rendered_version=0)
+        call_command('rerender_content', stdout=StringIO())
+        post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual(post.rendered_version, RENDER_VERSION)
+        self.assertEqual(post.content_html, '<p>첫 줄</p>\n\n<p>&lt;b&gt;둘째&lt;/b&gt;</p>')
+        self.assertEqual(comment.content_html, '<p>내용</p>')
+        self.assertEqual(comment.excerpt, '댓글 내용')
+
+
+# 조각 업로드(blog/uploads.py)의 이어 올리기, 위치 불일치(409), 체크섬 오류(422)를 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class ChunkedUploadTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+    data = os.urandom(300 * 1024)
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.staging_dir = os.path.join(root, 'staging')
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(root, 'media'), BLOG_CHUNKED_UPLOADS={'STAGING_DIR': self.staging_dir},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('uploader', password='password')
+        self.client.force_login(self.user)
+        with translation.override('ko'):
+            response = self.client.post(reverse('blog:upload_start'), {'filename': 'video.mp4', 'size': len(self.data)})
+        self.assertEqual(response.status_code, 201)
+        self.state = response.json()
+        self.upload = ChunkedUpload.objects.get(pk=self.state['id'])
+
+    def put(self, offset, body, **headers):
+        return self.client.put(
+            self.state['url'], body, content_type='application/octet-stream',
+            headers={'Upload-Offset': str(offset), **headers},
+        )
+
+    def staged(self):
+        with open(uploads.staging_path(self.upload), 'rb') as f:
+            return f.read()
+
+    def complete(self, checksum=None):
+        with translation.override('ko'):
+            url = reverse('blog:upload_complete', args=[self.upload.pk])
+        return self.client.post(url, {'sha256': checksum or hashlib.sha256(self.data).hexdigest()})
+
+    def test_upload_in_chunks(self):
+        for offset in range(0, len(self.data), 100 * 1024):
+            chunk = self.data[offset:offset + 100 * 1024]
+            response = self.put(offset, chunk, **{'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest()})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['offset'], offset + len(chunk))
+        response = self.complete()
+        self.assertEqual(response.status_code, 200)
+        storage = Post._meta.get_field('file_upload').storage
+        with storage.open(response.json()['file']) as f:
+            self.assertEqual(f.read(), self.data)
+        # 조각용 임시 파일과 업로드 임시 파일이 남지 않습니다.
+        self.assertEqual(os.listdir(self.staging_dir), [])
+
+    def test_resume_after_interrupted_chunk(self):
+        self.put(0, self.data[:100 * 1024])
+        # 연결이 끊겨 Content-Length 보다 적게 받은 조각은 받은 내용을 건드리지 않습니다.
+        upload = ChunkedUpload.objects.get(pk=self.upload.pk)
+        with self.assertRaises(uploads.UploadError):
+            uploads.write_chunk(upload, 100 * 1024, BytesIO(b'x' * 10), 100 * 1024)
+        self.assertEqual(self.client.get(self.state['url']).json()['offset'], 100 * 1024)
+        self.assertEqual(self.staged(), self.data[:100 * 1024])
+        self.put(100 * 1024, self.data[100 * 1024:])
+        self.assertEqual(self.complete().status_code, 200)
+
+    def test_offset_mismatch(self):
+        response = self.put(100, self.data[100:200])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+
+    def test_concurrent_chunk_for_same_offset(self):
+        # 두 요청이 같은 offset 을 보고 들어와도 먼저 선점한 요청의 내용만 파일에 남습니다.
+        stale = ChunkedUpload.objects.get(pk=self.upload.pk)
+        self.put(0, self.data[:1000])
+        with self.assertRaises(uploads.UploadError) as raised:
+            uploads.write_chunk(stale, 0, BytesIO(b'y' * 1000), 1000)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(self.staged(), self.data[:1000])
+        self.assertEqual(len(os.listdir(self.staging_dir)), 1)
+
+    def test_chunk_checksum_mismatch(self):
+        response = self.put(0, self.data[:1000], **{'X-Chunk-SHA256': hashlib.sha256(b'other').hexdigest()})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['offset'], 0)
+        self.assertEqual(self.staged(), b'')
+
+    def test_file_checksum_mismatch_restarts(self):
+        self.put(0, self.data)
+        response = self.complete(hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['offset'], 0)
+        self.assertEqual(self.staged(), b'')
+
+
+# 내보내기/가져오기(blog/transfer.py)가 pk 를 기존 글 뒤로 옮기고, 태그를 이름으로 합치고, 작성/수정 시각을 그대로 옮기는지 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class TransferTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+    exported_at = datetime.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc)
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.directory = os.path.join(root, 'export')
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(root, 'media'), BLOG_SITEMAPS={'DIRECTORY': os.path.join(root, 'sitemaps')},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('writer', password='password')
+        Profile.objects.create(user=self.user, nickname='작성자')
+        self.post = Post.objects.create(user=self.user, title='옮길 글', content='옮길 본문')
+        set_post_tags(self.post, ['파이썬', '장고'])
+        self.comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='<p>댓글</p>')
+        self.reply = Reply.objects.create(post=self.post, comment=self.comment, user=self.user, message='답글')
+        for model in (Post, Comment, Reply):
+            model.objects.update(created_at=self.exported_at, updated_at=self.exported_at)
+        counts = transfer.export_blog(self.directory, media=False)
+        self.assertEqual(counts['post'], 1)
+        self.assertEqual(counts['post_tag'], 2)
+
+    def write_header(self, header):
+        with gzip.open(os.path.join(self.directory, transfer.DATA_NAME), 'wt', encoding='utf-8') as out:
+            out.write(json.dumps(header) + '\n')
+
+    def test_import_after_existing_rows(self):
+        other = User.objects.create_user('other', password='password')
+        existing = Post.objects.create(user=other, title='기존 글', content='본문')
+        set_post_tags(existing, ['파이썬'])
+        existing_comment = Comment.objects.create(post=existing, user=other, message='기존 댓글', content='기존 댓글')
+        counts = transfer.import_blog(self.directory)
+        self.assertEqual(counts['created_users'], 0)
+        self.assertEqual(counts['indexed'], 3)
+        # 내보낸 pk 에 가져오기 전의 마지막 pk 를 더하고, 댓글/답글의 외래 키도 같은 값만큼 옮깁니다.
+        post = Post.objects.get(pk=self.post.pk + existing.pk)
+        comment = Comment.objects.get(pk=self.comment.pk + existing_comment.pk)
+        reply = Reply.objects.get(pk=self.reply.pk + self.reply.pk)
+        self.assertEqual((post.title, post.user_id), ('옮길 글', self.user.pk))
+        self.assertEqual((comment.post_id, comment.user_id), (post.pk, self.user.pk))
+        self.assertEqual((reply.post_id, reply.comment_id), (post.pk, comment.pk))
+        # 태그는 이름이 같은 기존 태그에 합치고 게시글 수를 중간 테이블에서 다시 셉니다.
+        self.assertEqual(sorted(post.tags.values_list('name', flat=True)), ['장고', '파이썬'])
+        self.assertEqual(dict(Tag.objects.values_list('name', 'post_count')), {'파이썬': 3, '장고': 2})
+        for obj in (post, comment, reply):
+            self.assertEqual((obj.created_at, obj.updated_at), (self.exported_at, self.exported_at))
+        # auto_now 필드는 그대로이므로 가져온 뒤 저장하면 수정 시각이 바뀝니다.
+        post.save()
+        self.assertGreater(Post.objects.get(pk=post.pk).updated_at, self.exported_at)
+
+    def test_round_trip_to_empty_database(self):
+        User.objects.all().delete()
+        Tag.objects.all().delete()
+        counts = transfer.import_blog(self.directory)
+        self.assertEqual(counts['created_users'], 1)
+        user = User.objects.get(username='writer')
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.profile.nickname, '작성자')
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.content_html, self.post.content_html)
+        self.assertEqual(post.created_at, self.exported_at)
+        self.assertEqual(Reply.objects.get(pk=self.reply.pk).comment_id, self.comment.pk)
+        self.assertEqual(dict(Tag.objects.values_list('name', 'post_count')), {'파이썬': 1, '장고': 1})
+        self.assertEqual([p.pk for p in search.search_posts('옮길')], [post.pk])
+
+    def test_rejects_other_format(self):
+        self.write_header({'format': 'other', 'version': transfer.VERSION})
+        with self.assertRaises(transfer.TransferError):
+            transfer.import_blog(self.directory)
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_rejects_unknown_version(self):
+        self.write_header({'format': transfer.FORMAT, 'version': transfer.VERSION + 1})
+        with self.assertRaisesMessage(CommandError, '버전'):
+            call_command('import_blog', self.directory, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 1)
+
+
+# 키셋 페이지 토큰(blog/pagination.py)이 (created_at, id) 를 그대로 되돌리고, 잘못된 토큰은 404 로 처리하는지 확인합니다.
+class KeysetCursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        created_at = datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc)
+        post = Post(pk=42, created_at=created_at)
+        self.assertEqual(decode_cursor(encode_cursor(post)), (created_at, 42))
+        self.assertEqual(decode_id_cursor(encode_id_cursor(post)), 42)
+        # URL 에 그대로 넣을 수 있도록 패딩(=) 없는 URL-safe base64 입니다.
+        self.assertNotIn('=', encode_cursor(post))
+
+    def test_bad_token(self):
+        for token in ('', '!!!', 'bm90LWEtY3Vyc29y', 'eHx5', '__8'):
+            with self.subTest(token=token):
+                with self.assertRaises(Http404):
+                    decode_cursor(token)
+                with self.assertRaises(Http404):
+                    decode_id_cursor(token)
+
+
+# 작성 시각이 같은 게시글이 있어도 키셋 페이지가 id 로 순서를 정해 빠뜨리거나 겹치지 않는지 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class KeysetPaginatorTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        user = User.objects.create_user('writer', password='password')
+        self.pks = [Post.objects.create(user=user, title=f'글 {i}', content='본문').pk for i in range(5)]
+        Post.objects.update(created_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+        self.paginator = KeysetPaginator(Post.objects.all(), 2)
+
+    def page_pks(self, page):
+        return [post.pk for post in page]
+
+    def test_next_and_previous_pages(self):
+        newest = self.pks[::-1]
+        first = self.paginator.page()
+        self.assertEqual(self.page_pks(first), newest[:2])
+        self.assertFalse(first.has_previous())
+        second = self.paginator.page(after=first.next_cursor)
+        self.assertEqual(self.page_pks(second), newest[2:4])
+        last = self.paginator.page(after=second.next_cursor)
+        self.assertEqual(self.page_pks(last), newest[4:])
+        self.assertFalse(last.has_next())
+        back = self.paginator.page(before=last.previous_cursor)
+        self.assertEqual(self.page_pks(back), newest[2:4])
+        self.assertTrue(back.has_previous())
+        self.assertEqual(self.page_pks(self.paginator.page(before=back.previous_cursor)), newest[:2])
+
+    def test_bad_token_in_url(self):
+        with translation.override('ko'):
+            url = reverse('blog:post_list')
+        self.assertEqual(self.client.get(url + '?after=!!!').status_code, 404)
+
+
+# SQLite FTS5 백엔드와 FTS5 를 쓸 수 없을 때의 메모리 역색인 백엔드가 같은 결과를 내는지 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class SearchBackendTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        search._backend = None
+        self.addCleanup(setattr, search, '_backend', None)
+        self.user = User.objects.create_user('writer', password='password')
+        # 제목 > 태그 > 본문 순서로 가중치를 둡니다.
+        self.in_title = Post.objects.create(user=self.user, title='장고 캐시', content='본문')
+        self.in_content = Post.objects.create(user=self.user, title='다른 글', content='장고 캐시 설명')
+        self.in_tags = Post.objects.create(user=self.user, title='태그 글', content='본문')
+        set_post_tags(self.in_tags, ['장고'])
+
+    def backends(self):
+        backends = [search.FTS5Backend(), search.InvertedIndexBackend()]
+        for backend in backends:
+            backend.rebuild()
+        return backends
+
+    def test_ranking(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(
+                    backend.ranked_ids('장고', 0, 10), [self.in_title.pk, self.in_tags.pk, self.in_content.pk],
+                )
+                self.assertEqual(backend.count('장고'), 3)
+                # 모든 단어가 들어 있는 게시글만 찾습니다.
+                self.assertEqual(sorted(backend.ranked_ids('장고 캐시', 0, 10)), [self.in_title.pk, self.in_content.pk])
+                self.assertEqual(backend.ranked_ids('장고', 1, 1), [self.in_tags.pk])
+                self.assertEqual(backend.count('없는단어'), 0)
+
+    def test_query_syntax_is_literal(self):
+        # FTS 문법 문자는 검색어로만 쓰이고 오류를 내지 않습니다.
+        for backend in self.backends():
+            for query in ('"', 'NOT 장고', 'title:장고', '장고*', '(장고'):
+                with self.subTest(backend=type(backend).__name__, query=query):
+                    backend.count(query)
+                    backend.ranked_ids(query, 0, 10)
+
+    def test_prefix_search_only_in_fts5(self):
+        fts5, inverted = self.backends()
+        self.assertEqual(fts5.count('장'), 3)
+        self.assertEqual(inverted.count('장'), 0)
+
+    def test_index_and_remove(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.in_content.content = '내용 바뀜'
+                backend.index_post(self.in_content, tag_names=[])
+                self.assertEqual(backend.count('장고'), 2)
+                self.assertEqual(backend.ranked_ids('바뀜', 0, 10), [self.in_content.pk])
+                backend.remove_post(self.in_title.pk)
+                self.assertEqual(backend.ranked_ids('장고', 0, 10), [self.in_tags.pk])
+
+    def test_backend_selection(self):
+        self.assertIsInstance(search.get_search_backend(), search.FTS5Backend)
+        search._backend = None
+        with override_settings(BLOG_SEARCH_BACKEND='blog.search.InvertedIndexBackend'):
+            self.assertIsInstance(search.get_search_backend(), search.InvertedIndexBackend)
+            results = search.search_posts('장고')
+            self.assertEqual([post.pk for post in results[0:10]], [self.in_title.pk, self.in_tags.pk, self.in_content.pk])
+            # 색인을 만든 뒤에는 시그널로 갱신합니다.
+            post = Post.objects.create(user=self.user, title='새 장고 글', content='본문')
+            self.assertEqual(search.search_posts('장고').count(), 4)
+            post.delete()
+            self.assertEqual(search.search_posts('장고').count(), 3)
+
+
+# 태그 이름 정리, 없는 태그 생성, 태그별 게시글 수(Tag.post_count) 갱신과 reconcile_tag_counts 를 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class TagCountTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('writer', password='password')
+        self.first = Post.objects.create(user=self.user, title='첫 글', content='본문')
+        self.second = Post.objects.create(user=self.user, title='둘째 글', content='본문')
+
+    def post_counts(self):
+        return dict(Tag.objects.values_list('name', 'post_count'))
+
+    def test_parse_tag_names(self):
+        self.assertEqual(parse_tag_names('파이썬, 장고 ,,파이썬,  a   b '), ['파이썬', '장고', 'a b'])
+        self.assertEqual(parse_tag_names(['x' * 60]), ['x' * 50])
+        self.assertEqual(parse_tag_names(None), [])
+
+    def test_resolve_creates_missing_tags(self):
+        existing = Tag.objects.create(name='파이썬')
+        tags = resolve_tags(['파이썬', ' 새  태그 ', '파이썬'])
+        self.assertEqual(sorted(tags), ['새 태그', '파이썬'])
+        self.assertEqual(tags['파이썬'].pk, existing.pk)
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(resolve_tags([]), {})
+
+    def test_counts_follow_links(self):
+        set_post_tags(self.first, ['파이썬', '장고'])
+        set_post_tags(self.second, ['파이썬'])
+        self.assertEqual(self.post_counts(), {'파이썬': 2, '장고': 1})
+        set_post_tags(self.first, ['장고', '캐시'])
+        self.assertEqual(self.post_counts(), {'파이썬': 1, '장고': 1, '캐시': 1})
+        self.second.delete()
+        self.assertEqual(self.post_counts(), {'파이썬': 0, '장고': 1, '캐시': 1})
+        self.first.tags.clear()
+        self.assertEqual(self.post_counts(), {'파이썬': 0, '장고': 0, '캐시': 0})
+
+    def test_reconcile_tag_counts(self):
+        set_post_tags(self.first, ['파이썬', '장고'])
+        Tag.objects.filter(name='파이썬').update(post_count=7)
+        out = StringIO()
+        call_command('reconcile_tag_counts', '--dry-run', stdout=out)
+        self.assertIn('1개', out.getvalue())
+        self.assertEqual(self.post_counts()['파이썬'], 7)
+        call_command('reconcile_tag_counts', stdout=StringIO())
+        self.assertEqual(self.post_counts(), {'파이썬': 1, '장고': 1})
+
+
+# 작성자가 아닌 사용자가 게시글/댓글/답글을 수정하거나 지우려 하면 403 을 돌려주는지 확인합니다. (blog/mixins.py)
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class OwnerRequiredTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.owner = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        self.post = Post.objects.create(user=self.owner, title='글', content='본문')
+        self.comment = Comment.objects.create(post=self.post, user=self.owner, message='댓글', content='댓글')
+        self.reply = Reply.objects.create(post=self.post, comment=self.comment, user=self.owner, message='답글')
+        post, comment, reply = self.post.pk, self.comment.pk, self.reply.pk
+        with translation.override('ko'):
+            self.edit_urls = [
+                reverse('blog:post_edit', args=[post]),
+                reverse('blog:comment_edit', args=[post, comment]),
+                reverse('blog:reply_edit', args=[post, comment, reply]),
+            ]
+            self.delete_urls = [
+                reverse('blog:post_delete', args=[post]),
+                reverse('blog:comment_delete', args=[post, comment]),
+                reverse('blog:reply_delete', args=[post, comment, reply]),
+            ]
+            self.other_post_comment_url = reverse('blog:comment_edit', args=[post + 1000, comment])
+
+    def test_other_user_is_forbidden(self):
+        self.client.force_login(self.other)
+        for url in self.edit_urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 403)
+                self.assertEqual(self.client.post(url, {'message': '바꿈', 'content': '바꿈'}).status_code, 403)
+        for url in self.delete_urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 403)
+        self.assertTrue(Reply.objects.filter(pk=self.reply.pk, message='답글').exists())
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_anonymous_is_sent_to_login(self):
+        for url in self.edit_urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 302)
+                self.assertIn('next=', response['Location'])
+
+    def test_owner_is_allowed(self):
+        self.client.force_login(self.owner)
+        for url in self.edit_urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        # 다른 게시글 주소로는 댓글을 찾지 않습니다.
+        self.assertEqual(self.client.get(self.other_post_comment_url).status_code, 404)
+        self.assertEqual(self.client.post(self.delete_urls[1]).status_code, 302)
+        self.assertFalse(Comment.objects.filter(pk=self.comment.pk).exists())
+
+
+# 게시글/댓글/태그/작성자가 바뀌면 해당 캐시 범위의 버전이 새로 발급되어 페이지 캐시가 무효화되는지 확인합니다. (blog/cache.py)
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class CacheVersionTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('writer', password='password')
+        self.profile = Profile.objects.create(user=self.user, nickname='작성자')
+        self.post = Post.objects.create(user=self.user, title='캐시된 제목', content='본문')
+        with translation.override('ko'):
+            self.list_url = reverse('blog:post_list')
+
+    def scopes(self):
+        return [
+            blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE,
+            blog_cache.post_scope(self.post.pk), blog_cache.thread_scope(self.post.pk),
+        ]
+
+    def changed_scopes(self, change):
+        before = dict(zip(self.scopes(), blog_cache.get_versions(*self.scopes())))
+        change()
+        after = dict(zip(self.scopes(), blog_cache.get_versions(*self.scopes())))
+        return {scope for scope in before if before[scope] != after[scope]}
+
+    def test_versions_are_stable_until_bumped(self):
+        first = blog_cache.get_versions('a', 'b')
+        self.assertEqual(blog_cache.get_versions('a', 'b'), first)
+        blog_cache.bump_versions('a')
+        second = blog_cache.get_versions('a', 'b')
+        self.assertNotEqual(second[0], first[0])
+        self.assertEqual(second[1], first[1])
+
+    def test_signals_bump_scopes(self):
+        post, thread = blog_cache.post_scope(self.post.pk), blog_cache.thread_scope(self.post.pk)
+        self.assertEqual(self.changed_scopes(self.post.save), {blog_cache.LIST_SCOPE, post})
+        # 새 댓글은 목록의 댓글 수도 바꾸므로 목록 버전도 새로 발급합니다.
+        comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='댓글')
+        self.assertEqual(self.changed_scopes(comment.delete), {blog_cache.LIST_SCOPE, post, thread})
+        comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='댓글')
+        comment.message = '고친 댓글'
+        self.assertEqual(self.changed_scopes(comment.save), {post, thread})
+        # 태그 연결이 바뀌면 게시글과 목록 버전이 바뀌고, 태그 구름도 목록 버전을 키에 넣으므로 다시 그립니다.
+        self.assertEqual(self.changed_scopes(lambda: set_post_tags(self.post, ['장고'])), {blog_cache.LIST_SCOPE, post})
+        tag = Tag.objects.get(name='장고')
+        tag.name = '파이썬'
+        self.assertEqual(self.changed_scopes(tag.save), {blog_cache.TAGS_SCOPE})
+        self.profile.nickname = '새 이름'
+        self.assertEqual(self.changed_scopes(self.profile.save), {blog_cache.AUTHORS_SCOPE})
+
+    def test_page_cache_until_invalidated(self):
+        self.assertContains(self.client.get(self.list_url), '캐시된 제목')
+        # 시그널 없이 바꾼 값은 버전이 바뀔 때까지 캐시된 페이지에 나오지 않습니다.
+        Post.objects.filter(pk=self.post.pk).update(title='바뀐 제목')
+        self.assertContains(self.client.get(self.list_url), '캐시된 제목')
+        blog_cache.invalidate_post(self.post.pk)
+        self.assertContains(self.client.get(self.list_url), '바뀐 제목')
+
+
+# 댓글/답글이 생기거나 지워질 때 게시글의 댓글 수, 답글 수, 마지막 활동 시각과 reconcile_post_counters 를 확인합니다.
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class PostCounterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('writer', password='password')
+        self.post = Post.objects.create(user=self.user, title='글', content='본문')
+
+    def counters(self):
+        return Post.objects.values_list('comment_count', 'reply_count').get(pk=self.post.pk)
+
+    def test_signals_update_counters(self):
+        comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='댓글')
+        replies = [
+            Reply.objects.create(post=self.post, comment=comment, user=self.user, message=f'답글 {i}') for i in range(2)
+        ]
+        self.assertEqual(self.counters(), (1, 2))
+        self.assertEqual(Post.objects.get(pk=self.post.pk).last_activity_at, replies[-1].created_at)
+        replies[0].delete()
+        self.assertEqual(self.counters(), (1, 1))
+        # 댓글을 지우면 함께 지워지는 답글도 셉니다.
+        comment.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_counts_do_not_go_negative(self):
+        comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='댓글')
+        Post.objects.update(comment_count=0)
+        comment.delete()
+        self.assertEqual(self.counters(), (0, 0))
+
+    def test_reconcile_post_counters(self):
+        # bulk_create 는 시그널을 보내지 않으므로 값이 어긋납니다.
+        comments = Comment.objects.bulk_create([
+            Comment(post=self.post, user=self.user, message=f'댓글 {i}', content='댓글') for i in range(3)
+        ])
+        self.assertEqual(self.counters(), (0, 0))
+        out = StringIO()
+        call_command('reconcile_post_counters', '--dry-run', stdout=out)
+        self.assertIn('1개', out.getvalue())
+        self.assertEqual(self.counters(), (0, 0))
+        call_command('reconcile_post_counters', stdout=StringIO())
+        self.assertEqual(self.counters(), (3, 0))
+        last = Comment.objects.filter(pk__in=[c.pk for c in comments]).order_by('-created_at')[0]
+        self.assertEqual(Post.objects.get(pk=self.post.pk).last_activity_at, last.created_at)
+
+
+# 동기 목록/상세 뷰가 ETag, Last-Modified 조건부 요청에 304 로 답하고, 내용이 바뀌면 다시 200 을 주는지 확인합니다. (blog/conditional.py)
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class ConditionalGetTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        viewcount._backend = None
+        self.addCleanup(setattr, viewcount, '_backend', None)
+        self.user = User.objects.create_user('writer', password='password')
+        self.post = Post.objects.create(user=self.user, title='글', content='본문')
+        self.comment = Comment.objects.create(post=self.post, user=self.user, message='댓글', content='<p>댓글</p>')
+        with translation.override('ko'):
+            self.urls = [reverse('blog:post_list'), reverse('blog:post_detail', args=[self.post.pk])]
+
+    def test_if_none_match(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('no-cache', response['Cache-Control'])
+                response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                response = self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_return_200(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.comment.content = '<p>고친 댓글</p>'
+        self.comment.save()
+        list_response, detail_response = (
+            self.client.get(url, headers={'If-None-Match': etag}) for url, etag in zip(self.urls, etags)
+        )
+        # 댓글 수정은 목록 버전을 바꾸지 않고 상세 페이지 버전만 바꿉니다.
+        self.assertEqual(list_response.status_code, 304)
+        self.assertEqual(detail_response.status_code, 200)
+        self.assertContains(detail_response, '고친 댓글')
+        Comment.objects.create(post=self.post, user=self.user, message='새 댓글', content='새 댓글')
+        self.assertEqual(self.client.get(self.urls[0], headers={'If-None-Match': etags[0]}).status_code, 200)
+
+    def test_logged_in_responses_are_private(self):
+        anonymous = self.client.get(self.urls[1])['ETag']
+        self.client.force_login(self.user)
+        response = self.client.get(self.urls[1])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotEqual(response['ETag'], anonymous)
+        response = self.client.get(self.urls[1], headers={'If-None-Match': anonymous})
+        self.assertEqual(response.status_code, 200)
+
+
+# 최신 글, 태그별, 작성자별 피드의 형식, 항목 수, 캐시 무효화와 304 를 확인합니다. (blog/feeds.py)
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False, BLOG_FEEDS={'ITEMS': 2, 'TITLE': '테스트 블로그'})
+class FeedTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user('writer', password='password')
+        Profile.objects.create(user=self.user, nickname='작성자')
+        other = User.objects.create_user('other', password='password')
+        self.posts = [Post.objects.create(user=self.user, title=f'피드 글 {i}', content=f'본문 {i}') for i in range(3)]
+        set_post_tags(self.posts[0], ['장고'])
+        Post.objects.create(user=other, title='다른 사람 글', content='본문')
+
+    def url(self, name, *args):
+        with translation.override('ko'):
+            return reverse(f'blog:{name}', args=args)
+
+    def items(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/feed+json; charset=utf-8')
+        return json.loads(response.content)['items']
+
+    def test_formats(self):
+        rss = self.client.get(self.url('post_feed', 'rss'))
+        self.assertEqual(rss['Content-Type'], 'application/rss+xml; charset=utf-8')
+        self.assertContains(rss, '<title>테스트 블로그</title>')
+        atom = self.client.get(self.url('post_feed', 'atom'))
+        self.assertEqual(atom['Content-Type'], 'application/atom+xml; charset=utf-8')
+        self.assertContains(atom, '<feed')
+        self.assertEqual(self.client.get(self.url('post_feed', 'xml')).status_code, 404)
+
+    def test_latest_feed(self):
+        items = self.items(self.url('post_feed', 'json'))
+        self.assertEqual([item['title'] for item in items], ['다른 사람 글', '피드 글 2'])
+        self.assertTrue(items[1]['url'].startswith('http://testserver/ko/'))
+
+    def test_tag_and_author_feeds(self):
+        items = self.items(self.url('tag_feed', 'json', '장고'))
+        self.assertEqual([item['title'] for item in items], ['피드 글 0'])
+        self.assertEqual(items[0]['tags'], ['장고'])
+        self.assertEqual(items[0]['authors'], [{'name': '작성자'}])
+        items = self.items(self.url('author_feed', 'json', 'writer'))
+        self.assertEqual([item['title'] for item in items], ['피드 글 2', '피드 글 1'])
+        self.assertEqual(self.client.get(self.url('tag_feed', 'json', '없는태그')).status_code, 404)
+        self.assertEqual(self.client.get(self.url('author_feed', 'json', 'nobody')).status_code, 404)
+
+    def test_saved_post_updates_feed(self):
+        url = self.url('author_feed', 'json', 'writer')
+        self.items(url)
+        self.posts[2].title = '고친 제목'
+        self.posts[2].save()
+        self.assertEqual(self.items(url)[0]['title'], '고친 제목')
+
+    def test_not_modified(self):
+        url = self.url('post_feed', 'rss')
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+
+# 사이트맵 파일을 pk 범위 조각으로 나누어 만들고, 게시글이 바뀌면 그 조각과 색인만 다시 쓰는지 확인합니다. (blog/sitemaps.py)
+@override_settings(CACHES=TEST_CACHES, BLOG_BACKGROUND_TASKS=False)
+class SitemapTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        # 언어가 두 개이므로 조각 하나에 게시글 2개가 들어갑니다.
+        override = override_settings(
+            BLOG_SITEMAPS={'DIRECTORY': self.directory, 'MAX_URLS': 4, 'BASE_URL': 'https://blog.example.com'},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        user = User.objects.create_user('writer', password='password')
+        self.posts = [Post.objects.create(user=user, title=f'글 {i}', content='본문') for i in range(5)]
+
+    def read(self, name):
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def test_build_all(self):
+        call_command('build_sitemaps', stdout=StringIO())
+        shards = sorted({sitemaps.shard_for(post.pk) for post in self.posts})
+        self.assertEqual(sitemaps.shard_numbers(), [0, *shards])
+        index = self.read(sitemaps.INDEX_NAME)
+        for number in [0, *shards]:
+            self.assertIn(f'https://blog.example.com/{sitemaps.shard_name(number)}', index)
+        post = self.posts[0]
+        shard = self.read(sitemaps.shard_name(sitemaps.shard_for(post.pk)))
+        with translation.override('en'):
+            english = 'https://blog.example.com' + post.get_absolute_url()
+        with translation.override('ko'):
+            korean = 'https://blog.example.com' + post.get_absolute_url()
+        self.assertIn(f'<loc>{english}</loc>', shard)
+        self.assertIn(f'hreflang="ko" href="{korean}"', shard)
+        self.assertIn('hreflang="x-default"', shard)
+
+    def test_delete_rewrites_shard(self):
+        call_command('build_sitemaps', stdout=StringIO())
+        last = self.posts[-1]
+        number = sitemaps.shard_for(last.pk)
+        for post in self.posts:
+            if sitemaps.shard_for(post.pk) == number:
+                post.delete()
+        self.assertNotIn(number, sitemaps.shard_numbers())
+        self.assertNotIn(sitemaps.shard_name(number), self.read(sitemaps.INDEX_NAME))
+
+    def test_serves_files(self):
+        call_command('build_sitemaps', stdout=StringIO())
+        response = self.client.get(reverse('sitemap_index'))
+        self.assertEqual(response['Content-Type'], 'application/xml; charset=utf-8')
+        self.assertIn(b'<sitemapindex', b''.join(response.streaming_content))
+        response.close()
+        response = self.client.get(reverse('sitemap_index'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get('/sitemap-999.xml.gz').status_code, 404)
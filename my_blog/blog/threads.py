@@ -0,0 +1,51 @@
+# 게시글 상세 페이지의 댓글/대댓글 트리를 댓글 수와 상관없이 일정한 쿼리 수로 불러오는 모듈입니다.
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+
+from accounts.authors import aattach_authors, attach_authors
+
+from .models import Comment, Reply
+
+# 한 번에 보여줄 댓글 수입니다. 긴 토론은 여러 페이지로 나눠서 불러옵니다.
+COMMENTS_PER_PAGE = 50
+
+
+def comment_thread_queryset(post):
+    # 댓글을 한 번에, 대댓글을 한 번에 가져오도록 구성합니다. 작성자는 작성자 캐시에서 붙입니다.
+    # 댓글 본문은 저장할 때 정리해 둔 content_html 을 보여주므로 원문(content)은 읽지 않습니다.
+    replies = Reply.objects.order_by('created_at', 'id')
+    return (
+        Comment.objects.filter(post=post).defer('content')
+        .prefetch_related(Prefetch('replies', queryset=replies))
+        .order_by('created_at', 'id')
+    )
+
+
+def load_comment_thread(post, page_number=1, per_page=COMMENTS_PER_PAGE):
+    # 요청한 페이지의 댓글 트리를 불러옵니다. (댓글 수 COUNT, 댓글, 대댓글 총 3개의 쿼리, 작성자 캐시에 없는 작성자가 있으면 1개 추가)
+    # 반환되는 Page의 각 댓글은 comment.replies.all 로 대댓글을 추가 쿼리 없이 사용할 수 있습니다.
+    paginator = Paginator(comment_thread_queryset(post), per_page)
+    page = paginator.get_page(page_number)
+    # 페이지를 여기서 평가해 템플릿에서 다시 쿼리가 나가지 않게 합니다.
+    page.object_list = list(page.object_list)
+    attach_authors(thread_items(page.object_list))
+    return page
+
+
+async def aload_comment_thread(post, page_number=1, per_page=COMMENTS_PER_PAGE):
+    # 비동기 뷰용 load_comment_thread() 입니다. 쿼리 수는 같습니다.
+    paginator = Paginator(comment_thread_queryset(post), per_page)
+    # COUNT 를 미리 구해 두면 get_page() 가 동기 쿼리로 다시 세지 않습니다.
+    paginator.count = await paginator.object_list.acount()
+    page = paginator.get_page(page_number)
+    # aiterator() 는 prefetch_related 를 지원하지 않으므로 async for 로 댓글과 대댓글을 함께 불러옵니다.
+    page.object_list = [comment async for comment in page.object_list]
+    await aattach_authors(thread_items(page.object_list))
+    return page
+
+
+def thread_items(comments):
+    # 댓글과 그 대댓글을 모두 나열합니다. (작성자 정보를 한 번에 붙이기 위해 사용)
+    for comment in comments:
+        yield comment
+        yield from comment.replies.all()
@@ -0,0 +1,344 @@
+# 블로그 글(사용자, 태그, 게시글, 게시글-태그 연결, 댓글, 답글)을 다른 인스턴스로 옮기는 내보내기/가져오기 모듈입니다.
+# (manage.py export_blog, manage.py import_blog)
+#
+# 내보내기 폴더에는 blog.ndjson.gz (한 줄에 JSON 레코드 하나)와 게시글 파일을 복사한 media/ 폴더가 들어갑니다.
+# 레코드는 사용자 → 태그 → 게시글 → 게시글-태그 → 댓글 → 답글 순서이고, 테이블마다 pk 순서로 iterator(chunk_size) 로 읽어
+# 한 줄씩 gzip 으로 쓰므로 행 수와 상관없이 메모리를 일정하게 씁니다. (dumpdata 는 전체를 메모리에 올립니다)
+# 시작할 때 테이블마다 마지막 pk 를 정해 두고 그 이하만 내보내므로, 내보내는 동안 새로 쓴 글/댓글 때문에 레코드가 어긋나지 않습니다.
+#
+# 가져오기는 레코드를 batch_size 개씩 bulk_create 로 넣고 외래 키를 가져오는 DB 의 pk 로 바꿉니다.
+#   사용자: 아이디(username)가 같은 사용자에 연결하고, 없으면 로그인할 수 없는(비밀번호 없는) 사용자와 Profile 을 만듭니다.
+#   태그: 이름이 같은 태그에 합칩니다.
+#   게시글/댓글/답글: 가져오는 DB 의 마지막 pk 를 더한 값을 pk 로 씁니다. 외래 키에도 같은 값을 더하면 되므로
+#                     행 수만큼 커지는 pk 대응표를 메모리에 두지 않습니다.
+# 저장해 둔 본문 HTML, 댓글 수, 작성/수정 시각은 내보낸 값을 그대로 넣습니다. (작성/수정 시각은 bulk_create 가 현재 시각으로
+# 채우므로 넣은 뒤 bulk_update 로 되돌립니다) bulk_create 는 시그널을 보내지 않으므로
+# 끝에서 태그별 게시글 수, 검색 색인, 사이트맵, 캐시 버전을 한 번에 맞춥니다.
+# DB 에는 한 트랜잭션으로 넣으므로 중간에 실패하면 가져오기 전 그대로입니다. (이미 복사한 미디어 파일은 남습니다)
+# 가져오는 동안에는 다른 요청이 글을 쓰지 않도록 점검 상태에서 실행합니다.
+import datetime
+import gzip
+import json
+import os
+import shutil
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.utils import validate_file_name
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import Profile
+
+from . import cache as blog_cache
+from . import sitemaps
+from .images import FORMATS as IMAGE_FORMATS, derivative_name
+from .models import Comment, Post, PostTag, Reply, Tag
+from .search import get_search_backend
+from .tags import actual_post_count, parse_tag_names, resolve_tags
+
+FORMAT = 'my_blog'
+VERSION = 1
+DATA_NAME = 'blog.ndjson.gz'
+MEDIA_DIR = 'media'
+# 압축률보다 속도가 중요하므로 가장 빠른 압축 수준을 씁니다.
+COMPRESS_LEVEL = 1
+USER_FIELDS = ['username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined']
+# 내보낸 레코드 종류 순서입니다. 가져올 때 외래 키가 가리키는 레코드가 먼저 나옵니다.
+KINDS = ['user', 'tag', 'post', 'post_tag', 'comment', 'reply']
+
+
+class TransferError(Exception):
+    pass
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder 는 시각을 밀리초까지만 쓰므로, 키셋 커서에 쓰는 created_at 등이 그대로 옮겨지도록 마이크로초까지 씁니다.
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def content_fields(model):
+    # pk 를 뺀 모든 필드 (외래 키는 user_id 처럼 id 값) 입니다. 저장할 때 만드는 값(content_html 등)도 그대로 옮깁니다.
+    return [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+
+
+def last_pk(model):
+    return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def media_storage():
+    return Post._meta.get_field('file_upload').storage
+
+
+def post_files(fields):
+    # 게시글 하나에 딸린 저장소 파일 이름들입니다. (썸네일 원본과 크기별 파생 이미지, 첨부 파일)
+    names = [fields['thumb_image'], fields['file_upload']]
+    variants = fields['thumb_variants'] or {}
+    if fields['thumb_image'] and variants.get('source') == fields['thumb_image']:
+        names += [
+            derivative_name(fields['thumb_image'], width, ext)
+            for width in variants.get('widths', ()) for ext, _, _ in IMAGE_FORMATS
+        ]
+    return [name for name in names if name]
+
+
+def write_line(out, record):
+    out.write(json.dumps(record, cls=ExportEncoder, ensure_ascii=False))
+    out.write('\n')
+
+
+def export_querysets():
+    # (레코드 종류, 내보낼 queryset) 목록입니다. 지금 있는 마지막 pk 까지만 내보냅니다.
+    users, tags, posts, comments, replies = (last_pk(model) for model in (User, Tag, Post, Comment, Reply))
+    return [
+        ('user', User.objects.filter(pk__lte=users).values('pk', *USER_FIELDS, nickname=F('profile__nickname'))),
+        ('tag', Tag.objects.filter(pk__lte=tags).values('pk', 'name')),
+        ('post', Post.objects.filter(pk__lte=posts, user_id__lte=users).values('pk', *content_fields(Post))),
+        ('post_tag', PostTag.objects.filter(post_id__lte=posts, tag_id__lte=tags).values('pk', 'post_id', 'tag_id')),
+        ('comment', Comment.objects.filter(pk__lte=comments, post_id__lte=posts, user_id__lte=users)
+            .values('pk', *content_fields(Comment))),
+        ('reply', Reply.objects.filter(pk__lte=replies, comment_id__lte=comments, user_id__lte=users)
+            .values('pk', *content_fields(Reply))),
+    ]
+
+
+def export_file(storage, name, directory):
+    # 저장소의 파일 하나를 내보내기 폴더의 media/ 아래 같은 경로로 복사합니다. 파일이 없으면 False 를 반환합니다.
+    target = os.path.join(directory, MEDIA_DIR, *name.split('/'))
+    try:
+        source = storage.open(name, 'rb')
+    except FileNotFoundError:
+        return False
+    with source:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as out:
+            shutil.copyfileobj(source, out)
+    return True
+
+
+def export_blog(directory, chunk_size=2000, media=True, log=None):
+    # directory 에 blog.ndjson.gz 와 media/ 를 만들고 종류별 내보낸 개수를 반환합니다.
+    log = log or (lambda message: None)
+    os.makedirs(directory, exist_ok=True)
+    storage = media_storage()
+    counts = dict.fromkeys(KINDS, 0)
+    counts['files'] = 0
+    path = os.path.join(directory, DATA_NAME)
+    temp_path = f'{path}.tmp'
+    with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=COMPRESS_LEVEL) as out:
+        write_line(out, {'format': FORMAT, 'version': VERSION, 'exported_at': timezone.now()})
+        for kind, queryset in export_querysets():
+            for row in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+                pk = row.pop('pk')
+                write_line(out, {'type': kind, 'pk': pk, 'fields': row})
+                if media and kind == 'post':
+                    counts['files'] += sum(export_file(storage, name, directory) for name in post_files(row))
+                counts[kind] += 1
+            log(f'{kind} {counts[kind]}개')
+    # 다 쓴 뒤 이름을 바꾸므로 중간에 멈춘 내보내기가 완성된 파일로 보이지 않습니다.
+    os.replace(temp_path, path)
+    return counts
+
+
+def read_records(directory):
+    path = os.path.join(directory, DATA_NAME)
+    if not os.path.exists(path):
+        raise TransferError(f'{path} 가 없습니다. export_blog 로 만든 폴더를 지정하세요.')
+    with gzip.open(path, 'rt', encoding='utf-8') as lines:
+        header = json.loads(next(lines, 'null'))
+        if not isinstance(header, dict) or header.get('format') != FORMAT:
+            raise TransferError('export_blog 로 만든 파일이 아닙니다.')
+        if header.get('version') != VERSION:
+            raise TransferError(f'지원하지 않는 내보내기 형식 버전입니다: {header.get("version")}')
+        for line in lines:
+            yield json.loads(line)
+
+
+def timestamp_fields(model):
+    # auto_now/auto_now_add 필드 이름입니다. (created_at, updated_at)
+    return [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+
+
+def create_with_timestamps(model, objs):
+    # bulk_create 는 auto_now/auto_now_add 필드를 현재 시각으로 덮어쓰므로, 넣은 뒤 내보낸 작성/수정 시각으로 되돌립니다.
+    # bulk_update 는 pre_save 를 부르지 않아 준 값을 그대로 저장합니다.
+    # 필드의 auto_now 를 끄는 방법은 같은 프로세스에서 저장하는 다른 요청/작업에도 적용되므로 쓰지 않습니다.
+    names = timestamp_fields(model)
+    saved = [[getattr(obj, name) for name in names] for obj in objs]
+    model.objects.bulk_create(objs)
+    for obj, values in zip(objs, saved):
+        for name, value in zip(names, values):
+            setattr(obj, name, value)
+    model.objects.bulk_update(objs, names)
+
+
+def reset_sequences(using, models):
+    # pk 를 직접 넣었으므로 PostgreSQL 등의 시퀀스를 마지막 pk 뒤로 옮깁니다. (SQLite 는 필요 없습니다)
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class Importer:
+    # 레코드를 종류별로 batch_size 개씩 모아 bulk_create 로 넣습니다.
+    def __init__(self, directory, batch_size=1000, media=True, log=None):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.media = media
+        self.log = log or (lambda message: None)
+        self.storage = media_storage()
+        # 가져오는 DB 의 마지막 pk 입니다. 내보낸 pk 에 더해 새 pk 로 씁니다.
+        self.offsets = {'post': last_pk(Post), 'comment': last_pk(Comment), 'reply': last_pk(Reply)}
+        # 내보낸 사용자/태그 pk → 가져오는 DB 의 pk 입니다. (게시글보다 훨씬 적습니다)
+        self.users = {}
+        self.tags = {}
+        self.counts = dict.fromkeys(KINDS, 0)
+        self.counts.update(created_users=0, files=0)
+        self.kind = None
+        self.batch = []
+
+    def add(self, record):
+        if record['type'] != self.kind:
+            self.flush()
+            if self.kind is not None:
+                self.log(f'{self.kind} {self.counts[self.kind]}개')
+            if record['type'] not in KINDS:
+                raise TransferError(f'알 수 없는 레코드 종류입니다: {record["type"]}')
+            self.kind = record['type']
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            getattr(self, f'import_{self.kind}')(self.batch)
+            self.counts[self.kind] += len(self.batch)
+            self.batch = []
+
+    def finish(self, using):
+        self.flush()
+        if self.kind is not None:
+            self.log(f'{self.kind} {self.counts[self.kind]}개')
+        reset_sequences(using, [Post, Comment, Reply])
+        # 이름이 같은 기존 태그에 합쳤으므로 태그별 게시글 수는 중간 테이블에서 다시 셉니다.
+        tag_ids = sorted(set(self.tags.values()))
+        for start in range(0, len(tag_ids), self.batch_size):
+            Tag.objects.filter(pk__in=tag_ids[start:start + self.batch_size]).update(
+                post_count=actual_post_count(PostTag)
+            )
+        return self.counts
+
+    def convert(self, model, fields):
+        # JSON 으로 읽은 값(날짜 문자열 등)을 필드 값으로 바꿉니다.
+        meta = model._meta
+        return {name: meta.get_field(name).to_python(value) for name, value in fields.items()}
+
+    def user_pk(self, pk):
+        try:
+            return self.users[pk]
+        except KeyError:
+            raise TransferError(f'내보내기 파일에 없는 사용자입니다: {pk}')
+
+    def import_file(self, name):
+        # 같은 이름의 파일이 이미 있으면 같은 파일로 보고 덮어쓰지 않습니다.
+        validate_file_name(name, allow_relative_path=True)
+        source = os.path.join(self.directory, MEDIA_DIR, *name.split('/'))
+        if self.storage.exists(name) or not os.path.exists(source):
+            return False
+        with open(source, 'rb') as f:
+            self.storage.save(name, File(f))
+        return True
+
+    def import_user(self, records):
+        fields = {record['fields']['username']: record['fields'] for record in records}
+        pks = dict(User.objects.filter(username__in=list(fields)).values_list('username', 'pk'))
+        missing = [username for username in fields if username not in pks]
+        if missing:
+            password = make_password(None)
+            User.objects.bulk_create([
+                User(password=password, **self.convert(User, {name: fields[username][name] for name in USER_FIELDS}))
+                for username in missing
+            ])
+            created = dict(User.objects.filter(username__in=missing).values_list('username', 'pk'))
+            Profile.objects.bulk_create([
+                Profile(user_id=created[username], nickname=(fields[username].get('nickname') or username)[:50])
+                for username in missing
+            ])
+            pks.update(created)
+            self.counts['created_users'] += len(missing)
+        for record in records:
+            self.users[record['pk']] = pks[record['fields']['username']]
+
+    def import_tag(self, records):
+        # 이름이 없는 태그는 화면에 나오지 않으므로 옮기지 않습니다. (그 태그의 연결도 건너뜁니다)
+        names = {record['pk']: parse_tag_names([record['fields']['name'] or '']) for record in records}
+        tags = resolve_tags([name for found in names.values() for name in found])
+        for pk, found in names.items():
+            if found and found[0] in tags:
+                self.tags[pk] = tags[found[0]].pk
+
+    def import_post(self, records):
+        offset = self.offsets['post']
+        posts = []
+        for record in records:
+            fields = self.convert(Post, record['fields'])
+            fields['user_id'] = self.user_pk(fields['user_id'])
+            if self.media:
+                self.counts['files'] += sum(self.import_file(name) for name in post_files(record['fields']))
+            posts.append(Post(pk=record['pk'] + offset, **fields))
+        create_with_timestamps(Post, posts)
+
+    def import_post_tag(self, records):
+        offset = self.offsets['post']
+        links = [
+            PostTag(post_id=record['fields']['post_id'] + offset, tag_id=self.tags[record['fields']['tag_id']])
+            for record in records if record['fields']['tag_id'] in self.tags
+        ]
+        # 내보낸 두 태그가 같은 태그로 합쳐졌으면 같은 연결이 두 번 나오므로 충돌은 무시합니다.
+        PostTag.objects.bulk_create(links, ignore_conflicts=True)
+
+    def import_comment(self, records):
+        comments = []
+        for record in records:
+            fields = self.convert(Comment, record['fields'])
+            fields['post_id'] += self.offsets['post']
+            fields['user_id'] = self.user_pk(fields['user_id'])
+            comments.append(Comment(pk=record['pk'] + self.offsets['comment'], **fields))
+        create_with_timestamps(Comment, comments)
+
+    def import_reply(self, records):
+        replies = []
+        for record in records:
+            fields = self.convert(Reply, record['fields'])
+            fields['post_id'] += self.offsets['post']
+            fields['comment_id'] += self.offsets['comment']
+            fields['user_id'] = self.user_pk(fields['user_id'])
+            replies.append(Reply(pk=record['pk'] + self.offsets['reply'], **fields))
+        create_with_timestamps(Reply, replies)
+
+
+def import_blog(directory, batch_size=1000, media=True, log=None):
+    # export_blog 로 만든 폴더를 현재 DB 에 더하고 종류별 가져온 개수를 반환합니다.
+    log = log or (lambda message: None)
+    using = router.db_for_write(Post)
+    with transaction.atomic(using=using):
+        importer = Importer(directory, batch_size=batch_size, media=media, log=log)
+        for record in read_records(directory):
+            importer.add(record)
+        counts = importer.finish(using)
+    blog_cache.bump_versions(blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE)
+    counts['indexed'] = get_search_backend().rebuild()
+    sitemaps.build_all()
+    return counts
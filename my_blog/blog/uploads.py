@@ -0,0 +1,304 @@
+# 큰 첨부 파일(Post.file_upload)을 여러 조각으로 나누어 올리고, 끊기면 이어서 올릴 수 있게 하는 업로드 API 입니다.
+#
+#   1. POST /blog/uploads/                 filename, size 를 보내면 업로드 id 와 권장 조각 크기를 돌려줍니다.
+#   2. PUT  /blog/uploads/<id>/            본문에 조각을 그대로 담고 Upload-Offset 헤더에 시작 위치를 보냅니다.
+#                                          X-Chunk-SHA256 헤더를 보내면 조각의 체크섬도 확인합니다.
+#   3. GET  /blog/uploads/<id>/            지금까지 받은 위치(offset)를 돌려줍니다. 연결이 끊기면 여기서부터 다시 보냅니다.
+#   4. POST /blog/uploads/<id>/complete/   sha256 을 보내면 전체 체크섬을 확인하고 blog/files/%Y/%m/%d/ 로 옮깁니다.
+#   5. 게시글 작성/수정 폼의 upload_id 에 업로드 id 를 넣어 저장하면 옮긴 파일이 첨부됩니다. (forms.PostForm)
+# 로그인한 사용자만 쓸 수 있고, 다른 POST 요청처럼 X-CSRFToken 헤더에 CSRF 토큰을 보내야 합니다.
+#
+# 조각은 요청 본문을 작은 블록으로 읽으면서 조각용 임시 파일에 쓰므로 조각 크기만큼도 메모리에 올리지 않습니다.
+# 조각을 끝까지 받고 체크섬을 확인한 뒤 조건부 UPDATE 로 offset 을 선점한 요청만 업로드 파일의 그 위치에 옮겨 씁니다.
+# 그래서 같은 조각이 동시에 두 번 오거나 중간에 끊겨도 이미 받은 내용을 덮어쓰거나 잘라내지 않습니다.
+# 오래 멈춘 업로드와 게시글에 첨부되지 않은 파일은 manage.py cleanup_uploads 가 지웁니다.
+import errno
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files import File
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views import View
+
+from .models import ChunkedUpload, Post
+
+DEFAULTS = {
+    # 클라이언트에 알려주는 권장 조각 크기와 한 번에 받을 수 있는 최대 조각 크기(바이트)입니다.
+    'CHUNK_SIZE': 8 * 1024 * 1024,
+    'MAX_CHUNK_SIZE': 32 * 1024 * 1024,
+    # 파일 하나의 최대 크기입니다.
+    'MAX_SIZE': 4 * 1024 * 1024 * 1024,
+    # 받는 중인 조각을 모아 두는 폴더입니다. None 이면 BASE_DIR/uploads 를 씁니다.
+    # MEDIA_ROOT 와 같은 파일 시스템에 두어야 완료 시 복사 없이 옮길 수 있습니다.
+    'STAGING_DIR': None,
+    # 이 시간(초) 동안 조각이 오지 않은 업로드는 cleanup_uploads 가 지웁니다.
+    'EXPIRE_AFTER': 24 * 60 * 60,
+}
+# 요청 본문과 임시 파일을 읽고 쓰는 블록 크기입니다.
+BLOCK_SIZE = 64 * 1024
+STAGING_SUFFIX = '.part'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BLOG_CHUNKED_UPLOADS', {}))
+    return config
+
+
+def get_staging_dir():
+    return Path(get_config()['STAGING_DIR'] or Path(settings.BASE_DIR) / 'uploads')
+
+
+def staging_path(upload):
+    return get_staging_dir() / f'{upload.pk.hex}{STAGING_SUFFIX}'
+
+
+class UploadError(Exception):
+    # 클라이언트에 돌려줄 오류입니다. status 는 HTTP 상태 코드입니다.
+    def __init__(self, message, status=400, upload=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.upload = upload
+
+
+def upload_state(upload):
+    return {
+        'id': str(upload.pk),
+        'filename': upload.filename,
+        'size': upload.size,
+        'offset': upload.offset,
+        'complete': upload.is_complete,
+        'chunk_size': get_config()['CHUNK_SIZE'],
+        'url': reverse('blog:upload_detail', args=[upload.pk]),
+    }
+
+
+def start_upload(user, filename, size):
+    config = get_config()
+    filename = os.path.basename((filename or '').replace('\\', '/')).strip()
+    if not filename:
+        raise UploadError('파일 이름이 없습니다.')
+    if size <= 0:
+        raise UploadError('파일 크기가 올바르지 않습니다.')
+    if size > config['MAX_SIZE']:
+        raise UploadError(f'파일은 {config["MAX_SIZE"]} 바이트까지 올릴 수 있습니다.', status=413)
+    upload = ChunkedUpload.objects.create(user=user, filename=filename[:255], size=size)
+    path = staging_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def receive_chunk(stream, path, length):
+    # stream 에서 최대 length 바이트를 읽어 path 에 쓰고, (받지 못한 바이트 수, sha256) 을 반환합니다.
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'xb') as f:
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            f.write(block)
+            digest.update(block)
+            remaining -= len(block)
+    return remaining, digest.hexdigest()
+
+
+def write_chunk(upload, offset, stream, length, checksum=''):
+    # stream 에서 length 바이트를 읽어 업로드 파일의 offset 위치에 씁니다. 받은 뒤의 업로드를 반환합니다.
+    if upload.is_complete:
+        raise UploadError('이미 완료된 업로드입니다.', status=409, upload=upload)
+    if offset != upload.offset:
+        # 클라이언트는 응답의 offset 부터 다시 보내면 됩니다.
+        raise UploadError('조각의 시작 위치가 맞지 않습니다.', status=409, upload=upload)
+    if length <= 0 or length > get_config()['MAX_CHUNK_SIZE']:
+        raise UploadError('조각 크기가 올바르지 않습니다.', status=413 if length > 0 else 400, upload=upload)
+    if offset + length > upload.size:
+        raise UploadError('파일 크기를 넘는 조각입니다.', upload=upload)
+
+    path = staging_path(upload)
+    if not path.exists():
+        raise UploadError('업로드가 만료되었습니다.', status=410)
+    # 요청마다 다른 이름이므로 같은 조각을 동시에 받아도 서로 섞이지 않습니다.
+    # 중간에 프로세스가 죽어 남은 파일은 업로드 기록이 없는 임시 파일로 보고 cleanup_uploads 가 지웁니다.
+    chunk_path = path.with_name(f'{upload.pk.hex}-{uuid.uuid4().hex}{STAGING_SUFFIX}')
+    try:
+        remaining, digest = receive_chunk(stream, chunk_path, length)
+        if remaining:
+            raise UploadError('조각을 끝까지 받지 못했습니다.', upload=upload)
+        if checksum and digest != checksum.lower():
+            raise UploadError('조각의 체크섬이 맞지 않습니다.', status=422, upload=upload)
+
+        # 같은 위치의 조각을 동시에 받은 경우 한 요청만 offset 을 선점해 파일에 씁니다.
+        updated = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset, completed_at=None).update(
+            offset=offset + length, updated_at=timezone.now(),
+        )
+        upload.refresh_from_db()
+        if not updated:
+            raise UploadError('다른 요청이 먼저 이 위치의 조각을 받았습니다.', status=409, upload=upload)
+        # 선점한 구간에만 쓰므로 다음 조각이 먼저 쓰여도 겹치지 않습니다.
+        # 여기서 실패하면 offset 만 늘어난 구간이 남지만, 완료 시 전체 체크섬이 맞지 않아 처음부터 다시 받습니다.
+        with open(chunk_path, 'rb') as src, open(path, 'r+b') as dst:
+            dst.seek(offset)
+            shutil.copyfileobj(src, dst, BLOCK_SIZE)
+    except FileNotFoundError:
+        # 받는 중에 cleanup_uploads 가 업로드를 지운 경우입니다.
+        raise UploadError('업로드가 만료되었습니다.', status=410)
+    finally:
+        try:
+            os.remove(chunk_path)
+        except FileNotFoundError:
+            pass
+    return upload
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE * 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def move_into_storage(path, filename):
+    # 임시 파일을 Post.file_upload 와 같은 이름 규칙(blog/files/%Y/%m/%d/)으로 저장소에 옮기고 저장된 이름을 반환합니다.
+    field = Post._meta.get_field('file_upload')
+    storage = field.storage
+    name = field.generate_filename(None, filename)
+    try:
+        storage.path(name)
+    except NotImplementedError:
+        # 로컬 파일 시스템이 아닌 저장소는 블록 단위로 복사합니다.
+        with open(path, 'rb') as f:
+            name = storage.save(name, File(f, name=filename))
+        os.remove(path)
+        return name
+    os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+    while True:
+        name = storage.get_available_name(name)
+        try:
+            # 하드 링크는 대상이 이미 있으면 실패하므로 다른 파일을 덮어쓰지 않고 한 번에 나타납니다.
+            os.link(path, storage.path(name))
+        except FileExistsError:
+            continue
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            with open(path, 'rb') as f:
+                name = storage.save(name, File(f, name=filename))
+        break
+    os.remove(path)
+    if storage.file_permissions_mode is not None:
+        os.chmod(storage.path(name), storage.file_permissions_mode)
+    return name
+
+
+def complete_upload(upload, checksum):
+    if upload.is_complete:
+        return upload
+    if upload.offset != upload.size:
+        raise UploadError('아직 받지 못한 조각이 있습니다.', status=409, upload=upload)
+    if not checksum:
+        raise UploadError('sha256 체크섬이 필요합니다.', upload=upload)
+    path = staging_path(upload)
+    try:
+        actual = file_sha256(path)
+    except FileNotFoundError:
+        raise UploadError('업로드가 만료되었습니다.', status=410)
+    if actual != checksum.lower():
+        # 내용이 어긋났으므로 처음부터 다시 받습니다.
+        with open(path, 'r+b') as f:
+            f.truncate(0)
+        ChunkedUpload.objects.filter(pk=upload.pk).update(offset=0, updated_at=timezone.now())
+        upload.refresh_from_db()
+        raise UploadError('파일의 체크섬이 맞지 않아 처음부터 다시 올려야 합니다.', status=422, upload=upload)
+    name = move_into_storage(path, upload.filename)
+    upload.file = name
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['file', 'completed_at', 'updated_at'])
+    return upload
+
+
+def completed_upload(upload_id, user):
+    # 게시글에 첨부할 수 있는(본인이 올렸고 완료된) 업로드를 반환합니다.
+    return ChunkedUpload.objects.filter(pk=upload_id, user=user).exclude(completed_at=None).first()
+
+
+def remove_upload_files(upload):
+    # 업로드의 임시 파일과, 게시글에 첨부되지 않은 채 남은 완료 파일을 지웁니다.
+    try:
+        os.remove(staging_path(upload))
+    except FileNotFoundError:
+        pass
+    if upload.file:
+        Post._meta.get_field('file_upload').storage.delete(upload.file)
+
+
+def error_response(error):
+    data = {'error': error.message}
+    if error.upload is not None:
+        data.update(upload_state(error.upload))
+    return JsonResponse(data, status=error.status)
+
+
+class UploadMixin(LoginRequiredMixin):
+    # API 이므로 로그인하지 않은 요청은 로그인 페이지로 보내지 않고 403 을 돌려줍니다.
+    raise_exception = True
+
+    def get_upload(self):
+        try:
+            return ChunkedUpload.objects.get(pk=self.kwargs['upload_id'], user=self.request.user)
+        except ChunkedUpload.DoesNotExist:
+            raise Http404('업로드를 찾을 수 없습니다.')
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except UploadError as e:
+            return error_response(e)
+
+
+class UploadStartView(UploadMixin, View):
+    def post(self, request):
+        try:
+            size = int(request.POST.get('size', ''))
+        except ValueError:
+            raise UploadError('파일 크기가 올바르지 않습니다.')
+        upload = start_upload(request.user, request.POST.get('filename'), size)
+        return JsonResponse(upload_state(upload), status=201)
+
+upload_start = UploadStartView.as_view()
+
+
+class UploadDetailView(UploadMixin, View):
+    def get(self, request, upload_id):
+        return JsonResponse(upload_state(self.get_upload()))
+
+    def put(self, request, upload_id):
+        upload = self.get_upload()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise UploadError('Upload-Offset 헤더가 올바르지 않습니다.', upload=upload)
+        # request.body 를 쓰지 않고 스트림에서 바로 읽습니다.
+        upload = write_chunk(upload, offset, request, length, request.headers.get('X-Chunk-SHA256', ''))
+        return JsonResponse(upload_state(upload))
+
+upload_detail = UploadDetailView.as_view()
+
+
+class UploadCompleteView(UploadMixin, View):
+    def post(self, request, upload_id):
+        upload = complete_upload(self.get_upload(), request.POST.get('sha256', '').strip())
+        return JsonResponse({**upload_state(upload), 'file': upload.file})
+
+upload_complete = UploadCompleteView.as_view()
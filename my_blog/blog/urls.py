@@ -1,16 +1,34 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import uploads, views
 
 
 app_name = 'blog'
 
+# ASGI 서버(uvicorn 등)로 실행할 때는 BLOG_ASYNC_VIEWS 를 켜서 목록/상세 페이지를 비동기 뷰로 처리합니다.
+if getattr(settings, 'BLOG_ASYNC_VIEWS', False):
+    post_list, post_detail = views.post_list_async, views.post_detail_async
+else:
+    post_list, post_detail = views.post_list, views.post_detail
+
 
 urlpatterns = [
-    path('', views.post_list, name='post_list'),
+    path('', post_list, name='post_list'),
     path('new/', views.post_new, name='post_new'),
-    path('<int:pk>/', views.post_detail, name='post_detail'),
+    path('<int:pk>/', post_detail, name='post_detail'),
     path('<int:pk>/edit/', views.post_edit, name='post_edit'),
     path('<int:pk>/delete/', views.post_delete, name='post_delete'),
+    # 태그 구름과 태그별 게시글 목록
+    path('tags/', views.tag_list, name='tag_list'),
+    path('tag/<path:name>/', views.tag_detail, name='tag_detail'),
+    # 피드 (feed_format: rss, atom, json)
+    path('feed/<slug:feed_format>/', views.post_feed, name='post_feed'),
+    path('feed/<slug:feed_format>/tag/<path:name>/', views.tag_feed, name='tag_feed'),
+    path('feed/<slug:feed_format>/author/<str:name>/', views.author_feed, name='author_feed'),
+    # 큰 첨부 파일의 조각 업로드 API (blog/uploads.py)
+    path('uploads/', uploads.upload_start, name='upload_start'),
+    path('uploads/<uuid:upload_id>/', uploads.upload_detail, name='upload_detail'),
+    path('uploads/<uuid:upload_id>/complete/', uploads.upload_complete, name='upload_complete'),
     path('<int:pk>/comment/new/', views.comment_new, name='comment_new'),
     path('<int:post_pk>/comment/<int:comment_pk>/edit/', views.comment_edit, name='comment_edit'),
     path('<int:post_pk>/comment/<int:comment_pk>/delete/', views.comment_delete, name='comment_delete'),
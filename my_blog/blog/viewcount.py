@@ -0,0 +1,239 @@
+# 게시글 조회수를 요청마다 저장하지 않고 버퍼에 모아 두었다가 주기적으로 한 번에 반영하는 모듈입니다.
+# 상세 페이지는 버퍼에 +1 만 기록하고, 실제 DB 반영은 UPDATE ... SET view_count = view_count + N 으로 묶어서 처리합니다.
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from blogbase.db import primary_pin_scope
+
+logger = logging.getLogger('my.blog')
+
+# settings.BLOG_VIEW_COUNTER 에 값이 없을 때 사용할 기본 설정입니다.
+DEFAULTS = {
+    'BACKEND': 'blog.viewcount.MemoryBackend',
+    # 버퍼를 DB에 반영하는 주기(초)입니다. 0 또는 None이면 백그라운드 반영을 하지 않습니다.
+    'FLUSH_INTERVAL': 10,
+    # CacheBackend가 사용할 캐시 이름입니다. 여러 프로세스가 함께 쓰는 캐시여야 관리 명령으로 반영할 수 있습니다.
+    'CACHE_ALIAS': 'default',
+}
+
+# SQLite의 바인딩 변수 제한을 넘지 않도록 IN 절에 넣을 pk 개수를 제한합니다.
+UPDATE_CHUNK_SIZE = 500
+
+# CacheBackend 가 쓸 수 있는 캐시입니다. incr/decr 가 원자적이어야 동시에 들어온 조회수를 잃지 않습니다.
+# 파일/DB 캐시의 incr 은 읽고 다시 쓰므로 쓸 수 없습니다. locmem 은 프로세스 안에서만 원자적이고 공유되지 않습니다.
+ATOMIC_CACHE_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django_redis.cache.RedisCache',
+)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BLOG_VIEW_COUNTER', {}))
+    return config
+
+
+def write_increments(increments):
+    # {pk: 증가량} 을 증가량별로 묶어 게시글 수와 상관없이 적은 수의 UPDATE 문으로 반영합니다.
+    from .models import Post
+
+    by_amount = defaultdict(list)
+    for pk, amount in increments.items():
+        if amount:
+            by_amount[amount].append(pk)
+    with transaction.atomic():
+        for amount, pks in by_amount.items():
+            for i in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                Post.objects.filter(pk__in=pks[i:i + UPDATE_CHUNK_SIZE]).update(
+                    view_count=F('view_count') + amount
+                )
+    return sum(increments.values())
+
+
+class BaseBackend:
+    # 모든 조회수 버퍼가 공통으로 사용하는 주기적 반영과 종료 시 반영 로직입니다.
+    # shared 가 True 이면 다른 프로세스(관리 명령 등)에서도 버퍼를 읽어 반영할 수 있습니다.
+    shared = False
+
+    def __init__(self, flush_interval=None, **options):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        atexit.register(self.shutdown)
+
+    def incr(self, pk, amount=1):
+        raise NotImplementedError
+
+    def pending(self, pk):
+        # 아직 DB에 반영되지 않은 조회수를 반환합니다.
+        raise NotImplementedError
+
+    async def aincr(self, pk, amount=1):
+        # 비동기 뷰용입니다. 기본 구현은 캐시 접근이 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+        await sync_to_async(self.incr)(pk, amount)
+
+    async def apending(self, pk):
+        return await sync_to_async(self.pending)(pk)
+
+    def drain(self, pks=None):
+        # 버퍼에 쌓인 {pk: 증가량} 을 꺼내고 버퍼를 비웁니다. pks를 주면 해당 게시글만 꺼냅니다.
+        raise NotImplementedError
+
+    def flush(self, pks=None):
+        increments = self.drain(pks)
+        if not increments:
+            return 0
+        try:
+            return write_increments(increments)
+        except Exception:
+            # 반영에 실패하면 꺼낸 값을 버퍼에 되돌려 다음 반영 때 다시 시도합니다.
+            for pk, amount in increments.items():
+                self.incr(pk, amount)
+            raise
+
+    def ensure_flusher(self):
+        # 첫 조회가 기록될 때 주기적으로 버퍼를 반영하는 데몬 스레드를 띄웁니다.
+        if not self.flush_interval or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='blog-view-counter', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                close_old_connections()
+                with primary_pin_scope():
+                    self.flush()
+            except Exception:
+                logger.exception('조회수 버퍼를 반영하지 못했습니다.')
+
+    def shutdown(self):
+        # 프로세스 종료 시 남은 조회수를 반드시 반영합니다.
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('종료 시 조회수 버퍼를 반영하지 못했습니다.')
+
+
+class MemoryBackend(BaseBackend):
+    # 프로세스 메모리에 조회수를 모읍니다. 워커 프로세스마다 각자의 버퍼를 가지며 각자 반영합니다.
+    # 종료할 때 남은 조회수를 반영하지만, SIGKILL 등으로 강제 종료되면 마지막 FLUSH_INTERVAL 동안의 조회수는 잃습니다.
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._counts = defaultdict(int)
+
+    def incr(self, pk, amount=1):
+        with self._lock:
+            self._counts[pk] += amount
+        self.ensure_flusher()
+
+    def pending(self, pk):
+        return self._counts.get(pk, 0)
+
+    # 메모리만 다루므로 이벤트 루프에서 바로 실행합니다.
+    async def aincr(self, pk, amount=1):
+        self.incr(pk, amount)
+
+    async def apending(self, pk):
+        return self.pending(pk)
+
+    def drain(self, pks=None):
+        with self._lock:
+            if pks is None:
+                counts, self._counts = dict(self._counts), defaultdict(int)
+                return counts
+            return {pk: self._counts.pop(pk) for pk in pks if pk in self._counts}
+
+
+class CacheBackend(BaseBackend):
+    # Django 캐시에 조회수를 모읍니다. incr 가 원자적인 캐시(ATOMIC_CACHE_BACKENDS)만 쓸 수 있습니다.
+    # Redis/Memcached 를 쓰면 여러 프로세스의 조회수를 한 곳에 모으고, 웹 프로세스가 죽어도 잃지 않으며,
+    # 관리 명령(flush_view_counts)으로도 반영할 수 있습니다.
+    key_prefix = 'blog:viewcount:'
+
+    def __init__(self, cache_alias='default', **options):
+        backend = settings.CACHES.get(cache_alias, {}).get('BACKEND')
+        if backend not in ATOMIC_CACHE_BACKENDS:
+            raise ImproperlyConfigured(
+                f'CacheBackend 는 incr 가 원자적인 캐시(Redis/Memcached)가 필요합니다. '
+                f'{cache_alias} 캐시는 {backend} 입니다.'
+            )
+        super().__init__(**options)
+        self.cache = caches[cache_alias]
+        # 이 프로세스에서 조회가 기록된 게시글 pk 목록입니다.
+        self._seen = set()
+
+    @property
+    def shared(self):
+        # locmem 캐시는 프로세스마다 따로 있으므로 공유되지 않습니다.
+        return not isinstance(self.cache, LocMemCache)
+
+    def make_key(self, pk):
+        return f'{self.key_prefix}{pk}'
+
+    def incr(self, pk, amount=1):
+        key = self.make_key(pk)
+        try:
+            self.cache.incr(key, amount)
+        except ValueError:
+            # 키가 없으면 새로 만들고, 그 사이에 다른 요청이 만들었다면 다시 증가시킵니다.
+            if not self.cache.add(key, amount, timeout=None):
+                self.cache.incr(key, amount)
+        with self._lock:
+            self._seen.add(pk)
+        self.ensure_flusher()
+
+    def pending(self, pk):
+        return self.cache.get(self.make_key(pk), 0)
+
+    def drain(self, pks=None):
+        if pks is None:
+            with self._lock:
+                pks, self._seen = self._seen, set()
+        keys = {self.make_key(pk): pk for pk in pks}
+        increments = {}
+        for key, amount in self.cache.get_many(list(keys)).items():
+            if amount:
+                # 읽은 만큼만 차감하므로 그 사이에 들어온 조회수는 캐시에 남습니다.
+                self.cache.decr(key, amount)
+                increments[keys[key]] = amount
+        return increments
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_view_counter():
+    # 설정에 지정된 조회수 버퍼를 프로세스당 하나만 만들어 반환합니다.
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                config = get_config()
+                backend_class = import_string(config['BACKEND'])
+                _backend = backend_class(
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    cache_alias=config['CACHE_ALIAS'],
+                )
+    return _backend
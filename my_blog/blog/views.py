@@ -1,22 +1,100 @@
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404, reverse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from django.views import View
 from django.views.generic import ListView, DeleteView, UpdateView, DetailView, CreateView
-from .models import Post, Comment, Reply, Tag
+from .models import Post, Comment, Reply, PostTag, Tag
+from . import cache as blog_cache
+from . import feeds
 from .forms import PostForm, CommentForm, ReplyForm
+from .mixins import OwnerRequiredMixin
+from .conditional import (
+    AsyncConditionalPageMixin, ConditionalPageMixin, aposts_last_modified, post_last_modified, posts_last_modified,
+)
+from .pagination import KeysetPaginator, LinkKeysetPaginator
+from .rendering import LIST_DEFERRED_FIELDS
+from .search import search_posts
+from .threads import aload_comment_thread, load_comment_thread
+from .viewcount import get_view_counter
+from accounts.authors import aattach_authors, attach_authors
+from django.db import transaction
 from django.urls import reverse_lazy
+from django.utils.functional import SimpleLazyObject
 from django.shortcuts import render
 
-class PostListView(ListView):
+# 목록 정렬 기준입니다. ?sort=activity 이면 댓글/답글이 최근에 달린 순서로 보여줍니다.
+POST_LIST_ORDERINGS = {
+    'latest': ('-created_at', '-id'),
+    'activity': ('-last_activity_at', '-id'),
+}
+
+
+def get_list_sort(request):
+    sort = request.GET.get('sort')
+    return sort if sort in POST_LIST_ORDERINGS else 'latest'
+
+
+# 비로그인 사용자에게는 언어별로 캐시된 목록 페이지를 돌려줍니다.
+# 목록/상세 뷰는 조건부 요청(ETag, Last-Modified)에 304 로 답합니다. (blog/conditional.py)
+class PostListView(ConditionalPageMixin, blog_cache.AnonymousPageCacheMixin, ListView):
     model = Post
+    paginate_by = 20
+    # 'keyset'은 before/after 토큰으로, 'page'는 ?page=N 으로 페이지를 나눕니다.
+    # URLconf에서 PostListView.as_view(pagination='page') 처럼 바꿀 수 있고, ?page= 가 있으면 page 방식을 사용합니다.
+    pagination = 'keyset'
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        # 작성자는 User 를 JOIN 하지 않고 get_context_data() 에서 작성자 캐시로 한 번에 붙입니다.
+        # 목록에는 미리 만든 요약(excerpt)만 보여주므로 긴 본문 열은 읽지 않습니다.
+        qs = super().get_queryset().defer(*LIST_DEFERRED_FIELDS)
         q = self.request.GET.get('q', '')
         if q:
-            qs = qs.filter(Q(title__icontains=q) | Q(tags__name__icontains=q)).distinct()
+            # 검색어가 있으면 전문 검색 색인에서 관련도 순으로 현재 페이지의 게시글만 가져옵니다.
+            return search_posts(q)
         return qs
 
+    def get_page_cache_scopes(self):
+        return [blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    def get_last_modified(self):
+        return posts_last_modified()
+
+    def get_ordering(self):
+        return POST_LIST_ORDERINGS[get_list_sort(self.request)]
+
+    def use_keyset(self):
+        # 검색 결과는 관련도 순, 활동 순 정렬은 (created_at, id) 커서를 쓸 수 없으므로 page 방식으로 나눕니다.
+        return (
+            self.pagination == 'keyset'
+            and self.page_kwarg not in self.request.GET
+            and not self.request.GET.get('q')
+            and get_list_sort(self.request) == 'latest'
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['keyset_pagination'] = self.use_keyset()
+        context['sort'] = get_list_sort(self.request)
+        # 현재 페이지 게시글의 작성자 정보를 한 번에 붙입니다.
+        context['object_list'] = context['post_list'] = attach_authors(context['object_list'])
+        return context
+
 post_list = PostListView.as_view()
 
 
@@ -26,67 +104,307 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('blog:post_list')
     template_name = 'blog/form.html'
 
+    def get_form_kwargs(self):
+        # 조각 업로드(upload_id)가 본인 것인지 확인하도록 사용자를 넘깁니다.
+        return {**super().get_form_kwargs(), 'user': self.request.user}
+
     def form_valid(self, form):
+        # 작성자를 지정한 뒤 PostForm.save() 에서 게시글 저장과 태그 연결을 한 번에 처리합니다.
         form.instance.user = self.request.user
-        post = form.save(commit=False)
-        post.save()
-        video = form.save(commit=True)
-        video.user = self.request.user
-        tag_names = form.cleaned_data['tags']
-        if tag_names:  
-            for tag_name in tag_names.split(','):
-                tag, _ = Tag.objects.get_or_create(name=tag_name.strip())
-                post.tags.add(tag)
-
         return super().form_valid(form)
 
 post_new = PostCreateView.as_view()
 
 
-class PostDetailView(DetailView):
-    model = Post
+# 비로그인 사용자에게는 언어별로 캐시된 상세 페이지를 돌려주고, 댓글 영역은 조각 캐시로 저장합니다.
+class PostDetailView(ConditionalPageMixin, blog_cache.AnonymousPageCacheMixin, DetailView):
+    # 화면에는 미리 만든 content_html 을 보여주므로 원문(content)은 읽지 않습니다.
+    queryset = Post.objects.defer('content')
+
+    def get_page_cache_scopes(self):
+        pk = self.kwargs['pk']
+        return [blog_cache.post_scope(pk), blog_cache.thread_scope(pk), blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    def page_cache_hit(self):
+        # 캐시된 페이지를 보여주거나 304 로 답할 때도 조회수는 기록합니다.
+        get_view_counter().incr(self.kwargs['pk'])
+
+    def get_last_modified(self):
+        # 페이지를 그린 뒤에는 불러온 게시글을 쓰고, 그리기 전(If-Modified-Since)에는 수정 시각 두 개만 조회합니다.
+        post = getattr(self, 'object', None)
+        if post is None:
+            post = self.get_queryset().filter(pk=self.kwargs['pk']).only('updated_at', 'last_activity_at').first()
+        return post_last_modified(post) if post is not None else None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['comments'] = Comment.objects.filter(post=self.object).order_by('-created_at')
-        context['replies'] = Reply.objects.filter(post=self.object).order_by('-created_at')
+        comment_page = self.request.GET.get('comment_page')
+        # 댓글과 대댓글, 작성자를 일정한 쿼리 수로 한꺼번에 불러옵니다. (?comment_page=N 으로 페이지 이동)
+        # 댓글 조각 캐시가 있으면 쿼리를 실행하지 않도록 템플릿에서 처음 사용할 때 불러옵니다.
+        context['comments'] = SimpleLazyObject(lambda: load_comment_thread(self.object, comment_page))
+        # 댓글 조각 캐시 키에 들어갈 값들입니다.
+        context['comment_page'] = comment_page or 1
+        context['thread_version'] = blog_cache.thread_fragment_version(self.object.pk)
+        context['thread_cache_vary'] = blog_cache.thread_cache_vary(self.request)
+        context['thread_cache_timeout'] = blog_cache.get_cache_timeout()
+        context['blog_cache_alias'] = blog_cache.get_cache_alias()
         context['comment_form'] = CommentForm()
         context['reply_form'] = ReplyForm()
         return context
     
     def get_object(self, queryset=None):
-        pk = self.kwargs.get('pk')
-        post = Post.objects.get(pk=pk)
-        post.view_count += 1
-        post.save()
-        return super().get_object(queryset)
+        post = super().get_object(queryset)
+        # 조회수는 버퍼에만 기록하고, DB 반영은 주기적으로 묶어서 처리합니다.
+        counter = get_view_counter()
+        counter.incr(post.pk)
+        # 화면에는 아직 반영되지 않은 조회수까지 더해서 보여줍니다. (저장하지 않음)
+        post.view_count += counter.pending(post.pk)
+        attach_authors([post])
+        return post
 
 post_detail = PostDetailView.as_view()
 
 
-class PostUpdateView(UserPassesTestMixin, UpdateView):
+# 태그 구름입니다. 게시글 수는 Tag.post_count 에 저장된 값을 읽으므로 태그별 COUNT 집계를 하지 않습니다.
+class TagListView(blog_cache.AnonymousPageCacheMixin, ListView):
+    template_name = 'blog/tag_list.html'
+    context_object_name = 'tags'
+    # 게시글이 많은 순서로 이만큼만 보여줍니다. ((-post_count, name) 인덱스에서 바로 읽습니다)
+    limit = 100
+    # 글자 크기 단계 수입니다. (부트스트랩 fs-1 ~ fs-5)
+    font_sizes = 5
+
+    def get_queryset(self):
+        return Tag.objects.filter(post_count__gt=0).exclude(name=None).order_by('-post_count', 'name')[:self.limit]
+
+    def get_page_cache_scopes(self):
+        # 게시글이 저장/삭제되거나 태그 연결이 바뀌면 목록 버전이 올라가므로 게시글 수 변화도 반영됩니다.
+        return [blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        tags = list(context['tags'])
+        most = max((tag.post_count for tag in tags), default=1)
+        for tag in tags:
+            # 가장 많은 태그 대비 비율로 글자 크기를 정합니다. (fs-1 이 가장 큽니다)
+            tag.font_size = self.font_sizes - (tag.post_count * (self.font_sizes - 1)) // most
+        context['tags'] = sorted(tags, key=lambda tag: tag.name)
+        return context
+
+tag_list = TagListView.as_view()
+
+
+# 태그 하나의 게시글 목록입니다. 태그는 이름으로 정확히 찾고(unique 인덱스), 게시글은 중간 테이블의
+# (tag_id, post_id) 인덱스에서 post_id 가 큰(최근에 작성된) 순서로 한 페이지 분량만 읽습니다. (blog/pagination.py)
+class TagPostListView(ConditionalPageMixin, blog_cache.AnonymousPageCacheMixin, ListView):
+    template_name = 'blog/tag_detail.html'
+    context_object_name = 'post_list'
+    paginate_by = PostListView.paginate_by
+
+    def get_tag(self):
+        if not hasattr(self, 'tag'):
+            self.tag = get_object_or_404(Tag, name=self.kwargs['name'])
+        return self.tag
+
+    def get_queryset(self):
+        self.get_tag()
+        return Post.objects.defer(*LIST_DEFERRED_FIELDS)
+
+    def get_page_cache_scopes(self):
+        return [blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    def get_last_modified(self):
+        return posts_last_modified()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = LinkKeysetPaginator(PostTag.objects.filter(tag=self.get_tag()), queryset, page_size)
+        page = paginator.page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag'] = self.get_tag()
+        context['object_list'] = context['post_list'] = attach_authors(context['object_list'])
+        return context
+
+tag_detail = TagPostListView.as_view()
+
+
+# 최신 글, 태그별, 작성자별 피드입니다. (blog/feeds.py, 형식: rss, atom, json)
+# 피드 문서는 캐시에서 꺼내 주므로 게시글이 바뀌지 않았으면 DB 쿼리 없이 응답하고, 조건부 요청에는 304 로 답합니다.
+class PostFeedView(ConditionalPageMixin, View):
+    # 'latest', 'tag', 'author'
+    kind = 'latest'
+
+    def get_page_cache_scopes(self):
+        return [blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    def get_document(self):
+        if not hasattr(self, 'document'):
+            self.document = feeds.get_feed(
+                self.request, self.kind, self.kwargs.get('name'), self.kwargs['feed_format'],
+                blog_cache.get_versions(*self.get_page_cache_scopes()),
+            )
+        return self.document
+
+    def cached_last_modified(self, versions):
+        # 피드마다 수정 시각이 다르므로 버전별 공용 캐시 대신 캐시된 피드 문서의 값을 씁니다.
+        return self.get_document()['last_modified']
+
+    def get(self, request, *args, **kwargs):
+        document = self.get_document()
+        return HttpResponse(document['content'], content_type=document['content_type'])
+
+post_feed = PostFeedView.as_view()
+tag_feed = PostFeedView.as_view(kind='tag')
+author_feed = PostFeedView.as_view(kind='author')
+
+
+# ASGI 서버에서 쓰는 비동기 목록/상세 뷰입니다. 동기 뷰와 같은 템플릿, 페이지 캐시, 페이지 나누기를 사용하며
+# ORM은 aiterator/aget/acount 로 호출하고, 동기 API만 있는 검색 색인은 스레드에서 실행합니다.
+# 템플릿을 그리는 동안 쿼리가 나가지 않도록 필요한 데이터를 모두 미리 불러온 뒤 그립니다.
+# settings.BLOG_ASYNC_VIEWS 가 True 이면 blog/urls.py 가 이 뷰를 사용합니다.
+class AsyncPostListView(AsyncConditionalPageMixin, blog_cache.AsyncAnonymousPageCacheMixin, View):
+    template_name = 'blog/post_list.html'
+    paginate_by = PostListView.paginate_by
+    pagination = PostListView.pagination
+
+    def get_page_cache_scopes(self):
+        return [blog_cache.LIST_SCOPE, blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    async def aget_last_modified(self):
+        return await aposts_last_modified()
+
+    async def get(self, request):
+        q = request.GET.get('q', '')
+        sort = get_list_sort(request)
+        keyset = self.pagination == 'keyset' and 'page' not in request.GET and not q and sort == 'latest'
+        queryset = Post.objects.defer(*LIST_DEFERRED_FIELDS).order_by(*POST_LIST_ORDERINGS[sort])
+        if keyset:
+            paginator = KeysetPaginator(queryset, self.paginate_by)
+            page = await paginator.apage(
+                after=request.GET.get('after'),
+                before=request.GET.get('before'),
+            )
+        elif q:
+            # 검색 백엔드를 고를 때(fts5_available)도 동기 쿼리를 하므로 검색 전체를 스레드에서 실행합니다.
+            paginator, page = await sync_to_async(lambda: self.paginate(search_posts(q)))()
+        else:
+            paginator, page = await self.apaginate(queryset)
+        posts = await aattach_authors(page.object_list)
+        context = {
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': posts,
+            'post_list': posts,
+            'keyset_pagination': keyset,
+            'sort': sort,
+        }
+        return render(request, self.template_name, context)
+
+    def get_page(self, paginator):
+        # ListView 와 같이 ?page=N 또는 ?page=last 로 페이지를 고르고, 없는 페이지면 404를 반환합니다.
+        page_number = self.request.GET.get('page') or 1
+        if page_number == 'last':
+            page_number = paginator.num_pages
+        try:
+            return paginator.page(page_number)
+        except InvalidPage as e:
+            raise Http404(f'잘못된 페이지입니다. ({e})')
+
+    def paginate(self, object_list):
+        paginator = Paginator(object_list, self.paginate_by)
+        page = self.get_page(paginator)
+        page.object_list = list(page.object_list)
+        return paginator, page
+
+    async def apaginate(self, queryset):
+        paginator = Paginator(queryset, self.paginate_by)
+        # COUNT 를 미리 구해 두면 Paginator 가 동기 쿼리로 다시 세지 않습니다.
+        paginator.count = await queryset.acount()
+        page = self.get_page(paginator)
+        page.object_list = [post async for post in page.object_list.aiterator()]
+        return paginator, page
+
+post_list_async = AsyncPostListView.as_view()
+
+
+class AsyncPostDetailView(AsyncConditionalPageMixin, blog_cache.AsyncAnonymousPageCacheMixin, View):
+    template_name = 'blog/post_detail.html'
+
+    def get_page_cache_scopes(self):
+        pk = self.kwargs['pk']
+        return [blog_cache.post_scope(pk), blog_cache.thread_scope(pk), blog_cache.TAGS_SCOPE, blog_cache.AUTHORS_SCOPE]
+
+    async def page_cache_hit(self):
+        await get_view_counter().aincr(self.kwargs['pk'])
+
+    async def aget_last_modified(self):
+        post = getattr(self, 'object', None)
+        if post is None:
+            post = await Post.objects.filter(pk=self.kwargs['pk']).only('updated_at', 'last_activity_at').afirst()
+        return post_last_modified(post) if post is not None else None
+
+    async def get(self, request, pk):
+        try:
+            # 템플릿에서 쿼리가 나가지 않도록 태그를 함께 불러옵니다.
+            post = await Post.objects.defer('content').prefetch_related('tags').aget(pk=pk)
+        except Post.DoesNotExist:
+            raise Http404('게시글을 찾을 수 없습니다.')
+        counter = get_view_counter()
+        await counter.aincr(post.pk)
+        post.view_count += await counter.apending(post.pk)
+        await aattach_authors([post])
+        self.object = post
+
+        context = {
+            'object': post,
+            'post': post,
+            'comment_page': request.GET.get('comment_page') or 1,
+            'comment_form': CommentForm(),
+            'reply_form': ReplyForm(),
+        }
+        context['comment_thread_html'] = await self.arender_comment_thread(post, context)
+        return render(request, self.template_name, context)
+
+    async def arender_comment_thread(self, post, context):
+        # 동기 뷰의 {% cache %} 조각과 같은 키를 써서 두 뷰가 댓글 조각 캐시를 함께 씁니다.
+        # 템플릿 안에서 댓글을 불러오면 동기 쿼리가 되므로, 여기서 캐시를 확인하고 없을 때만 비동기로 불러와 그립니다.
+        version = await blog_cache.athread_fragment_version(post.pk)
+        vary_on = [post.pk, version, context['comment_page'], blog_cache.thread_cache_vary(self.request), get_language()]
+        key = make_template_fragment_key('blog_comment_thread', vary_on)
+        cache = blog_cache.get_cache()
+        html = await cache.aget(key)
+        if html is None:
+            comments = await aload_comment_thread(post, context['comment_page'])
+            html = render_to_string('blog/comment_thread.html', {**context, 'comments': comments}, self.request)
+            await cache.aset(key, html, blog_cache.get_cache_timeout())
+        return mark_safe(html)
+
+post_detail_async = AsyncPostDetailView.as_view()
+
+
+# OwnerRequiredMixin 이 게시글을 한 번만 조회하고 작성자만 접근할 수 있게 제한합니다.
+class PostUpdateView(OwnerRequiredMixin, UpdateView):
     model = Post
     form_class = PostForm
     success_url = reverse_lazy('blog:post_list')
     template_name = 'blog/form.html'
 
-    def test_func(self): # UserPassesTestMixin에 있고 test_func() 메서드를 오버라이딩, True, False 값으로 접근 제한
-        return self.get_object().user == self.request.user
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'user': self.request.user}
 
 post_edit = PostUpdateView.as_view()
 
 
-class PostDeleteView(UserPassesTestMixin, DeleteView):
+class PostDeleteView(OwnerRequiredMixin, DeleteView):
     model = Post
     success_url = reverse_lazy('blog:post_list')
 
-    def test_func(self):
-        return self.get_object().user == self.request.user
-
-    def get_object(self, queryset=None):
-        post = super().get_object(queryset)
-        return get_object_or_404(Post, id=post.id)
-
 post_delete = PostDeleteView.as_view()
 
 
@@ -106,8 +424,9 @@ class CommentNewView(LoginRequiredMixin, CreateView):
             comment.post = post
             # Comment 인스턴스의 user 필드 설정
             comment.user = request.user
-            # Comment 인스턴스를 DB에 저장
-            comment.save()
+            # Comment 인스턴스를 DB에 저장, 게시글의 댓글 수 갱신(signals.py)과 함께 한 트랜잭션으로 처리
+            with transaction.atomic():
+                comment.save()
             # 저장 후 블로그 상세 페이지로 리다이렉트
             return redirect('blog:post_detail', pk)
         # 유효하지 않은 폼을 사용자에게 다시 보여줌
@@ -125,48 +444,44 @@ comment_new = CommentNewView.as_view()
 
 
 # 댓글 수정 뷰
-class CommentUpdateView(UserPassesTestMixin, UpdateView):
+class CommentUpdateView(OwnerRequiredMixin, UpdateView):
     # Comment 모델을 기반으로 뷰를 생성
     model = Comment
     # 사용할 폼 클래스 지정
     form_class = CommentForm
     # 사용할 템플릿 이름 지정
     template_name = 'blog/form.html'
+    # URL의 comment_pk 로 댓글을 찾음
+    pk_url_kwarg = 'comment_pk'
 
-    # 요청된 객체를 가져오는 메서드. URL의 키워드 인자를 이용해 댓글을 찾음
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, post__pk=self.kwargs['post_pk'], pk=self.kwargs['comment_pk'])
+    # 요청된 게시글의 댓글 중에서만 찾음
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_pk'])
 
     # 수정 성공 후 리다이렉트할 URL을 반환하는 메서드
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
-
-    # UserPassesTestMixin의 테스트 함수. 현재 요청한 사용자가 댓글의 작성자와 같은지 확인
-    def test_func(self): 
-        return self.get_object().user == self.request.user
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 # 뷰를 함수형 뷰로 변환하여 URLconf에서 사용할 수 있게 함
 comment_edit = CommentUpdateView.as_view()
 
 
 # 댓글 삭제 뷰
-class CommentDeleteView(UserPassesTestMixin, DeleteView):
+class CommentDeleteView(OwnerRequiredMixin, DeleteView):
     # Comment 모델을 기반으로 뷰를 생성
     model = Comment
     # 사용할 템플릿 이름 지정
     template_name = 'blog/post_confirm_delete.html'
-    
-    # 요청된 객체를 가져오는 메서드. URL의 키워드 인자를 이용해 댓글을 찾음
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, post__pk=self.kwargs['post_pk'], pk=self.kwargs['comment_pk'])
+    # URL의 comment_pk 로 댓글을 찾음
+    pk_url_kwarg = 'comment_pk'
+
+    # 요청된 게시글의 댓글 중에서만 찾음
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_pk'])
 
     # 삭제 성공 후 리다이렉트할 URL을 반환하는 메서드
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
-
-    # UserPassesTestMixin의 테스트 함수. 현재 요청한 사용자가 댓글의 작성자와 같은지 확인
-    def test_func(self): 
-        return self.get_object().user == self.request.user
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 # 뷰를 함수형 뷰로 변환하여 URLconf에서 사용할 수 있게 함
 comment_delete = CommentDeleteView.as_view()
@@ -189,8 +504,9 @@ class CommentReplyView(LoginRequiredMixin, CreateView):
             reply.post = post
             reply.comment = comment
             reply.user = request.user
-            # Reply 인스턴스를 DB에 저장
-            reply.save()
+            # Reply 인스턴스를 DB에 저장, 게시글의 답글 수 갱신(signals.py)과 함께 한 트랜잭션으로 처리
+            with transaction.atomic():
+                reply.save()
             # 저장 후 블로그 상세 페이지로 리다이렉트
             return redirect('blog:post_detail', post_pk)
         # 유효하지 않은 폼을 사용자에게 다시 보여줌
@@ -208,48 +524,44 @@ comment_reply = CommentReplyView.as_view()
 
 
 # 답글 수정 뷰
-class ReplyUpdateView(UserPassesTestMixin, UpdateView):
+class ReplyUpdateView(OwnerRequiredMixin, UpdateView):
     # Reply 모델을 기반으로 뷰를 생성
     model = Reply
     # 사용할 폼 클래스 지정
     form_class = ReplyForm
     # 사용할 템플릿 이름 지정
     template_name = 'blog/form.html'
+    # URL의 reply_pk 로 답글을 찾음
+    pk_url_kwarg = 'reply_pk'
 
-    # 요청된 객체를 가져오는 메서드. URL의 키워드 인자를 이용해 답글을 찾음
-    def get_object(self, queryset=None):
-        return get_object_or_404(Reply, comment__post__pk=self.kwargs['post_pk'], comment__pk=self.kwargs['comment_pk'], pk=self.kwargs['reply_pk'])
+    # 요청된 게시글과 댓글에 달린 답글 중에서만 찾음
+    def get_queryset(self):
+        return Reply.objects.filter(comment__post_id=self.kwargs['post_pk'], comment_id=self.kwargs['comment_pk'])
 
     # 수정 성공 후 리다이렉트할 URL을 반환하는 메서드
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
-
-    # UserPassesTestMixin의 테스트 함수. 현재 요청한 사용자가 답글의 작성자와 같은지 확인
-    def test_func(self): 
-        return self.get_object().user == self.request.user
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 # 뷰를 함수형 뷰로 변환하여 URLconf에서 사용할 수 있게 함
 reply_edit = ReplyUpdateView.as_view()
 
 
 # 답글 삭제 뷰
-class ReplyDeleteView(UserPassesTestMixin, DeleteView):
+class ReplyDeleteView(OwnerRequiredMixin, DeleteView):
     # Reply 모델을 기반으로 뷰를 생성
     model = Reply
     # 사용할 템플릿 이름 지정
     template_name = 'blog/post_confirm_delete.html'
+    # URL의 reply_pk 로 답글을 찾음
+    pk_url_kwarg = 'reply_pk'
 
-    # 요청된 객체를 가져오는 메서드. URL의 키워드 인자를 이용해 답글을 찾음
-    def get_object(self, queryset=None):
-        return get_object_or_404(Reply, comment__post__pk=self.kwargs['post_pk'], comment__pk=self.kwargs['comment_pk'], pk=self.kwargs['reply_pk'])
+    # 요청된 게시글과 댓글에 달린 답글 중에서만 찾음
+    def get_queryset(self):
+        return Reply.objects.filter(comment__post_id=self.kwargs['post_pk'], comment_id=self.kwargs['comment_pk'])
 
     # 삭제 성공 후 리다이렉트할 URL을 반환하는 메서드
     def get_success_url(self):
-        return reverse('blog:post_detail', kwargs={'pk': self.object.post.pk})
-
-    # UserPassesTestMixin의 테스트 함수. 현재 요청한 사용자가 답글의 작성자와 같은지 확인
-    def test_func(self): 
-        return self.get_object().user == self.request.user
+        return reverse('blog:post_detail', kwargs={'pk': self.object.post_id})
 
 # 뷰를 함수형 뷰로 변환하여 URLconf에서 사용할 수 있게 함
 reply_delete = ReplyDeleteView.as_view()
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class BlogbaseConfig(AppConfig):
+    name = 'blogbase'
+
+    def ready(self):
+        # SQLite 연결 설정(connection_created) 핸들러를 연결합니다.
+        from . import db
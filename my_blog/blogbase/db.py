@@ -0,0 +1,119 @@
+# 데이터베이스 연결 설정과 읽기/쓰기 분리 라우터입니다.
+#
+# SQLite 연결이 열릴 때마다 DEFAULT_PRAGMAS 를 적용합니다. (WAL, synchronous=NORMAL, mmap, busy_timeout 등)
+# settings.SQLITE_PRAGMAS 에 있는 값은 기본값 대신 사용합니다.
+# WAL 모드에서는 조회수 반영 같은 쓰기가 진행 중이어도 다른 연결의 읽기가 막히지 않습니다.
+#
+# PrimaryReplicaRouter 는 REPLICA_ROUTING['APPS'] 에 있는 앱(blog)의 읽기를 읽기 전용 연결(replica)로,
+# 모든 쓰기를 기본 연결(default)로 보냅니다. 라우터는 DB 종류를 보지 않으므로 PostgreSQL 로 바꿀 때는
+# DATABASES 의 replica 를 복제 서버로 지정하기만 하면 됩니다.
+import contextvars
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+# WAL: 쓰기 중에도 읽기가 막히지 않음, synchronous=NORMAL: WAL 에서 안전한 범위로 fsync 횟수를 줄임,
+# busy_timeout: 잠금이 풀릴 때까지 기다리는 시간(ms), mmap_size: 파일을 메모리에 매핑해 읽는 크기(바이트)
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+# 읽기 전용 연결에서는 바꿀 수 없는 설정입니다. (journal_mode 는 파일에 기록되므로 쓰기 연결이 설정합니다.)
+WRITE_ONLY_PRAGMAS = ('journal_mode',)
+
+# 요청 안에서 쓰기를 한 뒤에는 방금 쓴 내용을 읽을 수 있도록 그 요청이 끝날 때까지 읽기도 기본 연결로 보냅니다.
+# 요청 밖에서는 primary_pin_scope() 로 작업 단위(작업자의 작업 하나, 관리 명령 한 번)마다 새로 시작합니다.
+_pinned_to_primary = contextvars.ContextVar('pinned_to_primary', default=False)
+
+
+def get_pragmas():
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    return pragmas
+
+
+def is_read_only(connection):
+    return 'mode=ro' in str(connection.settings_dict['NAME'])
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in get_pragmas().items():
+            if read_only and name in WRITE_ONLY_PRAGMAS:
+                continue
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            cursor.execute('PRAGMA query_only = ON')
+
+
+def get_routing():
+    config = {'REPLICA': 'replica', 'APPS': ['blog']}
+    config.update(getattr(settings, 'REPLICA_ROUTING', {}))
+    return config
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        config = get_routing()
+        replica = config['REPLICA']
+        if model._meta.app_label not in config['APPS'] or replica not in connections.databases:
+            return None
+        # 트랜잭션 안이거나 이번 요청에서 이미 쓰기를 했다면 아직 복제되지 않은 내용을 읽어야 하므로 기본 연결을 씁니다.
+        if _pinned_to_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _pinned_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 기본 연결과 복제 연결은 같은 데이터이므로 어느 쪽에서 읽은 객체끼리도 관계를 맺을 수 있습니다.
+        databases = {DEFAULT_DB_ALIAS, get_routing()['REPLICA']}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # 복제 연결은 기본 DB를 그대로 따라가므로 마이그레이션하지 않습니다.
+        if db == get_routing()['REPLICA']:
+            return False
+        return None
+
+
+@contextmanager
+def primary_pin_scope():
+    # '쓰기 후 기본 연결 고정' 상태를 새로 시작하고, 끝나면 이전 상태로 되돌립니다.
+    # 같은 스레드가 여러 작업을 이어서 처리할 때 앞 작업의 쓰기 때문에 뒤 작업의 읽기까지 기본 연결로 가지 않게 합니다.
+    # 함수 데코레이터로도 쓸 수 있습니다. (@primary_pin_scope())
+    token = _pinned_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+@sync_and_async_middleware
+def primary_pin_middleware(get_response):
+    # 요청마다 '쓰기 후 기본 연결 고정' 상태를 새로 시작합니다.
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with primary_pin_scope():
+                return await get_response(request)
+    else:
+        def middleware(request):
+            with primary_pin_scope():
+                return get_response(request)
+    return middleware
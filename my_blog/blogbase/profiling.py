@@ -0,0 +1,225 @@
+# 요청별 성능 측정 미들웨어입니다.
+#
+# 요청마다 SQL 쿼리 수, DB 시간, 템플릿 렌더링 시간, 전체 처리 시간을 URL 이름(예: blog:post_detail)별로 모아
+#   - 'my.profiling' 로거에 JSON 한 줄로 남기고
+#   - 프로세스 메모리에 URL 이름별 최근 SAMPLE_SIZE 개를 보관해 /admin/profiling/ 에서 p50/p95/p99 로 보여줍니다.
+# settings.REQUEST_PROFILING['BUDGETS'] 의 쿼리 수를 넘긴 요청은 WARNING 으로 남깁니다. (테스트에서는 blogbase/testing.py)
+#
+# 쿼리는 연결이 열릴 때 한 번 등록한 execute_wrapper 가, 템플릿 시간은 ProfilingDjangoTemplates 백엔드가 기록합니다.
+# 처리 중인 요청의 기록은 contextvar 로 찾으므로 비동기 뷰의 sync_to_async 안에서 실행된 쿼리도 같은 요청에 집계됩니다.
+# 템플릿을 그리는 중에 실행된 쿼리는 DB 시간과 템플릿 시간 양쪽에 들어갑니다.
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger('my.profiling')
+
+DEFAULTS = {
+    'ENABLED': True,
+    # URL 이름별로 보관할 최근 요청 수입니다.
+    'SAMPLE_SIZE': 500,
+    # {URL 이름: 요청 하나에 허용하는 쿼리 수}, GET 외의 메서드는 {'POST URL 이름': 쿼리 수} 로 따로 적습니다.
+    'BUDGETS': {},
+}
+METRICS = ('queries', 'db_ms', 'template_ms', 'total_ms')
+PERCENTILES = (50, 95, 99)
+# URL 에 연결되지 않은 요청(404 등)을 묶는 이름입니다.
+UNRESOLVED = '<unresolved>'
+
+_current_profile = contextvars.ContextVar('current_profile', default=None)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'REQUEST_PROFILING', {}))
+    return config
+
+
+def get_budget(view_name, method='GET'):
+    # 'POST blog:post_new' 처럼 메서드를 붙인 예산이 있으면 그 값을 씁니다.
+    # 메서드 없는 예산은 GET/HEAD 요청에만 적용하므로, 폼 저장처럼 쿼리가 많은 요청이 조회 예산으로 경고되지 않습니다.
+    budgets = get_config()['BUDGETS']
+    budget = budgets.get(f'{method} {view_name}')
+    if budget is None and method in ('GET', 'HEAD'):
+        budget = budgets.get(view_name)
+    return budget
+
+
+class RequestProfile:
+    # 요청 하나에서 측정한 값입니다.
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_time += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # CONN_MAX_AGE 로 같은 연결 객체가 다시 연결될 때도 신호가 오므로 한 번만 등록합니다.
+    if get_config()['ENABLED'] and record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = _current_profile.get()
+        # 템플릿 태그 안에서 다른 템플릿을 그리는 경우 시간이 두 번 더해지지 않도록 가장 바깥 렌더링만 잽니다.
+        if profile is None or profile.rendering:
+            return super().render(context, request)
+        profile.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_time += time.perf_counter() - started
+            profile.rendering = False
+
+
+class ProfilingDjangoTemplates(DjangoTemplates):
+    # DjangoTemplates 와 같고, 렌더링 시간을 현재 요청의 기록에 더하는 템플릿을 돌려줍니다.
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return ProfiledTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class ProfileStore:
+    # URL 이름별 최근 요청의 측정값을 보관하고 백분위수를 계산합니다. (프로세스마다 따로 집계됩니다)
+    def __init__(self, sample_size):
+        self.sample_size = sample_size
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, view_name, sample):
+        with self.lock:
+            if view_name not in self.samples:
+                self.samples[view_name] = deque(maxlen=self.sample_size)
+            self.samples[view_name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self):
+        with self.lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+        rows = []
+        for view_name, values in sorted(samples.items()):
+            row = {'view': view_name, 'count': len(values), 'budget': get_budget(view_name)}
+            for metric in METRICS:
+                ordered = sorted(value[metric] for value in values)
+                for p in PERCENTILES:
+                    row[f'{metric}_p{p}'] = ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+                row[f'{metric}_max'] = ordered[-1]
+            rows.append(row)
+        return rows
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore(get_config()['SAMPLE_SIZE'])
+    return _store
+
+
+def finish(request, response, profile, started):
+    match = getattr(request, 'resolver_match', None)
+    view_name = match.view_name if match else UNRESOLVED
+    sample = {
+        'queries': profile.queries,
+        'db_ms': round(profile.db_time * 1000, 2),
+        'template_ms': round(profile.template_time * 1000, 2),
+        'total_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+    get_store().add(view_name, sample)
+    logger.info(json.dumps({
+        'view': view_name, 'method': request.method, 'path': request.path, 'status': response.status_code, **sample,
+    }))
+    budget = get_budget(view_name, request.method)
+    if budget is not None and profile.queries > budget:
+        logger.warning(
+            '%s %s 요청의 쿼리 수 %d 개가 예산 %d 개를 넘었습니다. (%s)',
+            request.method, view_name, profile.queries, budget, request.path,
+        )
+
+
+@sync_and_async_middleware
+def profiling_middleware(get_response):
+    if not get_config()['ENABLED']:
+        raise MiddlewareNotUsed
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            profile = RequestProfile()
+            token = _current_profile.set(profile)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _current_profile.reset(token)
+            finish(request, response, profile, started)
+            return response
+    else:
+        def middleware(request):
+            profile = RequestProfile()
+            token = _current_profile.set(profile)
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                _current_profile.reset(token)
+            finish(request, response, profile, started)
+            return response
+    return middleware
+
+
+# 관리자만 볼 수 있는 요약 페이지입니다. ?format=json 이면 JSON 으로 돌려줍니다.
+@staff_member_required
+def profiling_summary(request):
+    rows = get_store().summary()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'views': rows})
+    columns = [f'{metric}_{stat}' for metric in METRICS for stat in [f'p{p}' for p in PERCENTILES] + ['max']]
+    return render(request, 'blogbase/profiling.html', {
+        'title': '요청 성능 요약',
+        'columns': columns,
+        'rows': [(row, [row[column] for column in columns]) for row in rows],
+        'sample_size': get_config()['SAMPLE_SIZE'],
+    })
@@ -99,15 +99,20 @@ INSTALLED_APPS = [
     'blog',
     'main',
     'accounts',
+    'jobs',
+    'blogbase',
 ]
 
 MIDDLEWARE = [
+    'blogbase.db.primary_pin_middleware',
+    'blogbase.profiling.profiling_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware', # <--- 이곳에 추가함 (꼭 이곳에 추가)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware 와 같고 로그인 사용자를 캐시에서 읽습니다. (accounts/sessions.py)
+    'accounts.sessions.CachedUserAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -116,7 +121,8 @@ ROOT_URLCONF = 'blogbase.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates 와 같고 요청별 템플릿 렌더링 시간을 기록합니다. (blogbase/profiling.py)
+        'BACKEND': 'blogbase.profiling.ProfilingDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -136,11 +142,210 @@ WSGI_APPLICATION = 'blogbase.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# default: 모든 쓰기와 blog 외 앱의 읽기, replica: blog 앱의 읽기 (blogbase/db.py 의 PrimaryReplicaRouter)
+# SQLite 에서는 replica 가 같은 파일을 읽기 전용(mode=ro)으로 엽니다.
+# PostgreSQL 로 바꿀 때는 두 연결의 ENGINE/NAME/HOST 만 바꾸면 라우터는 그대로 동작합니다.
+# CONN_MAX_AGE: 요청마다 새로 연결하지 않고 연결을 재사용하는 시간(초), CONN_HEALTH_CHECKS: 재사용 전에 연결 상태를 확인합니다.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"{(BASE_DIR / 'db.sqlite3').as_uri()}?mode=ro",
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['blogbase.db.PrimaryReplicaRouter']
+
+# 읽기를 replica 로 보낼 앱 목록입니다.
+REPLICA_ROUTING = {
+    'REPLICA': 'replica',
+    'APPS': ['blog'],
+}
+
+# SQLite 연결이 열릴 때마다 적용하는 PRAGMA 는 blogbase/db.py 의 DEFAULT_PRAGMAS 입니다.
+# 바꿀 값만 SQLITE_PRAGMAS 에 적습니다. (예: SQLITE_PRAGMAS = {'mmap_size': 0})
+
+
+# 캐시 설정
+# default: 프로세스 메모리 캐시
+# blog: 목록/상세 페이지와 댓글 조각 캐시, 여러 워커 프로세스가 함께 쓰도록 파일 기반 캐시를 사용합니다. (Redis 불필요)
+# sessions: 세션과 로그인 사용자 캐시, blog 캐시를 비워도(benchmark --cold-cache 등) 로그아웃되지 않도록 따로 둡니다.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'blog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+}
+# viewcounts: 조회수 버퍼(BLOG_VIEW_COUNTER 의 CacheBackend)용 공유 캐시입니다.
+# 여러 프로세스가 동시에 증가시켜도 잃지 않도록 incr 가 원자적인 Redis 가 필요하므로 REDIS_URL 이 있을 때만 만듭니다. (pip install redis)
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES['viewcounts'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'TIMEOUT': None,
     }
+
+# 세션 저장 방식, SESSION_BACKEND 환경 변수로 고릅니다.
+# cached_db: sessions 캐시에서 읽고 세션이 바뀔 때만 DB 에도 씁니다. (캐시에 없을 때만 DB 를 읽습니다)
+# db: 요청마다 DB 에서 읽습니다. (Django 기본값)
+# signed_cookies: 서버에 저장하지 않고 서명한 쿠키에 담습니다. 쿼리는 없지만 로그아웃해도 복사해 둔 쿠키는 만료 전까지 유효합니다.
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_BACKEND', 'cached_db')]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# 로그인 사용자 객체 캐시 설정 (accounts/sessions.py)
+# ENABLED: False 이면 요청마다 DB 에서 사용자를 읽습니다.
+# TIMEOUT: 캐시 유지 시간(초), QuerySet.update() 로 비활성화한 사용자는 이 시간이 지나야 로그아웃됩니다.
+SESSION_USER_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'sessions',
+    'TIMEOUT': 60,
+}
+
+# blog 앱이 사용할 캐시 이름과 페이지 캐시 유지 시간(초)입니다.
+BLOG_CACHE_ALIAS = 'blog'
+BLOG_CACHE_TIMEOUT = 600
+
+
+# 게시글/댓글 작성자 표시 정보(아이디, 닉네임) 캐시 설정 (accounts/authors.py)
+# 프로세스마다 따로 쓰는 locmem 캐시는 다른 프로세스의 변경을 알 수 없으므로 공유되는 blog 캐시를 씁니다.
+AUTHOR_CACHE = {
+    'CACHE_ALIAS': 'blog',
+    'TIMEOUT': 60 * 60,
+}
+
+
+# 게시글 조회수 버퍼 설정
+# BACKEND: blog.viewcount.MemoryBackend(프로세스 메모리) 또는 blog.viewcount.CacheBackend(Django 캐시)
+#   MemoryBackend 의 버퍼는 웹 프로세스마다 따로 있어 manage.py flush_view_counts 로 반영할 수 없고,
+#   프로세스가 강제 종료되면 아직 반영하지 않은 조회수를 잃습니다.
+#   CacheBackend 는 incr 가 원자적인 캐시(Redis/Memcached)에만 쓸 수 있으며, 파일 캐시를 지정하면 시작하지 않습니다.
+#   REDIS_URL 이 있으면 viewcounts(Redis) 캐시와 CacheBackend 를 씁니다.
+# FLUSH_INTERVAL: 버퍼를 DB에 반영하는 주기(초)입니다. 프로세스 종료 시에는 항상 반영합니다.
+BLOG_VIEW_COUNTER = {
+    'BACKEND': 'blog.viewcount.CacheBackend' if REDIS_URL else 'blog.viewcount.MemoryBackend',
+    'FLUSH_INTERVAL': 10,
+    'CACHE_ALIAS': 'viewcounts' if REDIS_URL else 'default',
+}
+
+
+# 백그라운드 작업 대기열 설정 (manage.py runworker 로 실행)
+# EAGER: True 이면 대기열에 넣지 않고 트랜잭션 커밋 직후 바로 실행합니다.
+#   runworker 없이 runserver 만 띄우는 개발 환경에서도 검색 색인/썸네일/사이트맵이 갱신되도록 DEBUG 일 때 기본으로 켭니다.
+#   작업자를 띄우는 배포에서는 JOBS_EAGER=0 으로 끕니다. (꺼져 있으면 manage.py check --deploy 가 작업자 실행을 알려 줍니다)
+# RETENTION: 완료된 작업을 지우기 전까지 남겨 둘 시간(초)입니다. runworker 가 PURGE_INTERVAL 마다 지웁니다. (manage.py purge_jobs)
+JOBS = {
+    'EAGER': os.environ.get('JOBS_EAGER', '1' if DEBUG else '0') == '1',
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 3600,
+    'LOCK_TIMEOUT': 600,
+    'MAX_ATTEMPTS': 5,
+    'RETENTION': 7 * 24 * 60 * 60,
+    'PURGE_INTERVAL': 60 * 60,
+}
+
+# 게시글 저장 시 썸네일 생성, 검색 색인 같은 무거운 작업을 백그라운드 작업으로 넘깁니다.
+BLOG_BACKGROUND_TASKS = True
+
+
+# 게시글 첨부 파일 전송 설정 (blog/media.py)
+# BLOG_MEDIA_OFFLOAD: None 이면 Django가 직접 전송합니다.
+#   'x-accel-redirect' 는 nginx, 'x-sendfile' 은 Apache(mod_xsendfile) 같은 앞단 서버에 전송을 맡깁니다.
+# BLOG_MEDIA_ACCEL_PREFIX: x-accel-redirect 에서 MEDIA_ROOT 를 가리키는 nginx internal location 입니다.
+BLOG_MEDIA_OFFLOAD = None
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+
+# 큰 첨부 파일의 조각 업로드 설정 (blog/uploads.py, 오래된 업로드 정리: manage.py cleanup_uploads)
+# CHUNK_SIZE: 권장 조각 크기, MAX_CHUNK_SIZE: 요청 하나로 받을 수 있는 최대 조각 크기, MAX_SIZE: 파일 하나의 최대 크기(바이트)
+# STAGING_DIR: 받는 중인 파일을 모아 두는 폴더 (공개되지 않고 MEDIA_ROOT 와 같은 디스크에 있는 곳)
+# EXPIRE_AFTER: 이 시간(초) 동안 조각이 오지 않거나 게시글에 첨부되지 않은 업로드는 지웁니다.
+BLOG_CHUNKED_UPLOADS = {
+    'CHUNK_SIZE': 8 * 1024 * 1024,
+    'MAX_CHUNK_SIZE': 32 * 1024 * 1024,
+    'MAX_SIZE': 4 * 1024 * 1024 * 1024,
+    'STAGING_DIR': BASE_DIR / 'uploads',
+    'EXPIRE_AFTER': 24 * 60 * 60,
+}
+
+
+# 사이트맵 설정 (blog/sitemaps.py, 처음 만들기: manage.py build_sitemaps)
+# DIRECTORY: 사이트맵 파일을 저장할 폴더, BASE_URL: 사이트맵 안의 주소 앞에 붙일 사이트 주소
+# MAX_URLS: 파일 하나에 넣을 최대 주소 수 (게시글 하나는 언어 수만큼 주소를 차지합니다)
+BLOG_SITEMAPS = {
+    'DIRECTORY': BASE_DIR / 'sitemaps',
+    'BASE_URL': os.environ.get('SITE_URL', 'http://localhost:8000'),
+    'MAX_URLS': 50000,
+}
+
+
+# 게시글 피드 설정 (blog/feeds.py)
+# ITEMS: 피드 하나에 넣는 최대 게시글 수, TITLE/DESCRIPTION: 피드 제목과 설명
+BLOG_FEEDS = {
+    'ITEMS': 20,
+    'TITLE': 'My Blog',
+    'DESCRIPTION': '',
+}
+
+
+# True 이면 게시글 목록/상세 페이지를 비동기 뷰로 처리합니다. (ASGI 서버용, blog/urls.py)
+# 같은 코드로 WSGI/ASGI 서버를 나란히 띄워 비교할 수 있도록 환경 변수 BLOG_ASYNC_VIEWS=1 로 켭니다.
+BLOG_ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+
+# 요청별 쿼리 수/DB 시간/템플릿 시간/전체 시간 측정 (blogbase/profiling.py, 요약: /admin/profiling/)
+# SAMPLE_SIZE: URL 이름별로 메모리에 보관할 최근 요청 수
+# BUDGETS: URL 이름별 요청 하나에 허용하는 쿼리 수, 넘으면 WARNING 을 남기고 QueryBudgetMixin 테스트가 실패합니다.
+#   URL 이름만 적은 예산은 GET/HEAD 요청에만 적용하고, 다른 메서드는 'POST blog:post_new' 처럼 따로 적습니다.
+REQUEST_PROFILING = {
+    'ENABLED': True,
+    'SAMPLE_SIZE': 500,
+    'BUDGETS': {
+        # 로그인 사용자: 세션, 사용자, 작성자 캐시 누락분, 수정 시각(Last-Modified, 버전별로 캐시), 목록, 페이지 수
+        'blog:post_list': 6,
+        'blog:post_detail': 10,
+        'blog:post_new': 3,
+        'blog:post_edit': 6,
+        # 태그 페이지: 세션, 사용자, 태그, 수정 시각, 중간 테이블의 post_id, 게시글, 작성자 캐시 누락분
+        'blog:tag_detail': 7,
+        'blog:tag_list': 3,
+        # 피드 (캐시에 없을 때): 세션, 사용자, 태그/작성자, 게시글 id, 게시글, 태그, 작성자 캐시 누락분
+        'blog:post_feed': 6,
+        'blog:tag_feed': 7,
+        'blog:author_feed': 7,
+        # 글 저장 (후속 작업을 runworker 에 넘길 때): 세션/사용자, 트랜잭션, 게시글 저장, 태그 조회/생성/연결,
+        # 태그 수 갱신, 검색 색인/썸네일/사이트맵 작업 등록(중복 확인 포함), 목록/상세 캐시 무효화용 조회
+        # (JOBS 의 EAGER 에서는 후속 작업도 요청 안에서 실행되므로 예산을 넘을 수 있습니다)
+        'POST blog:post_new': 17,
+        'POST blog:post_edit': 18,
+    },
 }
 
 
@@ -163,6 +368,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# 비밀번호 해시 방식, PASSWORD_HASHER_PROFILE 환경 변수로 고릅니다.
+# default: Django 기본값(PBKDF2 등)
+# fast: 테스트와 성능 측정용 MD5 입니다. 보안상 운영 환경에서는 쓰면 안 됩니다.
+#   로그인/회원가입 측정이 일부러 느리게 만든 해시 계산 시간만 재지 않도록 테스트 설정(blogbase/test_settings.py)과
+#   manage.py benchmark 가 씁니다. 이 파일은 환경 변수로만 고르므로 테스트 실행 방법에 따라 바뀌지 않습니다.
+#   이미 PBKDF2 로 저장된 비밀번호도 확인할 수 있도록 기본 해셔를 뒤에 둡니다.
+PASSWORD_HASHER_PROFILES = {
+    'default': [
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+}
+PASSWORD_HASHER_PROFILES['fast'] = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    *PASSWORD_HASHER_PROFILES['default'],
+]
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'default')
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -195,6 +423,29 @@ STATICFILES_DIRS = [
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# collectstatic 이 CSS 정리/압축, 해시 파일 이름, .gz/.br 압축본을 만듭니다. (blogbase/staticfiles.py)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'blogbase.staticfiles.OptimizedStaticFilesStorage',
+    },
+}
+
+# CSS: 템플릿에서 쓰지 않는 선택자를 지울 CSS 파일 (STATIC_ROOT 기준 경로)
+# SAFELIST: 템플릿에 없지만 Bootstrap JS 가 실행 중에 붙이는 클래스라 남겨야 하는 이름
+STATIC_PURGE = {
+    'CSS': ['css/styles.css'],
+    'SAFELIST': [
+        'show', 'showing', 'hide', 'hiding', 'collapse', 'collapsing', 'collapsed', 'fade', 'active', 'disabled',
+        'dropdown-menu-end', 'dropdown-menu-start', 'navbar-nav-scroll', 'modal-open', 'modal-backdrop',
+        'offcanvas-backdrop', 'tooltip', 'tooltip-inner', 'tooltip-arrow', 'popover', 'popover-arrow',
+        'popover-header', 'popover-body', 'bs-tooltip-auto', 'bs-popover-auto', 'was-validated',
+        'is-valid', 'is-invalid', 'valid-feedback', 'invalid-feedback', 'visually-hidden',
+    ],
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,356 @@
+# 정적 파일 빌드/전송 모듈입니다.
+#
+# collectstatic 때 OptimizedStaticFilesStorage 가 다음 순서로 STATIC_ROOT 를 만듭니다.
+#   1. STATIC_PURGE['CSS'] 의 CSS 파일에서 템플릿/스크립트에 나오지 않는 클래스, id 선택자를 지우고 공백과 주석을 줄입니다.
+#   2. ManifestStaticFilesStorage 로 내용 해시가 들어간 파일 이름(styles.3f2a1b.css)을 만들고 staticfiles.json 에 기록합니다.
+#   3. 텍스트 파일마다 .gz (와 brotli 패키지가 있으면 .br) 압축본을 미리 만들어 둡니다.
+#
+# static_file 뷰는 Accept-Encoding 에 맞는 압축본을 고르고, 해시가 붙은 파일에는 1년짜리 immutable 캐시 헤더를 붙여 보냅니다.
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404
+from django.template.utils import get_app_template_dirs
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views import View
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 미리 압축할 확장자와 압축할 가치가 있는 최소 크기(바이트)입니다.
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml', '.ico')
+COMPRESS_MIN_SIZE = 256
+# 해시가 붙은 파일은 내용이 바뀌면 이름도 바뀌므로 오래 캐시해도 됩니다.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# 선택자 안쪽 괄호(:not(...) 등)와 속성 선택자는 사용 여부 판단에서 뺍니다.
+SELECTOR_IGNORE_RE = re.compile(r'\([^()]*\)|\[[^\]]*\]')
+SELECTOR_NAME_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+STRING_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+# 안쪽 규칙을 선택자 기준으로 정리할 그룹 at-rule 입니다. (@keyframes, @font-face 는 그대로 둡니다.)
+PURGE_GROUP_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+def get_purge_config():
+    config = {'CSS': [], 'SAFELIST': []}
+    config.update(getattr(settings, 'STATIC_PURGE', {}))
+    return config
+
+
+# --- CSS 분석 -------------------------------------------------------------
+
+def skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def skip_comment(css, i):
+    end = css.find('*/', i + 2)
+    return len(css) if end < 0 else end + 2
+
+
+def find_block_end(css, i):
+    # css[i] 가 '{' 일 때 짝이 되는 '}' 의 위치를 찾습니다.
+    depth = 0
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = skip_string(css, i)
+            continue
+        if css.startswith('/*', i):
+            i = skip_comment(css, i)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    # CSS를 ('comment', 글), ('statement', 글), ('group', 머리, [자식]), ('rule', 선택자, 선언) 목록으로 나눕니다.
+    # /*! 로 시작하는 라이선스 주석만 남기고 나머지 주석은 버립니다.
+    nodes = []
+    buf = []
+    i = 0
+    while i < len(css):
+        c = css[i]
+        if css.startswith('/*', i):
+            end = skip_comment(css, i)
+            if css.startswith('/*!', i):
+                nodes.append(('comment', css[i:end]))
+            i = end
+        elif c in '"\'':
+            end = skip_string(css, i)
+            buf.append(css[i:end])
+            i = end
+        elif c == ';':
+            text = ''.join(buf).strip()
+            if text:
+                nodes.append(('statement', text))
+            buf = []
+            i += 1
+        elif c == '{':
+            prelude = ''.join(buf).strip()
+            buf = []
+            end = find_block_end(css, i)
+            inner = css[i + 1:end]
+            if prelude.startswith('@') and '{' in STRING_RE.sub('', inner):
+                nodes.append(('group', prelude, parse_css(inner)))
+            else:
+                nodes.append(('rule', prelude, inner))
+            i = end + 1
+        elif c == '}':
+            i += 1
+        else:
+            buf.append(c)
+            i += 1
+    return nodes
+
+
+def split_top_level(text, separator):
+    # 괄호와 문자열 밖에 있는 separator 로만 나눕니다.
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c in '"\'':
+            i = skip_string(text, i)
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+# --- 사용하지 않는 선택자 제거 ----------------------------------------------
+
+def collect_used_tokens():
+    # 템플릿, 프로젝트 스크립트, 앱의 파이썬 코드(폼 위젯 class 등)에 나오는 단어를 모읍니다.
+    # 문맥을 보지 않고 단어만 모으므로 실제보다 넉넉하게 남기는 쪽으로 동작합니다.
+    sources = []
+    for template in settings.TEMPLATES:
+        for directory in template.get('DIRS', []):
+            sources += Path(directory).rglob('*.html')
+    for directory in get_app_template_dirs('templates'):
+        sources += Path(directory).rglob('*.html')
+    for directory in getattr(settings, 'STATICFILES_DIRS', []):
+        sources += Path(directory).rglob('*.js')
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('django.'):
+            sources += Path(app_config.path).rglob('*.py')
+
+    tokens = set(get_purge_config()['SAFELIST'])
+    for source in sources:
+        tokens.update(TOKEN_RE.findall(source.read_text(encoding='utf-8', errors='ignore')))
+    return tokens
+
+
+def selector_is_used(selector, tokens):
+    names = SELECTOR_NAME_RE.findall(SELECTOR_IGNORE_RE.sub('', STRING_RE.sub('', selector)))
+    return all(name in tokens for name in names)
+
+
+def purge_nodes(nodes, tokens):
+    kept = []
+    for node in nodes:
+        if node[0] == 'rule' and not node[1].startswith('@'):
+            selectors = [s for s in split_top_level(node[1], ',') if selector_is_used(s, tokens)]
+            if selectors:
+                kept.append(('rule', ','.join(selectors), node[2]))
+        elif node[0] == 'group' and node[1].split(None, 1)[0].split('(')[0] in PURGE_GROUP_RULES:
+            children = purge_nodes(node[2], tokens)
+            if any(child[0] != 'comment' for child in children):
+                kept.append(('group', node[1], children))
+        else:
+            kept.append(node)
+    return kept
+
+
+# --- 압축(minify) ---------------------------------------------------------
+
+def compact(text, tight=''):
+    # 문자열을 보존한 채 공백을 하나로 줄이고, tight 에 있는 문자 앞뒤 공백을 없앱니다.
+    strings = []
+
+    def protect(match):
+        strings.append(match.group(0))
+        return f'\x00{len(strings) - 1}\x00'
+
+    text = re.sub(r'\s+', ' ', STRING_RE.sub(protect, text)).strip()
+    if tight:
+        text = re.sub(r'\s*([%s])\s*' % re.escape(tight), r'\1', text)
+    return re.sub(r'\x00(\d+)\x00', lambda match: strings[int(match.group(1))], text)
+
+
+def minify_declarations(body):
+    declarations = []
+    for declaration in split_top_level(body, ';'):
+        prop, colon, value = declaration.partition(':')
+        if colon and prop.strip():
+            # 값이 빈 사용자 정의 속성(--x: ;)은 공백 하나를 남겨야 유효합니다.
+            declarations.append(f'{prop.strip()}:{compact(value, ",") or " "}')
+    return ';'.join(declarations)
+
+
+def serialize(nodes):
+    out = []
+    for node in nodes:
+        if node[0] == 'comment':
+            out.append(node[1] + '\n')
+        elif node[0] == 'statement':
+            out.append(compact(node[1]) + ';')
+        elif node[0] == 'group':
+            out.append(compact(node[1], ',:') + '{' + serialize(node[2]) + '}')
+        else:
+            out.append(compact(node[1], ',>+~') + '{' + minify_declarations(node[2]) + '}')
+    return ''.join(out)
+
+
+def optimize_css(css, tokens=None):
+    nodes = parse_css(css)
+    if tokens is not None:
+        nodes = purge_nodes(nodes, tokens)
+    return serialize(nodes)
+
+
+# --- collectstatic 저장소 ---------------------------------------------------
+
+class OptimizedStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # collectstatic 을 아직 하지 않은 개발/테스트 환경에서는 원래 이름을 그대로 씁니다.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.optimize_stylesheets(paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.precompress(list(paths) + list(self.hashed_files.values()))
+
+    def optimize_stylesheets(self, paths):
+        targets = [name for name in get_purge_config()['CSS'] if name in paths]
+        if not targets:
+            return
+        tokens = collect_used_tokens()
+        for name in targets:
+            # 이미 줄인 STATIC_ROOT 사본이 아니라 항상 원본에서 다시 만듭니다. (템플릿이 바뀌면 다시 살아나야 할 선택자가 있으므로)
+            storage, path = paths[name]
+            with storage.open(path) as original:
+                css = original.read().decode('utf-8')
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(optimize_css(css, tokens).encode('utf-8')))
+            # 이후 해시 계산이 줄인 파일을 읽도록 원본 위치를 바꿉니다.
+            paths[name] = (self, name)
+
+    def precompress(self, names):
+        for name in set(names):
+            if not name.endswith(COMPRESS_EXTENSIONS) or not self.exists(name):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            if len(data) < COMPRESS_MIN_SIZE:
+                continue
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                if len(compressed) >= len(data):
+                    continue
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+
+# --- 전송 -----------------------------------------------------------------
+
+_immutable_names = None
+
+
+def is_immutable(path):
+    # staticfiles.json 에 해시 이름으로 기록된 파일인지 확인합니다.
+    global _immutable_names
+    if _immutable_names is None:
+        _immutable_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    return path in _immutable_names
+
+
+def accepted_encodings(request):
+    encodings = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+class StaticFileView(View):
+    # STATIC_ROOT 의 파일을 미리 만든 압축본과 함께 보냅니다. (개발 서버의 DEBUG 정적 파일 처리보다 뒤에서 동작)
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def get(self, request, path):
+        if not settings.STATIC_ROOT:
+            raise Http404('STATIC_ROOT 가 설정되지 않았습니다.')
+        try:
+            full_path = Path(safe_join(settings.STATIC_ROOT, path))
+        except SuspiciousFileOperation:
+            raise Http404('잘못된 파일 경로입니다.')
+        if not full_path.is_file():
+            raise Http404('파일을 찾을 수 없습니다.')
+
+        content_type = mimetypes.guess_type(full_path.name)[0] or 'application/octet-stream'
+        accepted = accepted_encodings(request)
+        send_path, content_encoding = full_path, None
+        for encoding, suffix in self.encodings:
+            candidate = full_path.with_name(full_path.name + suffix)
+            if encoding in accepted and candidate.is_file():
+                send_path, content_encoding = candidate, encoding
+                break
+
+        stat = send_path.stat()
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = FileResponse(open(send_path, 'rb'), content_type=content_type)
+            if content_encoding:
+                response['Content-Encoding'] = content_encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if is_immutable(path):
+            response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=0, must-revalidate'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+static_file = StaticFileView.as_view()
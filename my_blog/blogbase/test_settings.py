@@ -0,0 +1,8 @@
+# 테스트용 설정입니다. 운영 설정(settings.py)을 그대로 쓰고 테스트에 필요한 값만 바꿉니다.
+#   python manage.py test --settings=blogbase.test_settings
+#   (pytest-django 는 DJANGO_SETTINGS_MODULE=blogbase.test_settings)
+from .settings import *  # noqa: F401,F403
+
+# 사용자를 많이 만드는 테스트가 느린 해시 계산에 시간을 쓰지 않도록 MD5 를 씁니다.
+PASSWORD_HASHER_PROFILE = 'fast'
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]  # noqa: F405
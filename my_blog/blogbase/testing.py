@@ -0,0 +1,36 @@
+# 테스트에서 뷰별 쿼리 예산을 확인하는 도우미입니다.
+# 예)
+#   class PostDetailQueryTests(QueryBudgetMixin, TestCase):
+#       def test_comment_thread(self):
+#           self.assertQueryBudget(reverse('blog:post_detail', args=[post.pk]))
+# 예산을 주지 않으면 요청 URL 이름으로 settings.REQUEST_PROFILING['BUDGETS'] 에서 찾으므로,
+# post_detail.html 에 N+1 쿼리가 생기면 운영 로그의 예산 경고와 같은 기준으로 테스트가 실패합니다.
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .profiling import get_budget
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, url, budget=None, method='get', **kwargs):
+        # url 을 self.client 로 요청하고, 모든 DB 연결에서 실행된 쿼리 수가 예산 이하인지 확인한 뒤 응답을 반환합니다.
+        aliases = getattr(self, 'databases', None) or {'default'}
+        if aliases == '__all__':
+            aliases = connections
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in sorted(aliases)]
+            response = getattr(self.client, method)(url, **kwargs)
+        queries = [query['sql'] for context in captured for query in context.captured_queries]
+        view_name = response.resolver_match.view_name
+        if budget is None:
+            budget = get_budget(view_name, method.upper())
+            if budget is None:
+                self.fail(f'{method.upper()} {view_name} 의 쿼리 예산이 settings.REQUEST_PROFILING["BUDGETS"] 에 없습니다.')
+        if len(queries) > budget:
+            self.fail(
+                f'{method.upper()} {view_name} ({url}) 에서 쿼리 {len(queries)}개가 실행되어 예산 {budget}개를 넘었습니다.\n'
+                + '\n'.join(f'{i}. {sql}' for i, sql in enumerate(queries, start=1))
+            )
+        return response
@@ -0,0 +1,101 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import router, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from blog import viewcount
+from blog.models import Post
+from jobs.queue import claim_jobs, execute_job, task
+
+from .db import DEFAULT_PRAGMAS, get_pragmas, primary_pin_scope
+from .profiling import get_budget
+
+# 테스트용 작업이 실행될 때 고른 읽기 연결을 기록합니다.
+read_aliases = []
+
+
+@task(name='blogbase.tests.write_post')
+def write_post(user_id):
+    Post.objects.create(user_id=user_id, title='작업이 쓴 글', content='본문')
+
+
+@task(name='blogbase.tests.read_post')
+def read_post():
+    read_aliases.append(router.db_for_read(Post))
+
+
+# 읽기/쓰기 분리 라우터를 트랜잭션 밖에서 확인합니다. TestCase 는 항상 트랜잭션 안이라 기본 연결만 고릅니다.
+@override_settings(BLOG_VIEW_COUNTER={'FLUSH_INTERVAL': 0}, JOBS={'EAGER': False})
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        read_aliases.clear()
+        self.user = User.objects.create_user('writer', password='password')
+        viewcount._backend = None
+        self.addCleanup(setattr, viewcount, '_backend', None)
+
+    def test_reads_go_to_replica_until_write(self):
+        with primary_pin_scope():
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            post = Post.objects.create(user=self.user, title='글', content='본문')
+            # 방금 쓴 글을 읽을 수 있도록 이후 읽기는 기본 연결로 갑니다.
+            self.assertEqual(router.db_for_read(Post), 'default')
+            self.assertEqual(Post.objects.get(pk=post.pk)._state.db, 'default')
+        with primary_pin_scope():
+            self.assertEqual(Post.objects.get(pk=post.pk)._state.db, 'replica')
+
+    def test_atomic_block_reads_primary(self):
+        with primary_pin_scope(), transaction.atomic():
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_other_apps_use_default(self):
+        with primary_pin_scope():
+            self.assertEqual(router.db_for_read(User), 'default')
+            self.assertEqual(User.objects.get(pk=self.user.pk)._state.db, 'default')
+
+    def test_scope_restores_outer_pin(self):
+        with primary_pin_scope():
+            router.db_for_write(Post)
+            with primary_pin_scope():
+                self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_worker_job_does_not_pin_next_job(self):
+        # 작업자 스레드가 쓰기 작업 다음에 읽기 작업을 실행해도 읽기는 replica 로 갑니다.
+        write_post.delay(self.user.pk)
+        read_post.delay()
+        with primary_pin_scope():
+            for job_id in claim_jobs(2):
+                execute_job(job_id)
+            self.assertEqual(read_aliases, ['replica'])
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_command_does_not_pin_caller(self):
+        post = Post.objects.create(user=self.user, title='글', content='본문')
+        viewcount.get_view_counter().incr(post.pk)
+        with primary_pin_scope():
+            call_command('flush_view_counts', stdout=StringIO())
+            self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(Post.objects.using('default').get(pk=post.pk).view_count, 1)
+
+
+class PragmaTests(TransactionTestCase):
+    def test_settings_override_defaults(self):
+        self.assertEqual(get_pragmas(), DEFAULT_PRAGMAS)
+        with override_settings(SQLITE_PRAGMAS={'mmap_size': 0}):
+            pragmas = get_pragmas()
+        self.assertEqual(pragmas['mmap_size'], 0)
+        self.assertEqual(pragmas['journal_mode'], 'WAL')
+
+
+class QueryBudgetTests(SimpleTestCase):
+    @override_settings(REQUEST_PROFILING={'BUDGETS': {'blog:post_new': 3, 'POST blog:post_new': 17}})
+    def test_budget_per_method(self):
+        self.assertEqual(get_budget('blog:post_new'), 3)
+        self.assertEqual(get_budget('blog:post_new', 'HEAD'), 3)
+        self.assertEqual(get_budget('blog:post_new', 'POST'), 17)
+        # 조회 예산은 다른 메서드에 적용하지 않습니다.
+        self.assertIsNone(get_budget('blog:post_new', 'DELETE'))
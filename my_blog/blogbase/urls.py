@@ -1,12 +1,24 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
 from django.conf import settings
 
+from blog.media import media_file
+from blog.sitemaps import sitemap_file
+from blogbase.profiling import profiling_summary
+from blogbase.staticfiles import static_file
+
 urlpatterns = [
+    # 요청 성능 요약 (관리자 전용), admin.site.urls 보다 먼저 연결해야 합니다.
+    path('admin/profiling/', profiling_summary, name='profiling_summary'),
     path('admin/', admin.site.urls),
     path('i18n/', include('django.conf.urls.i18n')),
+    # 미리 만든 사이트맵 파일 (blog/sitemaps.py, manage.py build_sitemaps)
+    path('sitemap.xml', sitemap_file, {'name': 'sitemap.xml'}, name='sitemap_index'),
+    re_path(r'^(?P<name>sitemap-\d+\.xml\.gz)$', sitemap_file, name='sitemap_shard'),
 ]
 
 urlpatterns += i18n_patterns(
@@ -17,4 +29,18 @@ urlpatterns += i18n_patterns(
     # 기본 언어 URL에 언어 접두사 보이기 설정
 )
 
+# 게시글 첨부 파일은 Range 요청을 지원하는 뷰로 내려줍니다. (동영상 탐색) 나머지 미디어는 아래 static() 이 처리합니다.
+urlpatterns += [
+    re_path(
+        r'^%sblog/files/(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+        media_file, name='blog_media_file',
+    ),
+]
+
+# collectstatic 으로 만든 STATIC_ROOT 의 파일을 압축본(.br/.gz)과 장기 캐시 헤더로 내려줍니다.
+# (DEBUG 에서 runserver 를 쓰면 staticfiles 앱이 먼저 처리하므로 이 뷰까지 오지 않습니다.)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), static_file, name='static_file'),
+]
+
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
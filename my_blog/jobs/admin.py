@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+# 관리자 페이지에서 작업 상태를 확인하고 실패한 작업을 다시 실행할 수 있게 합니다.
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    readonly_fields = ['created_at', 'finished_at', 'locked_at']
+    actions = ['retry_jobs']
+
+    @admin.action(description='선택한 작업을 다시 실행')
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), locked_at=None, last_error='',
+        )
+        self.message_user(request, f'작업 {count}건을 대기열에 다시 넣었습니다.')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # 각 앱의 tasks.py 를 불러와 @task 로 등록된 작업을 찾습니다.
+        autodiscover_modules('tasks')
+        from . import checks  # noqa: F401  시스템 검사 등록
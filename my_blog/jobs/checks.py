@@ -0,0 +1,43 @@
+# jobs 앱의 시스템 검사입니다. (manage.py check)
+from datetime import timedelta
+
+from django.core.checks import Tags, Warning, register
+from django.db import DatabaseError
+from django.utils import timezone
+
+from .models import Job
+from .queue import get_config
+
+
+@register(deploy=True)
+def check_worker(app_configs, **kwargs):
+    # 대기열을 쓰는 설정이면 작업자를 따로 띄워야 한다는 것을 배포 검사(check --deploy)에서 알려 줍니다.
+    if get_config()['EAGER']:
+        return []
+    return [Warning(
+        "JOBS['EAGER'] 가 False 이므로 백그라운드 작업(검색 색인, 썸네일, 사이트맵)은 작업자가 실행합니다.",
+        hint='manage.py runworker 를 함께 실행하거나, 작업자 없이 쓰려면 JOBS_EAGER=1 로 설정하세요.',
+        id='jobs.W001',
+    )]
+
+
+@register(Tags.database)
+def check_backlog(app_configs, databases=None, **kwargs):
+    # 실행 시각이 LOCK_TIMEOUT 이상 지났는데도 대기 중인 작업이 있으면 작업자가 돌고 있지 않은 것입니다.
+    # (check --database default, migrate 때 실행됩니다)
+    config = get_config()
+    if config['EAGER'] or not databases:
+        return []
+    cutoff = timezone.now() - timedelta(seconds=config['LOCK_TIMEOUT'])
+    try:
+        count = Job.objects.filter(status=Job.QUEUED, run_at__lt=cutoff).count()
+    except DatabaseError:
+        # 아직 마이그레이션하지 않은 DB 입니다.
+        return []
+    if not count:
+        return []
+    return [Warning(
+        f'실행되지 않고 밀려 있는 백그라운드 작업이 {count}개 있습니다.',
+        hint='manage.py runworker 가 실행 중인지 확인하세요.',
+        id='jobs.W002',
+    )]
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blogbase.db import primary_pin_scope
+from jobs.queue import get_config, purge_jobs
+
+
+# 끝난 지 오래된 백그라운드 작업 기록을 나눠서 지우는 관리 명령입니다.
+# runworker 도 JOBS['PURGE_INTERVAL'] 마다 완료된 작업을 지우므로, 작업자를 띄우지 않거나 실패한 작업도 지울 때 실행합니다.
+class Command(BaseCommand):
+    help = '끝난 지 오래된 완료(및 실패) 작업을 지웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=None,
+            help="끝난 지 이 시간(초)이 지난 작업을 지웁니다. (기본: JOBS['RETENTION'])",
+        )
+        parser.add_argument('--include-failed', action='store_true', help='실패한 작업도 지웁니다.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번의 DELETE 로 지울 작업 수')
+        parser.add_argument('--dry-run', action='store_true', help='지우지 않고 지울 작업 수만 출력합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        older_than = options['older_than']
+        if older_than is None:
+            older_than = get_config()['RETENTION']
+        if older_than is None:
+            raise CommandError("JOBS['RETENTION'] 이 None 입니다. --older-than 으로 지정하세요.")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size 는 1 이상이어야 합니다.')
+        count = purge_jobs(
+            older_than, include_failed=options['include_failed'],
+            batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'지울 작업 {count}개를 찾았습니다.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'작업 {count}개를 지웠습니다.'))
@@ -0,0 +1,94 @@
+import logging
+import multiprocessing
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from blogbase.db import primary_pin_scope
+from jobs.queue import claim_jobs, get_config, purge_jobs
+from jobs.worker import run_job, setup_worker_process
+
+logger = logging.getLogger('my.jobs')
+
+
+# 대기열의 작업을 가져와 스레드 또는 프로세스 풀에서 실행하는 작업자입니다.
+class Command(BaseCommand):
+    help = '백그라운드 작업 대기열(jobs.Job)의 작업을 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='동시에 실행할 작업 수')
+        parser.add_argument(
+            '--pool', choices=['thread', 'process'], default='thread',
+            help='thread: I/O 위주 작업, process: 이미지 변환 같은 CPU 위주 작업',
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='대기열이 비었을 때 다시 확인하는 간격(초)')
+        parser.add_argument('--burst', action='store_true', help='대기열이 비면 종료합니다.')
+
+    @primary_pin_scope()
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if options['pool'] == 'process':
+            # 부모 프로세스의 DB 연결을 물려받지 않도록 fork 대신 spawn 으로 작업 프로세스를 만듭니다.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=setup_worker_process,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='jobs-worker')
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f'작업자 시작 (pool={options["pool"]}, concurrency={concurrency})')
+
+        running = set()
+        self.next_purge = time.monotonic()
+        try:
+            while not self.stopping:
+                running = {future for future in running if not future.done()}
+                job_ids = []
+                if len(running) < concurrency:
+                    close_old_connections()
+                    job_ids = claim_jobs(concurrency - len(running))
+                    for job_id in job_ids:
+                        future = executor.submit(run_job, job_id)
+                        future.job_id = job_id
+                        future.add_done_callback(self.report)
+                        running.add(future)
+                if not job_ids:
+                    if options['burst'] and not running:
+                        break
+                    self.purge_finished()
+                    time.sleep(options['poll_interval'])
+        finally:
+            # 실행 중인 작업은 끝까지 마친 뒤 종료합니다.
+            executor.shutdown(wait=True)
+        self.stdout.write('작업자 종료')
+
+    def purge_finished(self):
+        # 대기열이 비어 있을 때 PURGE_INTERVAL 마다 RETENTION 이 지난 완료 작업을 지웁니다.
+        config = get_config()
+        if not config['RETENTION'] or time.monotonic() < self.next_purge:
+            return
+        self.next_purge = time.monotonic() + config['PURGE_INTERVAL']
+        try:
+            count = purge_jobs(config['RETENTION'])
+        except Exception:
+            logger.exception('완료된 작업을 지우지 못했습니다.')
+            return
+        if count:
+            logger.info('완료된 작업 %s개를 지웠습니다.', count)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def report(self, future):
+        # 작업 함수의 예외는 execute_job 이 기록하므로, 여기서는 작업자 프로세스 자체의 오류만 남습니다.
+        # 이런 작업은 실행 중 상태로 남았다가 LOCK_TIMEOUT 이 지나면 다시 실행됩니다.
+        if not future.cancelled() and future.exception() is not None:
+            logger.error('작업 %s 을(를) 실행하지 못했습니다: %r', future.job_id, future.exception())
@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils import timezone
+
+
+# 백그라운드에서 실행할 작업 한 건입니다. manage.py runworker 가 대기 중인 작업을 가져가 실행합니다.
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, '대기'),
+        (RUNNING, '실행 중'),
+        (SUCCEEDED, '완료'),
+        (FAILED, '실패'),
+    ]
+
+    # 실행할 작업 이름입니다. (@task 로 등록된 이름, 예: 'blog.tasks.index_post')
+    task = models.CharField(max_length=200)
+    # 작업 함수에 넘길 인자입니다. JSON으로 저장할 수 있는 값만 사용합니다.
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # 같은 작업이 대기열에 중복으로 쌓이지 않도록 할 때 사용하는 키입니다.
+    dedupe_key = models.CharField(max_length=255, blank=True, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # 실행한 횟수와 최대 시도 횟수입니다. 실패하면 max_attempts 까지 점점 늦춰서 다시 시도합니다.
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    # 이 시각 이후에 실행합니다. 재시도 시 뒤로 미뤄집니다.
+    run_at = models.DateTimeField(default=timezone.now)
+    # 작업자가 작업을 가져간 시각입니다. 오래된 실행 중 작업은 작업자가 죽은 것으로 보고 다시 실행합니다.
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # 작업자가 실행할 작업을 찾는 (status, run_at) 조회용 인덱스입니다.
+            models.Index(fields=['status', 'run_at'], name='jobs_job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk} ({self.status})'
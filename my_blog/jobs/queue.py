@@ -0,0 +1,193 @@
+# DB 테이블(jobs.Job)을 대기열로 쓰는 백그라운드 작업 모듈입니다.
+#
+#   from jobs.queue import task
+#
+#   @task
+#   def make_thumbnail(post_id):
+#       ...
+#
+#   make_thumbnail.delay(post.pk)   # 대기열에 넣고 바로 반환, manage.py runworker 가 실행합니다.
+#
+# settings.JOBS['EAGER'] 가 True 이면 대기열에 넣지 않고 트랜잭션 커밋 후 바로 실행합니다. (테스트/개발용)
+# 완료된 작업은 RETENTION 이 지나면 runworker 가 지웁니다. (manage.py purge_jobs 로도 지울 수 있습니다)
+import hashlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blogbase.db import primary_pin_scope
+
+from .models import Job
+
+logger = logging.getLogger('my.jobs')
+
+DEFAULTS = {
+    'EAGER': False,
+    # 재시도 간격(초)은 BACKOFF_BASE * 2^(시도 횟수 - 1) 이며 BACKOFF_MAX 를 넘지 않습니다.
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 3600,
+    # 이 시간(초)이 지나도록 끝나지 않은 실행 중 작업은 작업자가 죽은 것으로 보고 다시 실행합니다.
+    'LOCK_TIMEOUT': 600,
+    'MAX_ATTEMPTS': 5,
+    # 완료된 작업을 남겨 둘 시간(초)과 runworker 가 지우는 주기(초)입니다. RETENTION 이 None 이면 지우지 않습니다.
+    'RETENTION': 7 * 24 * 60 * 60,
+    'PURGE_INTERVAL': 60 * 60,
+}
+
+_registry = {}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'JOBS', {}))
+    return config
+
+
+class Task:
+    # @task 로 등록된 작업 함수입니다. 그대로 호출하면 바로 실행하고, delay() 로 호출하면 대기열에 넣습니다.
+    def __init__(self, func, name, max_attempts=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts)
+
+    def delay_once(self, *args, **kwargs):
+        # 같은 인자로 아직 실행되지 않은 작업이 대기 중이면 새로 넣지 않습니다.
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts, unique=True)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registered = Task(func, task_name, max_attempts)
+        _registry[task_name] = registered
+        return registered
+
+    if func is not None:
+        return register(func)
+    return register
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def make_dedupe_key(name, args, kwargs):
+    key = f'{name}:{json.dumps([args, kwargs], sort_keys=True, default=str)}'
+    if len(key) <= 255:
+        return key
+    # dedupe_key 칸(255자)보다 길면 앞부분만 자를 경우 인자가 다른 작업끼리 같은 키가 되므로 해시로 줄입니다.
+    return f'{name[:180]}:sha256:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def run_eager(name, args, kwargs):
+    # EAGER 에서는 요청을 처리하던 스레드에서 커밋 직후 실행되므로, 작업이 실패해도 요청이 500 이 되지 않도록 기록만 합니다.
+    try:
+        get_task(name)(*args, **kwargs)
+    except Exception:
+        logger.exception('작업 %s 을(를) 바로 실행하다 실패했습니다.', name)
+
+
+def enqueue(name, args=(), kwargs=None, run_at=None, max_attempts=None, unique=False):
+    args = list(args)
+    kwargs = kwargs or {}
+    config = get_config()
+    if config['EAGER']:
+        transaction.on_commit(lambda: run_eager(name, args, kwargs))
+        return None
+    dedupe_key = make_dedupe_key(name, args, kwargs)
+    if unique:
+        existing = Job.objects.filter(dedupe_key=dedupe_key, status=Job.QUEUED).first()
+        if existing is not None:
+            return existing
+    return Job.objects.create(
+        task=name,
+        args=args,
+        kwargs=kwargs,
+        dedupe_key=dedupe_key,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or config['MAX_ATTEMPTS'],
+    )
+
+
+def claim_jobs(limit):
+    # 실행할 작업을 최대 limit 개 가져와 실행 중으로 표시합니다.
+    # 여러 작업자가 동시에 가져가도 한 작업은 한 작업자만 가져가도록 status 조건을 건 UPDATE 로 선점합니다.
+    now = timezone.now()
+    stale = now - timedelta(seconds=get_config()['LOCK_TIMEOUT'])
+    ready = Q(status=Job.QUEUED, run_at__lte=now) | Q(status=Job.RUNNING, locked_at__lt=stale)
+    claimed = []
+    candidates = Job.objects.filter(ready).order_by('run_at', 'id').values_list('id', 'status', 'locked_at')
+    for job_id, status, locked_at in candidates[:limit * 2]:
+        updated = Job.objects.filter(pk=job_id, status=status, locked_at=locked_at).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(job_id)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def backoff_delay(attempts):
+    config = get_config()
+    return min(config['BACKOFF_BASE'] * 2 ** max(attempts - 1, 0), config['BACKOFF_MAX'])
+
+
+@primary_pin_scope()
+def execute_job(job_id):
+    # 선점한 작업 하나를 실행하고 결과를 기록합니다. 작업자 스레드/프로세스에서 호출됩니다.
+    # 작업자 스레드는 여러 작업을 이어서 실행하므로 작업마다 '쓰기 후 기본 연결 고정' 상태를 새로 시작합니다.
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            get_task(job.task)(*job.args, **job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts >= job.max_attempts:
+                logger.error('작업 %s 이(가) %s번 실패해 중단합니다.\n%s', job, job.attempts, error)
+                Job.objects.filter(pk=job.pk).update(
+                    status=Job.FAILED, last_error=error, finished_at=timezone.now(), locked_at=None,
+                )
+                return Job.FAILED
+            delay = backoff_delay(job.attempts)
+            logger.warning('작업 %s 이(가) 실패해 %s초 뒤 다시 실행합니다.\n%s', job, delay, error)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, last_error=error, locked_at=None,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+            return Job.QUEUED
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.SUCCEEDED, finished_at=timezone.now(), locked_at=None,
+        )
+        return Job.SUCCEEDED
+    finally:
+        close_old_connections()
+
+
+def purge_jobs(older_than, include_failed=False, batch_size=1000, dry_run=False):
+    # 끝난 지 older_than 초가 지난 완료 작업(include_failed 이면 실패한 작업도)을 batch_size 개씩 지우고 지운(지울) 수를 반환합니다.
+    statuses = [Job.SUCCEEDED, Job.FAILED] if include_failed else [Job.SUCCEEDED]
+    finished = Job.objects.filter(status__in=statuses, finished_at__lt=timezone.now() - timedelta(seconds=older_than))
+    if dry_run:
+        return finished.count()
+    total = 0
+    while True:
+        ids = list(finished.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        Job.objects.filter(pk__in=ids).delete()
+        total += len(ids)
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import backoff_delay, claim_jobs, execute_job, task
+
+# 테스트용 작업이 실행될 때 받은 인자를 기록합니다.
+calls = []
+
+
+@task(name='jobs.tests.record')
+def record(*args, **kwargs):
+    calls.append((args, kwargs))
+
+
+@task(name='jobs.tests.fail')
+def fail(*args):
+    raise RuntimeError('작업 실패')
+
+
+# 대기열 선점/재시도/중복 제거를 확인합니다. 작업자처럼 트랜잭션 밖에서 실행하므로 TransactionTestCase 를 씁니다.
+@override_settings(JOBS={'EAGER': False, 'BACKOFF_BASE': 10, 'BACKOFF_MAX': 60, 'LOCK_TIMEOUT': 600})
+class QueueTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_marks_running_once(self):
+        job = record.delay(1)
+        self.assertEqual(claim_jobs(10), [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.locked_at)
+        # 이미 가져간 작업은 다시 가져가지 않습니다.
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_claim_skips_job_taken_by_another_worker(self):
+        job = record.delay(1)
+        real_update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            # 후보를 읽은 뒤 UPDATE 하기 직전에 다른 작업자가 먼저 가져갑니다.
+            if not raced:
+                raced.append(True)
+                real_update(Job.objects.filter(pk=job.pk), status=Job.RUNNING, locked_at=timezone.now())
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            self.assertEqual(claim_jobs(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 0)
+
+    def test_claim_respects_limit_and_run_at(self):
+        jobs = [record.delay(i) for i in range(3)]
+        later = Job.objects.create(task='jobs.tests.record', run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(claim_jobs(2), [jobs[0].pk, jobs[1].pk])
+        self.assertEqual(claim_jobs(10), [jobs[2].pk])
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_stale_running_job_is_reclaimed(self):
+        stale = record.delay('stale')
+        fresh = record.delay('fresh')
+        now = timezone.now()
+        Job.objects.filter(pk=stale.pk).update(status=Job.RUNNING, attempts=1, locked_at=now - timedelta(seconds=601))
+        Job.objects.filter(pk=fresh.pk).update(status=Job.RUNNING, attempts=1, locked_at=now - timedelta(seconds=10))
+        self.assertEqual(claim_jobs(10), [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual(stale.attempts, 2)
+
+    def test_backoff_doubles_up_to_max(self):
+        self.assertEqual([backoff_delay(n) for n in range(1, 6)], [10, 20, 40, 60, 60])
+
+    def test_failure_requeues_with_backoff(self):
+        job = fail.delay()
+        claim_jobs(1)
+        before = timezone.now()
+        self.assertEqual(execute_job(job.pk), Job.QUEUED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIsNone(job.locked_at)
+        self.assertIn('작업 실패', job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        # 재시도 시각 전에는 가져가지 않습니다.
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_retry_limit_marks_failed(self):
+        job = Job.objects.create(task='jobs.tests.fail', max_attempts=2)
+        for expected in (Job.QUEUED, Job.FAILED):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            self.assertEqual(claim_jobs(1), [job.pk])
+            self.assertEqual(execute_job(job.pk), expected)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_success_runs_task(self):
+        job = record.delay(1, key='value')
+        claim_jobs(1)
+        self.assertEqual(execute_job(job.pk), Job.SUCCEEDED)
+        self.assertEqual(calls, [((1,), {'key': 'value'})])
+        job.refresh_from_db()
+        self.assertIsNotNone(job.finished_at)
+
+    def test_delay_once_dedupes_queued_jobs(self):
+        first = record.delay_once(1)
+        self.assertEqual(record.delay_once(1), first)
+        self.assertNotEqual(record.delay_once(2), first)
+        # 이미 실행 중인 작업은 중복으로 보지 않으므로 그 뒤의 변경을 반영할 작업을 새로 넣습니다.
+        claim_jobs(10)
+        self.assertNotEqual(record.delay_once(1), first)
+        # delay() 는 중복을 확인하지 않습니다.
+        record.delay(3)
+        record.delay(3)
+        self.assertEqual(Job.objects.filter(kwargs={}, args=[3]).count(), 2)
+
+    def test_long_dedupe_keys_stay_distinct(self):
+        # 255자에서 잘랐을 때 앞부분이 같아지는 인자도 다른 작업으로 봅니다.
+        prefix = 'x' * 300
+        first = record.delay_once(prefix + 'a')
+        second = record.delay_once(prefix + 'b')
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(first.dedupe_key, second.dedupe_key)
+        self.assertLessEqual(len(first.dedupe_key), 255)
+        self.assertEqual(record.delay_once(prefix + 'a'), first)
+
+
+@override_settings(JOBS={'EAGER': True})
+class EagerTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_after_commit_without_queue(self):
+        with transaction.atomic():
+            self.assertIsNone(record.delay(1))
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [((1,), {})])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failing_task_is_logged_not_raised(self):
+        with self.assertLogs('my.jobs', 'ERROR') as logs:
+            fail.delay()
+            record.delay(2)
+        self.assertIn('jobs.tests.fail', logs.output[0])
+        # 앞의 작업이 실패해도 뒤의 작업은 실행됩니다.
+        self.assertEqual(calls, [((2,), {})])
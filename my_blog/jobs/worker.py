@@ -0,0 +1,14 @@
+# 프로세스 풀 작업자가 사용하는 함수들입니다.
+# spawn 으로 만든 프로세스가 이 모듈을 불러올 때는 아직 Django가 준비되지 않았으므로 모델을 모듈 수준에서 불러오지 않습니다.
+import django
+
+
+def setup_worker_process():
+    # 작업 프로세스가 시작될 때 Django 설정과 앱(등록된 작업 포함)을 불러옵니다.
+    django.setup()
+
+
+def run_job(job_id):
+    from .queue import execute_job
+
+    return execute_job(job_id)